@@ -1,27 +1,54 @@
+import json
 import logging
 import os
 import random
+import time
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import asynccontextmanager
+from functools import partial
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Iterator
 
 import requests
-from core import Engine, get_author_by_id
+from core import (
+    SIZE_BUCKETS,
+    EmbeddingCache,
+    Engine,
+    StaleWhileRevalidate,
+    TTLCache,
+    format_server_timing,
+    get_authors_by_ids,
+    get_plot_spec,
+    metrics,
+    span,
+    start_spans,
+)
 from data_model import (
     APIArticle,
+    APIArticlesResult,
     APIAuthor,
+    APIAuthorsResult,
+    APIColumnarPlotData,
     GetAuthorByIdInput,
     GetAuthorInput,
+    SearchArticlesBatchInputs,
     SearchArticlesInputs,
+    SearchAuthorsBatchInputs,
     SearchAuthorsInputs,
 )
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException
+from embedded_store import EmbeddedCollection
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from langchain.embeddings import OpenAIEmbeddings
-from pymilvus import Collection, connections
+from pymilvus import Collection, connections, utility
 
 load_dotenv()
 
 cached_resources = {}
+STREAM_CHUNK_SIZE = 5  # authors per streamed message
 logging.basicConfig(
     level=logging.DEBUG,
     format="%(asctime)s - %(levelname)s - %(message)s",
@@ -33,22 +60,89 @@ logging.basicConfig(
 async def lifespan(app: FastAPI):
     """Cached resources management."""
 
-    connections.connect(
-        alias=os.getenv("MILVUS_ALIAS", "default"),
-        host=os.getenv("MILVUS_HOST", "127.0.0.1"),
-        port=os.getenv("MILVUS_PORT", "19530"),
+    backend = os.getenv("VECTOR_BACKEND", "milvus")
+    if backend == "embedded":
+        # Memory-mapped local store, no Milvus server needed
+        store_dir = Path(os.getenv("EMBEDDED_STORE_DIR", "data/embedded"))
+        author_collection = EmbeddedCollection(store_dir / "authors")
+        article_collection = EmbeddedCollection(store_dir / "articles")
+        centroid_collection = None
+        if (store_dir / "author_centroids").exists():
+            centroid_collection = EmbeddedCollection(store_dir / "author_centroids")
+
+        def open_collection(name: str) -> EmbeddedCollection | None:
+            path = store_dir / name
+            return EmbeddedCollection(path) if path.exists() else None
+
+    else:
+        connections.connect(
+            alias=os.getenv("MILVUS_ALIAS", "default"),
+            host=os.getenv("MILVUS_HOST", "127.0.0.1"),
+            port=os.getenv("MILVUS_PORT", "19530"),
+        )
+        author_collection = Collection(name="authors")
+        article_collection = Collection(name="articles")
+        centroid_collection = None
+        if utility.has_collection("author_centroids"):
+            centroid_collection = Collection(name="author_centroids")
+
+        def open_collection(name: str) -> Collection | None:
+            return Collection(name=name) if utility.has_collection(name) else None
+
+    embeddings = OpenAIEmbeddings()
+    embedding_cache = EmbeddingCache(
+        maxsize=int(os.getenv("EMBEDDING_CACHE_SIZE", 4096)),
+        ttl=float(os.getenv("EMBEDDING_CACHE_TTL", 30 * 24 * 3600)),
+        path=os.getenv("EMBEDDING_CACHE_PATH"),  # optional on-disk tier (SQLite)
+        namespace=embeddings.model,
+    )
+
+    # CPU-bound plot jobs (projection, Altair) run off the request threads, in
+    # spawned workers: forked ones would inherit the Milvus connection (gRPC)
+    plot_executor = ProcessPoolExecutor(
+        max_workers=int(os.getenv("PLOT_WORKERS", 2)), mp_context=get_context("spawn")
     )
 
     cached_resources["engine"] = Engine(
-        article_collection=Collection(name="articles"),
-        author_collection=Collection(name="authors"),
-        embeddings=OpenAIEmbeddings(),
+        article_collection=article_collection,
+        author_collection=author_collection,
+        centroid_collection=centroid_collection,
+        # Reduced-dimension index collections, looked up on every corpus generation
+        collection_opener=open_collection,
+        embeddings=embeddings,
+        embedding_cache=embedding_cache,
+        response_cache=TTLCache(
+            maxsize=int(os.getenv("RESPONSE_CACHE_SIZE", 1024)),
+            ttl=float(os.getenv("RESPONSE_CACHE_TTL", 3600)),
+        ),
+        plot_executor=plot_executor,
+        # Shared by workers and replicas, so that any of them serves the next pages
+        cursor_key=os.getenv("CURSOR_KEY", "").encode(),
     )
+
+    # Cache statistics, read when /metrics is scraped
+    engine = cached_resources["engine"]
+    for name, cache in [
+        ("embedding", engine.embedding_cache),
+        ("response", engine.response_cache),
+    ]:
+        for stat in ["hits", "misses"]:
+            metrics.register(
+                f"cache_{stat}_total",
+                partial(getattr, cache, stat),
+                {"cache": name},
+                kind="counter",
+            )
+        metrics.register("cache_size", cache.__len__, {"cache": name})
+
     yield
 
     # Release resources when app stops
     cached_resources.clear()
-    connections.disconnect(alias=os.getenv("MILVUS_ALIAS", "default"))
+    engine.plot_searches.shutdown(cancel_futures=True)
+    plot_executor.shutdown(cancel_futures=True)
+    if backend != "embedded":
+        connections.disconnect(alias=os.getenv("MILVUS_ALIAS", "default"))
 
 
 app = FastAPI(title="Scholar Search API", lifespan=lifespan)
@@ -62,14 +156,41 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def server_timing(request: Request, call_next) -> Response:
+    """Time requests, expose their stage spans as a `Server-Timing` header."""
+
+    spans = start_spans()
+    start = time.perf_counter()
+    response = await call_next(request)
+    duration = time.perf_counter() - start
+
+    # Route template (not the raw path) keeps the label cardinality bounded
+    route = request.scope.get("route")
+    path = route.path if route is not None else "unmatched"
+    labels = {"path": path, "method": request.method}
+    metrics.observe("request_duration_seconds", duration, labels)
+    metrics.inc("requests_total", labels={**labels, "status": response.status_code})
+
+    response.headers["Server-Timing"] = format_server_timing(
+        spans + [("total", duration)]
+    )
+    return response
+
+
+@app.get("/metrics")
+def get_metrics() -> Response:
+    """Prometheus metrics: request and stage latencies, pool sizes, cache statistics."""
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/")
 def root():
     """Root endpoint (for health check)."""
     return {"api": "is running."}
 
 
-@app.get("/get_units/")
-def get_units() -> dict[int, str]:
+def fetch_units() -> dict[int, str]:
     """Get all units from the academic analytics API.
 
     returns:
@@ -80,7 +201,9 @@ def get_units() -> dict[int, str]:
     }
     url = "https://wisc.discovery.academicanalytics.com/api/units/GetInstitutionUnitsForInstitutions"
     uw_id = 14
-    response = requests.post(url, headers=headers, json={"InstitutionIds": [uw_id]})
+    response = requests.post(
+        url, headers=headers, json={"InstitutionIds": [uw_id]}, timeout=30
+    )
 
     if response.status_code != 200:
         raise Exception(
@@ -95,6 +218,35 @@ def get_units() -> dict[int, str]:
     }
 
 
+# Served from memory, refreshed in the background, seeded from the ingest snapshot
+units_cache = StaleWhileRevalidate(
+    fetch=fetch_units,
+    ttl=float(os.getenv("UNITS_CACHE_TTL", 24 * 3600)),
+    snapshot_path=os.getenv("UNITS_SNAPSHOT_PATH"),
+)
+
+
+@app.get("/get_units/")
+def get_units() -> dict[int, str]:
+    """Get all units (cached from the academic analytics API).
+
+    returns:
+        dict[int, str]: unit_id -> unit_name
+    """
+    return units_cache.get()
+
+
+@app.get("/plot_spec/")
+def plot_spec() -> Response:
+    """Static Vega-Lite spec for `plot_format="columnar"` plot data (data source `points`)."""
+
+    return Response(
+        content=get_plot_spec(),
+        media_type="application/json",
+        headers={"Cache-Control": "public, max-age=86400"},
+    )
+
+
 @app.get("/draw_search_authors_settings/")
 def get_default_settings() -> dict:
     """Get settings for AB testing."""
@@ -128,13 +280,13 @@ def get_default_settings() -> dict:
 
 
 @app.post("/get_author/")
-def get_author(query: GetAuthorInput) -> dict[str, APIAuthor | list[dict]]:
-    """Search author by name."""
+def get_author(
+    query: GetAuthorInput,
+) -> dict[str, APIAuthor | list[dict] | int | None]:
+    """Search author by name, with a page of their articles."""
 
     try:
-        results = cached_resources["engine"].get_author(
-            first_name=query.first_name, last_name=query.last_name
-        )
+        results = cached_resources["engine"].get_author(**query.model_dump())
         # logging.debug(results)
     except ValueError:
         raise HTTPException(status_code=404, detail="Author not found.")
@@ -142,42 +294,115 @@ def get_author(query: GetAuthorInput) -> dict[str, APIAuthor | list[dict]]:
 
 
 @app.post("/get_author_by_id/")
-def get_author2(query: GetAuthorByIdInput) -> dict[str, APIAuthor | list[dict]]:
-    """Search author by name."""
+def get_author2(
+    query: GetAuthorByIdInput,
+) -> dict[str, APIAuthor | list[dict] | int | None]:
+    """Get author by id, with a page of their articles."""
 
     try:
-        results = cached_resources["engine"].get_author_by_id(author_id=query.author_id)
+        results = cached_resources["engine"].get_author_by_id(**query.model_dump())
     except ValueError:
         raise HTTPException(status_code=404, detail="Author not found.")
     return results
 
 
+def hydrate_authors(
+    author_ids: list[str], scores: list[float], details: dict[int, dict] | None = None
+) -> list[APIAuthor]:
+    """Inject author details into ranked author ids, in ranking order.
+
+    Details are fetched with a single query unless given (e.g., shared by a batch).
+    """
+
+    if details is None:
+        with span("hydrate"):
+            details = fetch_authors_details(author_ids)
+
+    authors = []
+    for author_id, score in zip(author_ids, scores):
+        author_details = details.get(int(author_id))
+        if author_details is None:
+            continue
+        authors.append(APIAuthor(**author_details, score=score))  # inject score
+    return authors
+
+
+def fetch_authors_details(author_ids: list[str]) -> dict[int, dict]:
+    """Get details of many authors with one query."""
+
+    authors = get_authors_by_ids(
+        author_ids, cached_resources["engine"].author_collection
+    )
+    return {author["id"]: author for author in authors}
+
+
+def get_next_page(kind: str, cursor: str, page_size: int) -> dict:
+    """Next page of a search, from its cached candidate pool (see `Engine.get_page`).
+
+    The other search inputs are ignored, they are held by the cursor.
+    """
+
+    try:
+        data = cached_resources["engine"].get_page(
+            cursor, page_size=page_size, kind=kind
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    output = {"next_cursor": data["next_cursor"]}
+    if kind == "articles":
+        output["articles"] = [APIArticle(**result) for result in data["articles"]]
+    else:
+        author_ids = data["authors"]["author_ids"]
+        output["authors"] = hydrate_authors(author_ids, data["authors"]["scores"])
+    return output
+
+
 @app.post("/search_authors/")
 def search_authors(
     query: SearchAuthorsInputs,
-) -> dict[str, list[APIAuthor] | str | list]:
+) -> dict[str, list[APIAuthor] | str | list | APIColumnarPlotData | None]:
     """Search an author."""
 
     logging.debug(f"Search authors: {query.model_dump()}")
-    data = cached_resources["engine"].search_authors(**query.model_dump())
+    engine = cached_resources["engine"]
+    if query.cursor is not None:
+        return get_next_page("authors", query.cursor, query.top_k)
+
+    inputs = query.model_dump(exclude={"plot_async", "cursor"})
+    if query.plot_async:
+        inputs["with_plot"] = False  # plotted by a plot job instead
+    try:
+        data = engine.search_authors(**inputs)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     # Unpack data
     author_ids, scores = data["authors"]["author_ids"], data["authors"]["scores"]
     # logging.debug(f"{author_ids=}, {scores=}")
 
-    authors = []
-    for author_id, score in zip(author_ids, scores):
-        author_details = get_author_by_id(
-            author_id, cached_resources["engine"].author_collection
-        )
-        author_details["score"] = score  # inject score to author details
-        authors.append(APIAuthor(**author_details))
-
     output = {}
-    output["authors"] = authors
+    output["authors"] = hydrate_authors(author_ids, scores)
+    output["next_cursor"] = data["next_cursor"]
+    metrics.observe(
+        "result_count",
+        len(output["authors"]),
+        {"endpoint": "search_authors"},
+        buckets=SIZE_BUCKETS,
+    )
 
-    if query.with_plot:
-        output["plot_json"] = data["plot_json"]
+    if query.with_plot and query.plot_async:
+        output["plot_id"] = engine.submit_plot(
+            query.query,
+            since_year=query.since_year,
+            filter_unit=query.filter_unit,
+            plot_format=query.plot_format,
+            retrieval=query.retrieval,
+            top_k=query.top_k,
+        )
+    elif query.with_plot:
+        plot_key = "plot_data" if query.plot_format == "columnar" else "plot_json"
+        output[plot_key] = data[plot_key]
 
     if query.with_evidence:
         output["evidence"] = data["evidence"]
@@ -185,16 +410,147 @@ def search_authors(
     return output
 
 
+@app.post("/search_authors/stream")
+def search_authors_stream(query: SearchAuthorsInputs) -> StreamingResponse:
+    """Search an author, streaming the results as NDJSON (one message per line).
+
+    Messages arrive in this order, each with a `type`:
+    - `ranking`: ranked `author_ids` and `scores`, right after embed and search.
+    - `authors`: hydrated `authors`, in ranking order, `STREAM_CHUNK_SIZE` at a time.
+    - `evidence`: the article pool (if `with_evidence`).
+    - `plot_json` or `plot_data`: the plot of the article pool (if `with_plot`), last.
+    """
+
+    logging.debug(f"Search authors stream: {query.model_dump()}")
+    engine = cached_resources["engine"]
+    inputs = query.model_dump(exclude={"plot_async", "cursor"})
+
+    # Rank first, without the plot; errors are raised before the stream starts
+    try:
+        data = engine.search_authors(
+            **{**inputs, "with_plot": False, "with_evidence": True}
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def messages() -> Iterator[str]:
+        ranking = {"type": "ranking", **data["authors"]}
+        yield json.dumps({**ranking, "next_cursor": data["next_cursor"]}) + "\n"
+
+        # Hydrated with one query, streamed in chunks
+        authors = [
+            author.model_dump()
+            for author in hydrate_authors(
+                data["authors"]["author_ids"], data["authors"]["scores"]
+            )
+        ]
+        for start in range(0, len(authors), STREAM_CHUNK_SIZE):
+            chunk = authors[start : start + STREAM_CHUNK_SIZE]
+            yield json.dumps({"type": "authors", "authors": chunk}) + "\n"
+
+        if query.with_evidence:
+            yield json.dumps({"type": "evidence", "evidence": data["evidence"]}) + "\n"
+
+        if query.with_plot:
+            # Plotted from the article pool already retrieved, not searched again
+            plot = engine.plot_articles(
+                query.query, data["evidence"], plot_format=query.plot_format
+            )
+            (plot_key,) = plot
+            yield json.dumps({"type": plot_key, plot_key: plot[plot_key]}) + "\n"
+
+    return StreamingResponse(messages(), media_type="application/x-ndjson")
+
+
+@app.get("/plots/{plot_id}")
+def get_plot(plot_id: str) -> JSONResponse:
+    """Result of a plot job (`plot_async`): 202 while pending, then the plot."""
+
+    plot = cached_resources["engine"].get_plot(plot_id)
+    if plot is None:
+        raise HTTPException(status_code=404, detail="Plot not found or expired.")
+    if plot["status"] == "failed":
+        raise HTTPException(status_code=500, detail="Plot job failed.")
+
+    status_code = 202 if plot["status"] == "pending" else 200
+    return JSONResponse(content=plot, status_code=status_code)
+
+
 @app.post("/search_articles/")
-def search_articles(query: SearchArticlesInputs) -> dict[str, list[APIArticle] | str]:
+def search_articles(
+    query: SearchArticlesInputs,
+) -> dict[str, list[APIArticle] | str | APIColumnarPlotData | None]:
     """Search an article."""
 
-    data = cached_resources["engine"].search_articles(**query.model_dump())
+    engine = cached_resources["engine"]
+    if query.cursor is not None:
+        return get_next_page("articles", query.cursor, query.top_k)
+
+    inputs = query.model_dump(exclude={"plot_async", "cursor"})
+    if query.plot_async:
+        inputs["with_plot"] = False  # plotted by a plot job instead
+    data = engine.search_articles(**inputs)
 
     output = {}
     output["articles"] = [APIArticle(**result) for result in data["articles"]]
+    output["next_cursor"] = data["next_cursor"]
+    metrics.observe(
+        "result_count",
+        len(output["articles"]),
+        {"endpoint": "search_articles"},
+        buckets=SIZE_BUCKETS,
+    )
 
-    if query.with_plot:
-        output["plot_json"] = data["plot_json"]
+    if query.with_plot and query.plot_async:
+        output["plot_id"] = engine.submit_plot(
+            query.query, since_year=query.since_year, plot_format=query.plot_format
+        )
+    elif query.with_plot:
+        plot_key = "plot_data" if query.plot_format == "columnar" else "plot_json"
+        output[plot_key] = data[plot_key]
 
     return output
+
+
+@app.post("/search_authors/batch")
+def search_authors_batch(
+    query: SearchAuthorsBatchInputs,
+) -> dict[str, list[APIAuthorsResult]]:
+    """Search authors for many queries with one embedding and one search call."""
+
+    logging.debug(f"Search authors batch: {query.model_dump()}")
+    data = cached_resources["engine"].search_authors_batch(**query.model_dump())
+
+    # Hydrate authors of all queries in one query
+    all_author_ids = {
+        author_id for result in data for author_id in result["authors"]["author_ids"]
+    }
+    with span("hydrate"):
+        details = fetch_authors_details(list(all_author_ids))
+
+    results = []
+    for text, result in zip(query.queries, data):
+        authors = hydrate_authors(
+            result["authors"]["author_ids"], result["authors"]["scores"], details
+        )
+        results.append(
+            APIAuthorsResult(
+                query=text, authors=authors, evidence=result.get("evidence")
+            )
+        )
+    return {"results": results}
+
+
+@app.post("/search_articles/batch")
+def search_articles_batch(
+    query: SearchArticlesBatchInputs,
+) -> dict[str, list[APIArticlesResult]]:
+    """Search articles for many queries with one embedding and one search call."""
+
+    data = cached_resources["engine"].search_articles_batch(**query.model_dump())
+
+    results = []
+    for text, result in zip(query.queries, data):
+        articles = [APIArticle(**article) for article in result["articles"]]
+        results.append(APIArticlesResult(query=text, articles=articles))
+    return {"results": results}
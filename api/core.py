@@ -1,18 +1,181 @@
-from functools import cache, partial
+import base64
+import bisect
+import copy
+import heapq
+import hmac
+import inspect
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import uuid
+from collections import Counter, OrderedDict
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import cache, partial, wraps
+from itertools import chain
+from typing import Any, Callable, Iterator, Protocol
 
 import altair as alt
 import numpy as np
 import pandas as pd
 from langchain.embeddings import OpenAIEmbeddings
-from pymilvus import Collection
 from sklearn.decomposition import PCA
 from sklearn.manifold import TSNE
 
+try:  # imported from the api package (tests) or from api/ (the API server)
+    from .reduction import reduce_embeddings
+except ImportError:
+    from reduction import reduce_embeddings
+
 VISUALIZATION_MAX_ARTICLES = 1000
+PLOT_TYPES = ["query", "author", "article"]  # columnar plot data type codes
+ARTICLE_OUTPUT_FIELDS = ["doi", "title", "publication_year", "author_id", "cited_by"]
+AUTHOR_OUTPUT_FIELDS = ["id", "first_name", "last_name", "unit_id"]
+GENERATION_CHECK_INTERVAL = 60  # seconds between checks for swapped collections
+RETRIEVAL_MODES = ["articles", "centroids"]
+AUTHOR_CANDIDATES_FACTOR = 4  # centroid retrieval: candidate authors per top_k
+MIN_AUTHOR_CANDIDATES = 20
+CENTROID_POOL_FACTOR = 2  # centroid retrieval: articles searched per pooled article
+METRICS_NAMESPACE = "scholar_search"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+PLOT_JOB_TTL = 600  # seconds a finished plot job can be fetched
+PLOT_SEARCH_THREADS = 4  # plot jobs searching at once
+ARTICLE_POOL_SIZE = 200  # articles kept for the next pages of search_articles
+POOL_TTL = 900  # seconds a candidate pool is kept for the next pages
+AUTHOR_ARTICLES_TTL = 3600  # seconds an author's sorted article ids are kept
+AUTHOR_ARTICLE_FIELDS = ["doi", "title", "publication_year", "cited_by"]
+AUTHOR_ARTICLE_SORTS = {"year": "publication_year", "citations": "cited_by"}
+NAME_CANDIDATES = 10  # ranked get_author candidates
+MIN_NAME_SCORE = 0.5  # below, a name is not considered a match
+MAX_NAME_SHORTLIST = 50  # distinct last names scored by prefix
+MAX_TYPO_SHORTLIST = 10  # distinct last names scored with edit distance
+SWAPPED_NAME_SCORE = 0.9  # below, also try first and last names swapped
+DEFAULT_INDEX_TYPE = "IVF_FLAT"
+RESCORE_FACTOR = 2  # reduced-dimension index: shortlist size per result
+MAX_SEARCH_LIMIT = 16384  # Milvus top-k limit
+QUERY_PAGE_SIZE = 4096  # rows per query page, below Milvus' query result window
+YEAR_PARTITION_PATTERN = re.compile(
+    r"year_(\d+)_(\d+)"
+)  # `vector_store.YEAR_PARTITIONS`
+
+# Search params by index type of the embedding field (see `vector_store.INDEX_CONFIGS`)
+SEARCH_PARAMS = {
+    "FLAT": {},
+    "IVF_FLAT": {"nprobe": 16},
+    "IVF_SQ8": {"nprobe": 32},  # quantized cells, probe more of them
+    "IVF_PQ": {"nprobe": 32},
+    "HNSW": {"ef": 128},  # raised to the limit if lower (HNSW needs ef >= limit)
+}
 
 ##### Basic functions #####
 
 
+class VectorCollection(Protocol):
+    """Vector store backend interface, the subset of `pymilvus.Collection` in use.
+
+    Implemented by `pymilvus.Collection` and `embedded_store.EmbeddedCollection`.
+    """
+
+    def load(self) -> None: ...
+
+    num_entities: int
+
+    def describe(self) -> dict: ...
+
+    def query(self, expr: str, output_fields: list[str], **kwargs) -> list[dict]: ...
+
+    def search(
+        self,
+        data: list[list[float]],
+        anns_field: str,
+        param: dict,
+        limit: int,
+        expr: str | None = None,
+        output_fields: list[str] | None = None,
+        **kwargs,
+    ) -> list: ...
+
+
+def get_index_type(collection: VectorCollection) -> str:
+    """Index type of the embedding field of a Milvus collection.
+
+    Backends without `indexes` (e.g., the embedded store) get `DEFAULT_INDEX_TYPE`,
+    whose search params they ignore.
+    """
+
+    for index in getattr(collection, "indexes", []):
+        if index.field_name == "embedding":
+            return index.params.get("index_type", DEFAULT_INDEX_TYPE)
+    return DEFAULT_INDEX_TYPE
+
+
+def make_search_param(index_type: str, limit: int) -> dict:
+    """Search `param` of an inner-product search on an index of this type."""
+
+    params = dict(SEARCH_PARAMS.get(index_type, SEARCH_PARAMS[DEFAULT_INDEX_TYPE]))
+    if "ef" in params:
+        params["ef"] = max(params["ef"], limit)
+    return {"metric_type": "IP", "params": params}
+
+
+def get_vector_dim(collection: VectorCollection) -> int | None:
+    """Dimension of the embedding field (None if the backend does not report it)."""
+
+    for field in collection.describe()["fields"]:
+        if field["name"] == "embedding":
+            return field.get("params", {}).get("dim")
+    return None
+
+
+def load_projection(collection: VectorCollection) -> tuple[np.ndarray, np.ndarray]:
+    """Embedding reduction (mean, components) stored at ingest.
+
+    Rows are the components by id, and the mean with id -1 (see
+    `vector_store.push_projection`).
+    """
+
+    rows = collection.query(expr="id >= -1", output_fields=["embedding"])
+    rows = sorted(rows, key=lambda row: row["id"])
+    vectors = np.array([row["embedding"] for row in rows], dtype=np.float32)
+    return vectors[0], vectors[1:]
+
+
+def get_year_partitions(collection: VectorCollection) -> list[tuple[int, int, str]]:
+    """Publication year partitions (first year, last year, name) of a collection.
+
+    Empty for backends without `partitions` (e.g., the embedded store) and for
+    collections ingested before partitioning.
+    """
+
+    partitions = []
+    for partition in getattr(collection, "partitions", []):
+        match = YEAR_PARTITION_PATTERN.fullmatch(partition.name)
+        if match:
+            first, last = map(int, match.groups())
+            partitions.append((first, last, partition.name))
+    return sorted(partitions)
+
+
+def select_year_partitions(
+    partitions: list[tuple[int, int, str]], since_year: int
+) -> list[str] | None:
+    """Partitions that can hold articles published since `since_year`.
+
+    None (search every partition) if the collection has no year partitions.
+    """
+
+    if not partitions:
+        return None
+    return [name for _, last, name in partitions if last >= since_year]
+
+
 def sort_dict_by_value(d: dict, reversed: bool = False) -> tuple[list, list]:
     sorted_keys, sorted_values = [], []
     for k, v in sorted(d.items(), key=lambda item: item[1], reverse=reversed):
@@ -26,66 +189,217 @@ def convert_article_result(result: dict) -> dict:
 
     flat_result = {}
     # CAUTION: result.distance is inner-product, i.e., similarity
+    flat_result["id"] = result.id
     flat_result["distance"] = 1 - result.distance
-    flat_result["author_id"] = str(result.entity.get("author_id"))
+    if "author_ids" in result.entity.fields:  # articles stored once per DOI
+        flat_result["author_ids"] = [str(i) for i in result.entity.get("author_ids")]
+        flat_result["author_id"] = next(iter(flat_result["author_ids"]), None)
+    elif "author_id" in result.entity.fields:  # articles stored once per author
+        flat_result["author_id"] = str(result.entity.get("author_id"))
+        flat_result["author_ids"] = [flat_result["author_id"]]
 
     # throw away misleading distance (it is similarity)
-    remaining_fields = set(result.entity.fields) - set(["distance", "author_id"])
+    remaining_fields = set(result.entity.fields) - set(
+        ["distance", "author_id", "author_ids"]
+    )
     for field in remaining_fields:
         flat_result[field] = result.entity.get(field)
     return flat_result
 
 
-def get_author_by_name(
-    first_name: str, last_name: str, author_collection: Collection
-) -> dict:
-    """Get author details from Milvus."""
+def expand_authorship(
+    articles: list[dict], author_ids: list[int] | None = None
+) -> list[dict]:
+    """One article per (article, author) pair, so that every co-author is credited.
+
+    If author_ids is given, only these authors are credited (e.g., a unit filter).
+    """
+
+    allowed = None if author_ids is None else {str(i) for i in author_ids}
+    return [
+        {**article, "author_id": author_id}
+        for article in articles
+        for author_id in article["author_ids"]
+        if allowed is None or author_id in allowed
+    ]
+
+
+def cap_articles_per_author(
+    articles: list[dict], m: int, author_ids: list[int] | None = None
+) -> list[dict]:
+    """Keep the m nearest articles of every author, articles sorted by distance.
+
+    A co-authored article is kept while one of its authors has fewer than m. If
+    author_ids is given, only these authors are counted (e.g., retrieval candidates).
+    """
+
+    allowed = None if author_ids is None else {str(i) for i in author_ids}
+    counts = Counter()
+    capped = []
+    for article in articles:
+        authors = [
+            author_id
+            for author_id in article["author_ids"]
+            if allowed is None or author_id in allowed
+        ]
+        if any(counts[author_id] < m for author_id in authors):
+            capped.append(article)
+            counts.update(authors)
+    return capped
+
+
+def top_m_sum(
+    group_idx: np.ndarray, weights: np.ndarray, m: int, n_groups: int | None = None
+) -> np.ndarray:
+    """Sum the `m` largest weights within each group.
+
+    Vectorized version of `np.sum(np.sort(weights[group_idx == i])[-m:])` for every group
+    `i`. Weights are sorted once by (group, weight), then the top `m` of every group are
+    gathered into one matrix per distinct kept length and summed row-wise, so the sums
+    are bit-for-bit identical to the per-group loop.
+
+    Args:
+        group_idx (np.ndarray): Group index (0 to n_groups - 1) of each weight, e.g., the inverse from `np.unique`.
+        weights (np.ndarray): Weights.
+        m (int): Maximum number of weights summed per group.
+        n_groups (int | None, optional): Number of groups. Defaults to `group_idx.max() + 1`.
+
+    Returns:
+        np.ndarray: Sum of top m weights of each group, shape (n_groups,).
+    """
+
+    group_idx = np.asarray(group_idx, dtype=np.intp)
+    weights = np.asarray(weights, dtype=np.float64)
+    if n_groups is None:
+        n_groups = int(group_idx.max()) + 1 if group_idx.size else 0
+
+    order = np.lexsort((weights, group_idx))
+    sorted_weights = weights[order]
+
+    counts = np.bincount(group_idx, minlength=n_groups)
+    ends = np.cumsum(counts)
+    kept = np.minimum(counts, m)
+
+    sums = np.zeros(n_groups, dtype=np.float64)
+    for length in np.unique(kept[kept > 0]):
+        groups = np.flatnonzero(kept == length)
+        columns = ends[groups, None] - length + np.arange(length)
+        sums[groups] = sorted_weights[columns].sum(axis=1)
+    return sums
+
+
+def rank_authors(
+    articles: list[dict],
+    top_k: int,
+    m: int = 5,
+    pow: float = 3.0,
+    ks: float = 1.0,
+    ka: float = 1.0,
+    kr: float = 1.0,
+) -> tuple[list[str], list[float]]:
+    """Rank authors by the weights of their top m relevant articles.
+
+    See `Engine.search_authors` for the scoring parameters.
+
+    Returns:
+        tuple[list[str], list[float]]: top_k author ids and their scores.
+    """
+
+    # Calculate author scores by their relevant articles
+    # Similarity $S$: (1 - distance) ** pow
+    # Authority $A$ = log(cited_by + 1)
+    # Recency $R$ = 1 / log(year_now - published_year + 2)
+    # Weight $W$ = S * A
+
+    author_ids = [article["author_id"] for article in articles]
+    c = np.array([article["cited_by"] for article in articles])
+    d = np.array([article["distance"] for article in articles])
+
+    y = []
+    for article in articles:
+        if article["publication_year"]:
+            y.append(article["publication_year"])
+        else:
+            y.append(1900)
+    y = np.array(y)
+
+    s = (1 - d) ** pow
+    a = np.log10(c + 1)
+    r = 1 / np.log10(y + 2)
+    w = ks * s + ka * a + kr * r
+
+    # Author score: sum of their top m article weights
+    unique_author_ids, idx = np.unique(author_ids, return_inverse=True)
+    scores = top_m_sum(idx, w, m, n_groups=len(unique_author_ids))
+    author_scores = dict(zip(unique_author_ids, scores))
+
+    top_ids, top_scores = sort_dict_by_value(author_scores, reversed=True)
+    return top_ids[:top_k], top_scores[:top_k]
+
+
+def query_all(
+    collection: VectorCollection,
+    expr: str,
+    output_fields: list[str],
+    page_size: int = QUERY_PAGE_SIZE,
+) -> list[dict]:
+    """All rows matching expr, past Milvus' query result window.
+
+    Paged on the primary key, like `pymilvus` query iterators: a query with a limit
+    returns its rows in primary key order, the next page starts after the last one.
+    """
+
+    rows, last_id = [], None
+    while True:
+        page_expr = expr if last_id is None else f"({expr}) and id > {last_id}"
+        page = collection.query(
+            expr=page_expr, output_fields=output_fields, limit=page_size
+        )
+        rows.extend(page)
+        if len(page) < page_size:
+            return rows
+        last_id = max(row["id"] for row in page)
 
-    first_name, last_name = first_name.title(), last_name.title()
 
-    _query = partial(
-        author_collection.query,
-        output_fields=["id", "first_name", "last_name", "unit_id"],
-        limit=1,
-    )
+def list_article_ids(
+    expr: str, article_collection: VectorCollection, sort_by: str | None = None
+) -> list[int]:
+    """Ids of the articles matching expr, sorted on a light query.
 
-    authors = _query(
-        expr=f"(first_name LIKE '{first_name}') and (last_name LIKE '{last_name}')"
-    )
+    sort_by is "year" (newest first), "citations" (most cited first) or None
+    (storage order).
+    """
 
-    if not authors:
-        # Fuzzy match first name and last name
-        authors = _query(
-            expr=f"(first_name LIKE '{first_name}%') and (last_name LIKE '{last_name}%')"
-        )
+    sort_field = AUTHOR_ARTICLE_SORTS.get(sort_by)
+    if sort_by is not None and sort_field is None:
+        raise ValueError(f"sort_by must be one of {list(AUTHOR_ARTICLE_SORTS)}")
 
-    if not authors:
-        # Fuzzy match first or last name
-        authors = _query(
-            expr=f"(first_name LIKE '{first_name}%') or (last_name LIKE '{last_name}%')"
-        )
+    articles = article_collection.query(
+        expr=expr, output_fields=[] if sort_field is None else [sort_field]
+    )
+    if sort_field is not None:
+        articles = sorted(articles, key=lambda a: (-(a[sort_field] or 0), a["id"]))
+    return [article["id"] for article in articles]
 
-    if not authors:
-        raise ValueError(f"Author with name {first_name} {last_name} not found")
-    return authors[0]
 
+def get_articles_by_ids(
+    article_ids: list[int],
+    article_collection: VectorCollection,
+    output_fields: list[str] = AUTHOR_ARTICLE_FIELDS,
+) -> list[dict]:
+    """Get many articles with a single query, in the order of article_ids."""
 
-def get_author_articles(
-    author_id: int, since_year: int, article_collection: Collection
-) -> dict:
-    """Get all articles from author with author_id."""
+    if not article_ids:
+        return []
 
     articles = article_collection.query(
-        expr=f"author_id == {author_id} and publication_year >= {since_year}",
-        output_fields=["doi", "title", "publication_year", "cited_by"],
+        expr=f"id in {list(article_ids)}", output_fields=output_fields
     )
-
-    if len(articles) == 0:
-        return None
-    return articles
+    articles_by_id = {article["id"]: article for article in articles}
+    return [articles_by_id[i] for i in article_ids if i in articles_by_id]
 
 
-def get_author_by_id(author_id: str, author_collection: Collection) -> dict:
+def get_author_by_id(author_id: str, author_collection: VectorCollection) -> dict:
     """Get author details from Milvus."""
 
     authors = author_collection.query(
@@ -99,18 +413,35 @@ def get_author_by_id(author_id: str, author_collection: Collection) -> dict:
     return authors[0]
 
 
-def get_authors_names(
-    authors_ids: list[int], author_collection: Collection
-) -> list[str]:
-    """Get authors' names from their ids."""
+def get_authors_by_ids(
+    author_ids: list[str | int],
+    author_collection: VectorCollection,
+    output_fields: list[str] = AUTHOR_OUTPUT_FIELDS,
+) -> list[dict]:
+    """Get details of many authors with a single query, in the order of author_ids.
+
+    Authors that cannot be found are skipped.
+    """
 
+    if not author_ids:
+        return []
+
+    author_ids = [int(author_id) for author_id in author_ids]
     authors = author_collection.query(
-        expr=f"id in {authors_ids}",
-        output_fields=["first_name", "last_name", "id", "unit_id"],
+        expr=f"id in {author_ids}", output_fields=output_fields
     )
 
-    # Sort by the original order of authors_ids
-    authors = sorted(authors, key=lambda author: authors_ids.index(author["id"]))
+    # Sort by the original order of author_ids
+    authors_by_id = {author["id"]: author for author in authors}
+    return [authors_by_id[i] for i in author_ids if i in authors_by_id]
+
+
+def get_authors_names(
+    authors_ids: list[int], author_collection: VectorCollection
+) -> list[str]:
+    """Get authors' names from their ids."""
+
+    authors = get_authors_by_ids(authors_ids, author_collection)
 
     if len(authors) != len(authors_ids):
         raise ValueError(f"Not all authors ids can be found in {authors_ids}.")
@@ -118,6 +449,595 @@ def get_authors_names(
     return [f"{author['first_name']} {author['last_name']}" for author in authors]
 
 
+##### Name index #####
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, accent-free name with single spaces ("José-Luis " -> "jose luis")."""
+
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(c for c in name if not unicodedata.combining(c)).lower()
+    return " ".join("".join(c if c.isalnum() else " " for c in name).split())
+
+
+def name_trigrams(token: str) -> set[str]:
+    """Character trigrams of a token, padded so that short tokens have some."""
+
+    padded = f"  {token} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str) -> int:
+    """Levenshtein distance (insertions, deletions and substitutions)."""
+
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            )
+        previous = current
+    return previous[-1]
+
+
+def name_similarity(query: str, name: str) -> float:
+    """Similarity of normalized names in [0, 1], prefixes (e.g., initials) score high."""
+
+    if not query or not name:
+        return 0.0
+    if query == name:
+        return 1.0
+    if name.startswith(query):
+        return 0.85 + 0.1 * len(query) / len(name)
+    longest = max(len(query), len(name))
+    if abs(len(query) - len(name)) > longest / 2:
+        return 0.0  # too far anyway, skip the edit distance
+    return max(0.0, 1 - edit_distance(query, name) / longest)
+
+
+class NameIndex:
+    """In-memory author name index: exact and prefix names, trigrams, typo tolerance.
+
+    Built from the authors collection at `Engine.refresh` (i.e., on collection swap).
+    Distinct last names are shortlisted by prefix (bisect of the sorted names) or,
+    for misspellings, by shared trigrams, scored with `name_similarity`, and only then
+    expanded to authors, whose first names are scored too. Distinct names are far
+    fewer than authors, so lookups take well under a millisecond.
+    """
+
+    def __init__(self, authors: list[dict]) -> None:
+        self.authors = {author["id"]: author for author in authors}
+        self.first_names = {
+            author["id"]: normalize_name(author["first_name"]) for author in authors
+        }
+
+        self.last_names: dict[str, list[int]] = {}
+        for author in authors:
+            last_name = normalize_name(author["last_name"])
+            self.last_names.setdefault(last_name, []).append(author["id"])
+        self.sorted_last_names = sorted(self.last_names)
+
+        self.trigrams: dict[str, list[str]] = {}
+        for last_name in self.sorted_last_names:
+            for trigram in name_trigrams(last_name):
+                self.trigrams.setdefault(trigram, []).append(last_name)
+
+    def __len__(self) -> int:
+        return len(self.authors)
+
+    def _shortlist(self, last_name: str) -> dict[str, float]:
+        """Distinct last names similar to last_name, with their similarity."""
+
+        candidates = set()
+        start = bisect.bisect_left(self.sorted_last_names, last_name)
+        for name in self.sorted_last_names[start : start + MAX_NAME_SHORTLIST]:
+            if not name.startswith(last_name):
+                break
+            candidates.add(name)
+
+        # Typos (no name starts with last_name): names with the most similar trigrams
+        if not candidates:
+            trigrams = name_trigrams(last_name)
+            counts = Counter(
+                chain.from_iterable(self.trigrams.get(t, ()) for t in trigrams)
+            )
+            dice = {
+                name: 2 * count / (len(trigrams) + len(name) + 2)  # Dice coefficient
+                for name, count in counts.items()
+            }
+            candidates.update(heapq.nlargest(MAX_TYPO_SHORTLIST, dice, key=dice.get))
+
+        similarities = {name: name_similarity(last_name, name) for name in candidates}
+        return {name: s for name, s in similarities.items() if s >= MIN_NAME_SCORE}
+
+    def _search(self, first_name: str, last_name: str) -> dict[int, float]:
+        scores = {}
+        first_similarities: dict[str, float] = {}  # authors often share first names
+        for name, similarity in self._shortlist(last_name).items():
+            for author_id in self.last_names[name]:
+                first = self.first_names[author_id]
+                if first not in first_similarities:
+                    first_similarities[first] = name_similarity(first_name, first)
+                scores[author_id] = 0.6 * similarity + 0.4 * first_similarities[first]
+        return scores
+
+    def search(
+        self, first_name: str, last_name: str, limit: int = NAME_CANDIDATES
+    ) -> list[dict]:
+        """Best matching authors, with their name `score`, best first.
+
+        The last name weighs more than the first name. First and last names given in
+        the wrong order still match, slightly penalized.
+        """
+
+        first_name, last_name = normalize_name(first_name), normalize_name(last_name)
+        if not last_name:
+            return []
+
+        scores = self._search(first_name, last_name)
+        if max(scores.values(), default=0.0) < SWAPPED_NAME_SCORE and first_name:
+            for author_id, score in self._search(last_name, first_name).items():
+                scores[author_id] = max(scores.get(author_id, 0.0), 0.9 * score)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [
+            {**self.authors[author_id], "score": score}
+            for author_id, score in ranked[:limit]
+            if score >= MIN_NAME_SCORE
+        ]
+
+
+##### Instrumentation #####
+
+
+def format_labels(labels: tuple[tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+class Metrics:
+    """Thread-safe Prometheus-style histograms, counters and callback metrics.
+
+    Rendered in the Prometheus text format by `render` (served on `/metrics`).
+    """
+
+    def __init__(self, namespace: str = METRICS_NAMESPACE) -> None:
+        self.namespace = namespace
+        self._buckets: dict[str, tuple[float, ...]] = {}
+        self._histograms: dict[tuple, list] = {}  # [bucket counts, sum, count]
+        self._counters: dict[tuple, float] = {}
+        self._callbacks: dict[tuple, tuple[str, Callable[[], float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        labels: dict | None = None,
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        """Add an observation to a histogram."""
+
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            buckets = self._buckets.setdefault(name, buckets)
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * len(buckets), 0.0, 0]
+            i = bisect.bisect_left(buckets, value)
+            if i < len(buckets):
+                histogram[0][i] += 1
+            histogram[1] += value
+            histogram[2] += 1
+
+    def inc(self, name: str, value: float = 1, labels: dict | None = None) -> None:
+        """Increment a counter."""
+
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def register(
+        self,
+        name: str,
+        function: Callable[[], float],
+        labels: dict | None = None,
+        kind: str = "gauge",
+    ) -> None:
+        """Register a metric read at render time (e.g., cache statistics)."""
+
+        key = (name, tuple(sorted((labels or {}).items())))
+        with self._lock:
+            self._callbacks[key] = (kind, function)
+
+    def render(self) -> str:
+        """Prometheus text exposition format."""
+
+        with self._lock:
+            histograms = {
+                key: ([*counts], total, count)
+                for key, (counts, total, count) in self._histograms.items()
+            }
+            counters = dict(self._counters)
+            callbacks = dict(self._callbacks)
+
+        lines = []
+        declared = set()
+
+        def declare(name: str, kind: str) -> str:
+            name = f"{self.namespace}_{name}"
+            if name not in declared:
+                declared.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+            return name
+
+        for (name, labels), (counts, total, count) in sorted(histograms.items()):
+            metric = declare(name, "histogram")
+            cumulative = 0
+            for bound, bucket_count in zip(self._buckets[name], counts):
+                cumulative += bucket_count
+                bucket_labels = format_labels(labels + (("le", f"{bound:g}"),))
+                lines.append(f"{metric}_bucket{bucket_labels} {cumulative}")
+            bucket_labels = format_labels(labels + (("le", "+Inf"),))
+            lines.append(f"{metric}_bucket{bucket_labels} {count}")
+            lines.append(f"{metric}_sum{format_labels(labels)} {total:g}")
+            lines.append(f"{metric}_count{format_labels(labels)} {count}")
+
+        for (name, labels), value in sorted(counters.items()):
+            metric = declare(name, "counter")
+            lines.append(f"{metric}{format_labels(labels)} {value:g}")
+
+        for (name, labels), (kind, function) in sorted(callbacks.items()):
+            metric = declare(name, kind)
+            lines.append(f"{metric}{format_labels(labels)} {function():g}")
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+_request_spans: ContextVar[list | None] = ContextVar("request_spans", default=None)
+
+
+def start_spans() -> list[tuple[str, float]]:
+    """Collect the spans of the current request (context), returns the collection."""
+
+    spans = []
+    _request_spans.set(spans)
+    return spans
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a stage: recorded in the stage histogram and in the request's spans."""
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        duration = time.perf_counter() - start
+        metrics.observe("stage_duration_seconds", duration, {"stage": name})
+        spans = _request_spans.get()
+        if spans is not None:
+            spans.append((name, duration))
+
+
+def format_server_timing(spans: list[tuple[str, float]]) -> str:
+    """`Server-Timing` header value, durations in milliseconds."""
+    return ", ".join(f"{name};dur={duration * 1000:.1f}" for name, duration in spans)
+
+
+##### Caching #####
+
+
+def normalize_query(text: str) -> str:
+    """Normalize query text (case and whitespace), e.g., for cache keys."""
+    return " ".join(text.split()).lower()
+
+
+class TTLCache:
+    """Thread-safe LRU cache bounded by size and time-to-live, with hit/miss counters."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float | None = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _is_expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Get a value, counting the lookup as a hit or a miss."""
+
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and self._is_expired(item[0]):
+                del self._data[key]
+                item = None
+
+            if item is None:
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[1]
+
+    def set(self, key: Any, value: Any, created: float | None = None) -> None:
+        """Set a value, evicting the least recently used entries when full."""
+
+        with self._lock:
+            self._data[key] = (time.time() if created is None else created, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def stats(self) -> dict:
+        return {"size": len(self), "hits": self.hits, "misses": self.misses}
+
+
+class EmbeddingCache(TTLCache):
+    """Query embedding cache, keyed by normalized query text.
+
+    The in-memory LRU sits in front of an optional SQLite file (`path`), which can be
+    shared by all workers on a host and survives restarts.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        ttl: float | None = 30 * 24 * 3600,
+        path: str | None = None,
+        namespace: str = "",
+    ) -> None:
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self.path = path
+        self.namespace = namespace
+        self.disk_hits = 0
+
+        if self.path is not None:
+            with self._connect() as connection:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings "
+                    "(key TEXT PRIMARY KEY, created REAL, vector BLOB)"
+                )
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5.0)
+
+    def make_key(self, text: str) -> str:
+        return f"{self.namespace}:{normalize_query(text)}"
+
+    def _disk_get(self, key: str) -> tuple[float, list[float]] | None:
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT created, vector FROM embeddings WHERE key = ?", (key,)
+            ).fetchone()
+
+        if row is None or self._is_expired(row[0]):
+            return None
+        return row[0], np.frombuffer(row[1], dtype="<f8").tolist()
+
+    def _disk_set(self, key: str, vector: list[float]) -> None:
+        blob = np.asarray(vector, dtype="<f8").tobytes()
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)",
+                (key, time.time(), blob),
+            )
+
+    def _lookup(self, key: str) -> list[float] | None:
+        """Get a vector from memory, then from disk."""
+
+        vector = self.get(key)
+        if vector is None and self.path is not None:
+            item = self._disk_get(key)
+            if item is not None:
+                self.disk_hits += 1
+                self.set(key, item[1], created=item[0])
+                vector = item[1]
+        return vector
+
+    def _store(self, key: str, vector: list[float]) -> None:
+        self.set(key, vector)
+        if self.path is not None:
+            self._disk_set(key, vector)
+
+    def get_or_compute(
+        self, text: str, compute: Callable[[str], list[float]]
+    ) -> list[float]:
+        """Get the embedding of text from memory, then disk, else compute and store it."""
+
+        key = self.make_key(text)
+        vector = self._lookup(key)
+        if vector is None:
+            vector = compute(text)
+            self._store(key, vector)
+        return vector
+
+    def get_or_compute_many(
+        self, texts: list[str], compute_many: Callable[[list[str]], list[list[float]]]
+    ) -> list[list[float]]:
+        """Get embeddings of many texts, computing all uncached ones in a single call."""
+
+        keys = [self.make_key(text) for text in texts]
+
+        vectors, missing = {}, {}
+        for key, text in zip(keys, texts):
+            if key in vectors or key in missing:
+                continue
+            vector = self._lookup(key)
+            if vector is None:
+                missing[key] = text
+            else:
+                vectors[key] = vector
+
+        if missing:
+            computed = compute_many(list(missing.values()))
+            for key, vector in zip(missing, computed):
+                self._store(key, vector)
+                vectors[key] = vector
+
+        return [vectors[key] for key in keys]
+
+    @property
+    def stats(self) -> dict:
+        return {**super().stats, "disk_hits": self.disk_hits}
+
+
+class StaleWhileRevalidate:
+    """Single-value cache that serves stale values while refreshing in the background.
+
+    The value is seeded from a json snapshot file (if any), which is rewritten after
+    every successful refresh, so upstream outages never block readers.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[], Any],
+        ttl: float,
+        snapshot_path: str | None = None,
+        retry_interval: float = 60,
+    ) -> None:
+        self.fetch = fetch
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+        self.retry_interval = retry_interval
+        self._value = None
+        self._updated = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+
+        if self.snapshot_path is not None and os.path.exists(self.snapshot_path):
+            with open(self.snapshot_path, "r") as f:
+                self._value = json.load(f)
+            self._updated = os.path.getmtime(self.snapshot_path)
+
+    def refresh(self) -> None:
+        """Fetch a fresh value, keeping the stale one if it fails."""
+
+        try:
+            value = self.fetch()
+        except Exception as e:
+            logging.error(f"Refresh failed, serving stale value: {e}")
+            # Retry after retry_interval instead of on every read
+            self._updated = time.time() - self.ttl + self.retry_interval
+            self._refreshing = False
+            return
+
+        self._value, self._updated = value, time.time()
+        self._refreshing = False
+
+        if self.snapshot_path is not None:
+            try:
+                tmp_path = f"{self.snapshot_path}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(value, f)
+                os.replace(tmp_path, self.snapshot_path)
+            except OSError as e:
+                logging.error(f"Cannot write snapshot {self.snapshot_path}: {e}")
+
+    def get(self) -> Any:
+        """Get the value, fetching synchronously only when there is nothing to serve."""
+
+        if self._value is None:
+            self.refresh()
+            if self._value is None:
+                raise RuntimeError("No value available.")
+            return self._value
+
+        if time.time() - self._updated > self.ttl:
+            with self._lock:
+                start, self._refreshing = not self._refreshing, True
+            if start:
+                threading.Thread(target=self.refresh, daemon=True).start()
+        return self._value
+
+
+def cached_response(method: Callable) -> Callable:
+    """Serve an Engine search method from the engine's response cache.
+
+    The key holds the method name, the corpus generation, the normalized query and every
+    other argument, so entries from swapped-out collections can never be served. Plots
+    label the query as typed, so outputs with a plot are keyed on the query as is.
+    Callers get a copy of the cached output, which they are free to modify.
+    """
+
+    signature = inspect.signature(method)
+
+    @wraps(method)
+    def wrapper(self: "Engine", *args, **kwargs) -> dict:
+        self.check_generation()
+
+        arguments = signature.bind(self, *args, **kwargs)
+        arguments.apply_defaults()
+        params = []
+        for name, value in arguments.arguments.items():
+            if name == "self":
+                continue
+            if name == "query" and not arguments.arguments.get("with_plot"):
+                value = normalize_query(value)
+            if isinstance(value, list):
+                value = tuple(value)
+            params.append((name, value))
+
+        key = (method.__name__, self.generation, tuple(params))
+        output = self.response_cache.get(key)
+        if output is None:
+            output = method(self, *args, **kwargs)
+            self.response_cache.set(key, output)
+        return copy.deepcopy(output)
+
+    return wrapper
+
+
+def sign_cursor(payload: bytes, key: bytes) -> bytes:
+    return base64.urlsafe_b64encode(hmac.digest(key, payload, "sha256"))
+
+
+def encode_cursor(state: dict, key: bytes) -> str:
+    """Opaque pagination cursor (url-safe base64 json), signed with key.
+
+    The signature (HMAC-SHA256) keeps clients from altering the search parameters,
+    which are used as is to recompute an expired pool.
+    """
+    payload = base64.urlsafe_b64encode(json.dumps(state).encode())
+    return (payload + b"." + sign_cursor(payload, key)).decode()
+
+
+def decode_cursor(cursor: str, key: bytes) -> dict:
+    payload, _, signature = cursor.encode().partition(b".")
+    if not hmac.compare_digest(signature, sign_cursor(payload, key)):
+        raise ValueError("Invalid cursor")
+    try:
+        state = json.loads(base64.urlsafe_b64decode(payload))
+    except ValueError:  # includes binascii and json errors
+        raise ValueError("Invalid cursor")
+    if (
+        not isinstance(state, dict)
+        or state.get("kind") not in ["articles", "authors"]
+        or not isinstance(state.get("pool"), str)
+        or not isinstance(state.get("offset"), int)
+        or state["offset"] < 0
+        or not isinstance(state.get("params"), dict)
+    ):
+        raise ValueError("Invalid cursor")
+    return state
+
+
 ##### Plotting #####
 
 
@@ -145,70 +1065,89 @@ def pca_projection(
     return {"x": data_2d[:, 0].tolist(), "y": data_2d[:, 1].tolist()}
 
 
+def knn_query_position(articles: list[dict], k: int = 10) -> tuple[float, float]:
+    """Place the query among stored 2d coordinates.
+
+    Similarity-weighted mean of the coordinates of the k nearest (ranked) articles.
+    """
+
+    nearest = articles[:k]
+    weights = np.array([max(1 - article["distance"], 1e-6) for article in nearest])
+    xy = np.array([[article["x"], article["y"]] for article in nearest])
+    query_x, query_y = weights @ xy / weights.sum()
+    return float(query_x), float(query_y)
+
+
 class PlotDataMaker:
     def __init__(
         self,
-        author_collection: Collection,
-        article_collection: Collection,
+        author_collection: VectorCollection,
         projection_function: callable,
     ) -> None:
         self.author_collection = author_collection
-        self.article_collection = article_collection
         self.projection_function = projection_function
+        self.has_author_coordinates = False  # author x, y stored at ingest
 
     def get_embeddings(
-        self, dois: list[str]
+        self, articles: list[dict], fields: tuple[str, ...] = ("embedding",)
     ) -> tuple[list, list, list, list, np.array]:
-        """Get embeddings of articles by their DOIs.
+        """Unpack vectors of retrieved articles and their authors' centroids.
 
         Args:
-            dois (list[str]): List of article DOIs.
+            articles (list[dict]): Ranked article results.
+            fields (tuple[str, ...]): Article fields concatenated into the vector, i.e., `("embedding",)` or stored 2d coordinates `("x", "y")`. With stored coordinates, authors are placed at their own stored coordinates if any.
 
         Returns:
             ids (list): List of article DOIs or author ids.
             parent_ids (list): List of parent ids (author ids).
             labels (list): List of article titles or author names.
             types (list): List of types (article or author).
-            embeddings (np.array): Embeddings of articles or authors (centroid).
+            embeddings (np.array): Vectors of articles or authors (centroid).
         """
 
-        articles = self.article_collection.query(
-            expr=f"doi in {dois}",
-            output_fields=["doi", "author_id", "title", "embedding"],
-        )
-
-        # Sort articles by the original order of DOIs
-        # TODO: Improve multiple authors handling
-        articles = sorted(articles, key=lambda article: dois.index(article["doi"]))
         articles_titles = [article["title"] for article in articles]
+        articles_author_ids = [int(article["author_id"]) for article in articles]
 
-        # Unpack article embeddings
+        # Unpack article vectors
         articles_embeddings = np.stack(
-            [article["embedding"] for article in articles], axis=0
+            [np.hstack([article[field] for field in fields]) for article in articles],
+            axis=0,
         )
 
-        # Calculate author's centroid
-        author_embeddings = {}
-        for article in articles:
-            author_id = article["author_id"]
-            if author_id not in author_embeddings:
-                author_embeddings[author_id] = []
-            author_embeddings[author_id].append(article["embedding"])
-
-        author_ids = []
-        author_vectors = []
-        for author_id, embeddings in author_embeddings.items():
-            author_ids.append(author_id)
-            author_vectors.append(np.mean(embeddings, axis=0))
-
-        author_centroid = np.stack(author_vectors, axis=0)
+        if fields == ("x", "y") and self.has_author_coordinates:
+            # Projection of the author's embedding (all of their articles)
+            author_ids = list(dict.fromkeys(articles_author_ids))
+            authors = get_authors_by_ids(
+                author_ids,
+                self.author_collection,
+                output_fields=["first_name", "last_name", "x", "y"],
+            )
+            if len(authors) != len(author_ids):
+                raise ValueError(f"Not all authors ids can be found in {author_ids}.")
+            author_centroid = np.array([[a["x"], a["y"]] for a in authors])
+            author_names = [f"{a['first_name']} {a['last_name']}" for a in authors]
+        else:
+            # Calculate author's centroid
+            author_embeddings = {}
+            for author_id, embedding in zip(articles_author_ids, articles_embeddings):
+                if author_id not in author_embeddings:
+                    author_embeddings[author_id] = []
+                author_embeddings[author_id].append(embedding)
+
+            author_ids = []
+            author_vectors = []
+            for author_id, embeddings in author_embeddings.items():
+                author_ids.append(author_id)
+                author_vectors.append(np.mean(embeddings, axis=0))
+
+            author_centroid = np.stack(author_vectors, axis=0)
+            author_names = get_authors_names(author_ids, self.author_collection)
 
         # Package articles and authors embeddings with metadata
         ids = [article["doi"] for article in articles] + author_ids
 
-        parent_ids = [article["author_id"] for article in articles] + author_ids
+        parent_ids = articles_author_ids + author_ids
 
-        author_names = get_authors_names(author_ids, self.author_collection)
         labels = articles_titles + author_names
 
         types = ["article"] * len(articles) + ["author"] * len(author_ids)
@@ -217,38 +1156,65 @@ class PlotDataMaker:
 
         return ids, parent_ids, labels, types, embeddings
 
-    def make_plot_data(self, query_embedding: np.array, dois: list[str]) -> dict:
-        """Convert data to a dictionary that can be consumed by Pandas."""
-        ids, parent_ids, label, types, article_author_embeddings = self.get_embeddings(
-            dois
-        )
-
-        # Obtain x, y
-        output = self.projection_function(query_embedding, article_author_embeddings)
-
-        # Add metadata
-        output["id"] = ["query"] + ids
-        output["parent_id"] = [0] + parent_ids
-        output["label"] = [None] + label  # Inject proper label later
-        output["type"] = ["query"] + types
-
-        # Add url
-        def _to_url(id: str, label: str, row_type: str) -> str:
-            """Convert id to url."""
-            if row_type == "query":
-                return None
-            elif row_type == "author":
-                return f"https://discover.datascience.wisc.edu/?kind=name&target=authors&query={label.replace(' ', '%20')}"
-            elif row_type == "article":
-                return f"https://doi.org/{id}"
-
-        output["url"] = [
-            _to_url(id, label, row_type)
-            for id, label, row_type in zip(
-                output["id"], output["label"], output["type"]
+    def make_plot_inputs(self, query_embedding: np.array, articles: list[dict]) -> dict:
+        """Gather plot inputs (needs the author collection), see `finish_plot_data`."""
+
+        inputs = {"query_embedding": query_embedding, "xy": None, "embeddings": None}
+        if not articles:
+            # Nothing retrieved (e.g., empty unit), plot the query alone
+            inputs.update(ids=[], parent_ids=[], labels=[], types=[])
+            inputs["xy"] = np.zeros((1, 2))
+        elif "x" in articles[0]:
+            # Coordinates precomputed at ingest, for articles and authors
+            ids, parent_ids, labels, types, xy = self.get_embeddings(
+                articles, fields=("x", "y")
             )
-        ]
-        return output
+            query_xy = np.array([knn_query_position(articles)])
+            inputs.update(ids=ids, parent_ids=parent_ids, labels=labels, types=types)
+            inputs["xy"] = np.concatenate([query_xy, xy], axis=0)
+        else:
+            ids, parent_ids, labels, types, embeddings = self.get_embeddings(articles)
+            inputs.update(ids=ids, parent_ids=parent_ids, labels=labels, types=types)
+            inputs["embeddings"] = embeddings
+        return inputs
+
+
+def finish_plot_data(inputs: dict, projection_function: Callable) -> dict:
+    """Project (if not stored) and label plot inputs from `make_plot_inputs`.
+
+    CPU-bound and free of I/O, so it can run in a worker process.
+    """
+
+    ids, parent_ids = inputs["ids"], inputs["parent_ids"]
+    label, types = inputs["labels"], inputs["types"]
+    if inputs["xy"] is not None:
+        xy = inputs["xy"]
+        output = {"x": xy[:, 0].tolist(), "y": xy[:, 1].tolist()}
+    else:
+        # Obtain x, y
+        output = projection_function(inputs["query_embedding"], inputs["embeddings"])
+
+    # Add metadata
+    output["id"] = ["query"] + ids
+    output["parent_id"] = [0] + parent_ids
+    output["label"] = [None] + label  # Inject proper label later
+    output["type"] = ["query"] + types
+
+    # Add url
+    def _to_url(id: str, label: str, row_type: str) -> str:
+        """Convert id to url."""
+        if row_type == "query":
+            return None
+        elif row_type == "author":
+            return f"https://discover.datascience.wisc.edu/?kind=name&target=authors&query={label.replace(' ', '%20')}"
+        elif row_type == "article":
+            return f"https://doi.org/{id}"
+
+    output["url"] = [
+        _to_url(id, label, row_type)
+        for id, label, row_type in zip(output["id"], output["label"], output["type"])
+    ]
+    return output
 
 
 def apply_font_sizes(
@@ -270,27 +1236,43 @@ def apply_font_sizes(
     )
 
 
-def plot_2d_projection(data: dict, width: int = 800, height: int = 600) -> str:
-    """Plot 2d projection of embeddings."""
+def make_chart(
+    source: pd.DataFrame | alt.NamedData, width: int = 800, height: int = 600
+) -> alt.LayerChart:
+    """Make the 2d projection chart.
 
-    df = pd.DataFrame(data)
-    df["size"] = df.type.map({"query": 100, "author": 10, "article": 5})
-    color_domain = ["query", "author", "article"]
+    With `alt.NamedData`, the data is bound by the client from columnar plot data and
+    the display fields (type, size, url) are derived in the chart itself.
+    """
+
+    color_domain = PLOT_TYPES
     color_range = ["#c5050c", "#ff8811", "#537dab"]
 
+    base = alt.Chart(source)
+    if isinstance(source, alt.NamedData):
+        base = base.transform_calculate(
+            type=f"{PLOT_TYPES}[datum.type_code]",
+            size="[100, 10, 5][datum.type_code]",
+            url=(
+                "datum.type_code == 2 ? 'https://doi.org/' + datum.id : "
+                "datum.type_code == 1 ? "
+                "'https://discover.datascience.wisc.edu/?kind=name&target=authors&query='"
+                " + replace(datum.label, regexp(' ', 'g'), '%20') : null"
+            ),
+        )
+
     author_selector = alt.selection_point(fields=["parent_id"])
     base = (
-        alt.Chart(df)
-        .mark_circle()
+        base.mark_circle()
         .encode(
-            x=alt.X("x:Q", title=None, axis=None),
-            y=alt.Y("y:Q", title=None, axis=None),
+            x=alt.X("x:Q", title=None, axis=None, scale=alt.Scale(zero=False)),
+            y=alt.Y("y:Q", title=None, axis=None, scale=alt.Scale(zero=False)),
             color=alt.Color("type:N")
             .scale(domain=color_domain, range=color_range)
             .legend(orient="top-left"),
-            size=alt.Size("size", legend=None),
+            size=alt.Size("size:Q", legend=None),
             opacity=alt.condition(author_selector, alt.value(1.0), alt.value(0.3)),
-            tooltip=["label:N", "id:N", "parent_id"],
+            tooltip=["label:N", "id:N", "parent_id:Q"],
             href="url:N",
         )
         .add_params(author_selector)
@@ -308,37 +1290,380 @@ def plot_2d_projection(data: dict, width: int = 800, height: int = 600) -> str:
     # Modify click behavior to open in new tab
     chart["usermeta"] = {"embedOptions": {"loader": {"target": "_blank"}}}
 
-    return chart.to_json()
+    return chart
+
+
+def plot_2d_projection(data: dict, width: int = 800, height: int = 600) -> str:
+    """Plot 2d projection of embeddings."""
+
+    df = pd.DataFrame(data)
+    df["size"] = df.type.map({"query": 100, "author": 10, "article": 5})
+    return make_chart(df, width=width, height=height).to_json()
+
+
+@cache
+def get_plot_spec(width: int = 800, height: int = 600) -> str:
+    """Static Vega-Lite spec for columnar plot data, bound to the data source `points`."""
+    return make_chart(
+        alt.NamedData(name="points"), width=width, height=height
+    ).to_json()
+
+
+def encode_float32(values: list[float]) -> str:
+    """Encode floats as base64 of little-endian float32."""
+    return base64.b64encode(np.asarray(values, dtype="<f4").tobytes()).decode("ascii")
+
+
+def to_columnar_plot_data(data: dict) -> dict:
+    """Convert plot data to compact columns to be bound to `get_plot_spec`.
+
+    x and y are base64 little-endian float32, type_code indexes PLOT_TYPES.
+    """
+
+    return {
+        "x": encode_float32(data["x"]),
+        "y": encode_float32(data["y"]),
+        "type_code": [PLOT_TYPES.index(t) for t in data["type"]],
+        "id": data["id"],
+        "parent_id": data["parent_id"],
+        "label": data["label"],
+    }
+
+
+def render_plot(
+    query: str,
+    plot_inputs: dict,
+    projection_function: Callable,
+    plot_format: str = "altair",
+) -> dict:
+    """Plot output (`plot_json` or `plot_data`) from `PlotDataMaker.make_plot_inputs`.
+
+    Picklable and free of I/O, it runs inline or as a plot job in a worker process.
+    Spans recorded in a worker never reach the parent, so callers time it (`render`).
+    """
+
+    plot_data = finish_plot_data(plot_inputs, projection_function)
+    # Inject the query back into the label in plot data
+    plot_data["label"][0] = query
+
+    if plot_format == "columnar":
+        return {"plot_data": to_columnar_plot_data(plot_data)}
+    return {"plot_json": plot_2d_projection(plot_data)}
 
 
 class Engine:
-    """Search engine that talks to Milvus."""
+    """Search engine that talks to Milvus (or another `VectorCollection` backend)."""
 
     def __init__(
         self,
-        author_collection: Collection,
-        article_collection: Collection,
+        author_collection: VectorCollection,
+        article_collection: VectorCollection,
         embeddings: OpenAIEmbeddings,
+        embedding_cache: EmbeddingCache | None = None,
+        response_cache: TTLCache | None = None,
+        centroid_collection: VectorCollection | None = None,
+        plot_executor: Executor | None = None,
+        pool_cache_size: int = 256,
+        author_articles_cache_size: int = 1024,
+        vector_collection: VectorCollection | None = None,
+        projection_collection: VectorCollection | None = None,
+        cursor_key: bytes | None = None,
+        collection_opener: Callable[[str], VectorCollection | None] | None = None,
     ) -> None:
         self.author_collection = author_collection
         self.article_collection = article_collection
+        self.centroid_collection = centroid_collection
+
+        # Reduced-dimension article index: full vectors by id, and the projection.
+        # With a collection_opener (collection by name, None if missing), they are
+        # looked up again on every refresh, a re-ingestion may change the dimension.
+        self.vector_collection = vector_collection
+        self.projection_collection = projection_collection
+        self.collection_opener = collection_opener
         self.embeddings = embeddings
+        self.embedding_cache = (
+            embedding_cache if embedding_cache is not None else EmbeddingCache()
+        )
+        self.response_cache = (
+            response_cache
+            if response_cache is not None
+            else TTLCache(maxsize=1024, ttl=3600)
+        )
+
+        # Plot jobs (futures) by id, run inline when there is no executor
+        self.plot_executor = plot_executor
+        self.plot_jobs = TTLCache(maxsize=256, ttl=PLOT_JOB_TTL)
+        self.plot_searches = None
+        if plot_executor is not None:
+            # Plot jobs search here (I/O), then render in plot_executor (CPU)
+            self.plot_searches = ThreadPoolExecutor(max_workers=PLOT_SEARCH_THREADS)
+
+        # Candidate pools for the next pages, by id, and the key signing their cursors
+        self.pools = TTLCache(maxsize=pool_cache_size, ttl=POOL_TTL)
+        self.cursor_key = cursor_key if cursor_key else os.urandom(32)
+
+        # Sorted article ids of recently viewed authors, for their article pages
+        self.author_articles = TTLCache(
+            maxsize=author_articles_cache_size, ttl=AUTHOR_ARTICLES_TTL
+        )
 
         # load collections into memory
         self.author_collection.load()
         self.article_collection.load()
+        if self.centroid_collection is not None:
+            self.centroid_collection.load()
 
         self.plot_maker = PlotDataMaker(
             self.author_collection,
-            self.article_collection,
             projection_function=pca_projection,
         )
 
-    @cache
+        # In-memory author indexes, rebuilt when ingestion swaps the collections
+        self._refresh_lock = threading.Lock()
+        self._generation_checked_at = time.time()
+        self.refresh()
+
+    def get_generation(self) -> tuple[int, ...]:
+        """Corpus generation: ingestion renames new collections in, which changes their ids."""
+        collections = [self.author_collection, self.article_collection]
+        if self.centroid_collection is not None:
+            collections.append(self.centroid_collection)
+        return tuple(
+            collection.describe()["collection_id"] for collection in collections
+        )
+
+    def refresh(self) -> None:
+        """(Re)build in-memory author indexes from the authors collection."""
+
+        generation = self.get_generation()
+        self.projection = self._load_projection()
+
+        authors = query_all(
+            self.author_collection,
+            expr="id >= 0",
+            output_fields=["id", "first_name", "last_name", "unit_id"],
+        )
+
+        author_units = {author["id"]: author["unit_id"] for author in authors}
+        unit_authors: dict[int, list[int]] = {}
+        for author_id, unit_id in author_units.items():
+            unit_authors.setdefault(unit_id, []).append(author_id)
+
+        self.author_units, self.unit_authors = author_units, unit_authors
+        self.name_index = NameIndex(authors)
+
+        # Articles stored once per DOI list their (faculty) authors in `author_ids`
+        article_fields = self.article_collection.describe()["fields"]
+        article_fields = [field["name"] for field in article_fields]
+        self.has_author_ids = "author_ids" in article_fields
+
+        # Plot from 2d coordinates stored at ingest if available
+        author_fields = self.author_collection.describe()["fields"]
+        self.has_stored_coordinates = "x" in article_fields
+        self.plot_maker.has_author_coordinates = "x" in [
+            field["name"] for field in author_fields
+        ]
+
+        # Search params follow the index each collection was built with
+        self.article_index_type = get_index_type(self.article_collection)
+        self.article_partitions = get_year_partitions(self.article_collection)
+        if self.centroid_collection is not None:
+            self.centroid_index_type = get_index_type(self.centroid_collection)
+            # Sub-centroids per author, set at ingest (`vector_store.AUTHOR_CENTROIDS`)
+            self.centroids_per_author = -(
+                -self.centroid_collection.num_entities // max(len(author_units), 1)
+            )
+
+        self.generation = generation
+        self.response_cache.clear()  # drop outputs of the previous generation
+        self.author_articles.clear()
+
+    def _load_projection(self) -> tuple[np.ndarray, np.ndarray] | None:
+        """Reduction of the articles index, None if it has the full dimension.
+
+        Articles indexed at reduced dimension need it to project the queries, and
+        their full vectors to rescore: fails if they are missing.
+        """
+
+        if self.collection_opener is not None:
+            self.vector_collection = self.collection_opener("article_vectors")
+            self.projection_collection = self.collection_opener("embedding_projection")
+
+        reduction_collections = (self.vector_collection, self.projection_collection)
+        for collection in reduction_collections:
+            if collection is not None:
+                collection.load()
+                collection.describe()  # picks up swapped embedded collections
+
+        # Authors are always indexed with full-dimension embeddings
+        index_dim = get_vector_dim(self.article_collection)
+        if index_dim == get_vector_dim(self.author_collection):
+            return None
+
+        if all(collection is not None for collection in reduction_collections):
+            mean, components = load_projection(self.projection_collection)
+            if len(components) == index_dim:
+                return mean, components
+        raise ValueError(
+            f"Articles are indexed at dimension {index_dim}, without a matching "
+            "embedding_projection and article_vectors"
+        )
+
+    def check_generation(self) -> None:
+        """Refresh in-memory indexes if the collections were swapped (throttled)."""
+
+        if time.time() - self._generation_checked_at < GENERATION_CHECK_INTERVAL:
+            return
+
+        with self._refresh_lock:
+            if time.time() - self._generation_checked_at < GENERATION_CHECK_INTERVAL:
+                return  # another thread just checked
+            self._generation_checked_at = time.time()
+            if self.get_generation() != self.generation:
+                self.refresh()
+
     def embed(self, text: str) -> list[float]:
         """Embed input query."""
-        return self.embeddings.embed_query(text)
+        with span("embed"):
+            return self.embedding_cache.get_or_compute(
+                text, self.embeddings.embed_query
+            )
+
+    def embed_many(self, texts: list[str]) -> list[list[float]]:
+        """Embed many queries, with one embedding call for all the uncached ones."""
+        with span("embed"):
+            return self.embedding_cache.get_or_compute_many(
+                texts, self.embeddings.embed_documents
+            )
+
+    def _author_filter(self, author_ids: list[int]) -> str:
+        """Filter expression on the articles of these authors."""
+
+        author_ids = [int(i) for i in author_ids]
+        if self.has_author_ids:
+            return f"array_contains_any(author_ids, {author_ids})"
+        return f"author_id in {author_ids}"
 
+    def _search(
+        self,
+        query_embeddings: list[list[float]],
+        limit: int,
+        since_year: int = 1900,
+        author_ids: list[int] | None = None,
+        output_fields: list[str] = ARTICLE_OUTPUT_FIELDS,
+    ) -> list[list[dict]]:
+        """Search articles for every query embedding in a single Milvus call.
+
+        On a reduced-dimension index, a RESCORE_FACTOR times larger shortlist is
+        searched with the projected queries and rescored with the full vectors.
+        Every article gets its `author_ids`, and the first of them as `author_id`.
+        """
+
+        expr = f"publication_year >= {since_year}"
+        if author_ids is not None:
+            expr += f" and {self._author_filter(author_ids)}"
+        if self.has_author_ids:
+            output_fields = [
+                "author_ids" if field == "author_id" else field
+                for field in output_fields
+            ]
+
+        index_embeddings, index_limit = query_embeddings, limit
+        if self.projection is not None:
+            index_embeddings = reduce_embeddings(query_embeddings, *self.projection)
+            index_embeddings = index_embeddings.tolist()
+            index_limit = min(limit * RESCORE_FACTOR, MAX_SEARCH_LIMIT)
+
+        with span("search"):
+            raws = self.article_collection.search(
+                expr=expr,
+                data=index_embeddings,
+                anns_field="embedding",
+                param=make_search_param(self.article_index_type, index_limit),
+                limit=index_limit,
+                output_fields=output_fields,
+                # Prune partitions older than since_year, the expr filters the rest
+                partition_names=select_year_partitions(
+                    self.article_partitions, since_year
+                ),
+            )
+            results = [[convert_article_result(raw) for raw in hits] for hits in raws]
+
+        if self.projection is not None:
+            with span("rescore"):
+                results = self._rescore(query_embeddings, results, limit)
+
+        # Articles without (faculty) authors cannot be credited nor plotted
+        return [
+            [a for a in articles if a.get("author_ids") != []] for articles in results
+        ]
+
+    def _rescore(
+        self, query_embeddings: list[list[float]], results: list[list[dict]], limit: int
+    ) -> list[list[dict]]:
+        """Re-rank shortlists by full-dimension distance, keep the top limit."""
+
+        ids = list({article["id"] for articles in results for article in articles})
+        if not ids:
+            return results
+
+        # The embedded store reads the vectors straight from its memory map
+        get_vectors = getattr(self.vector_collection, "get_vectors", None)
+        if get_vectors is not None:
+            found, vectors = get_vectors(ids)
+        else:
+            rows = self.vector_collection.query(
+                expr=f"id in {ids}", output_fields=["embedding"]
+            )
+            found = [row["id"] for row in rows]
+            vectors = np.array([row["embedding"] for row in rows], np.float32)
+        positions = {int(i): position for position, i in enumerate(found)}
+
+        rescored = []
+        for query_embedding, articles in zip(query_embeddings, results):
+            articles = [a for a in articles if a["id"] in positions]
+            if articles:
+                matrix = vectors[[positions[a["id"]] for a in articles]]
+                similarities = matrix @ np.asarray(query_embedding, np.float32)
+                for article, similarity in zip(articles, similarities.tolist()):
+                    article["distance"] = 1 - similarity
+            rescored.append(sorted(articles, key=lambda a: a["distance"])[:limit])
+        return rescored
+
+    def _search_author_candidates(
+        self,
+        query_embedding: list[float],
+        n_authors: int,
+        author_ids: list[int] | None = None,
+    ) -> list[int]:
+        """Authors whose sub-centroids are nearest to the query, best first."""
+
+        if self.centroid_collection is None:
+            raise ValueError("Centroid retrieval needs the author_centroids collection")
+
+        limit = n_authors * max(self.centroids_per_author, 1)
+        with span("centroid_search"):
+            hits = self.centroid_collection.search(
+                expr=None if author_ids is None else f"author_id in {list(author_ids)}",
+                data=[query_embedding],
+                anns_field="embedding",
+                param=make_search_param(self.centroid_index_type, limit),
+                limit=limit,
+                output_fields=["author_id"],
+            )[0]
+
+        # An author can match with several sub-centroids, keep the best one
+        candidates = dict.fromkeys(hit.entity.get("author_id") for hit in hits)
+        return list(candidates)[:n_authors]
+
+    def _get_unit_author_ids(self, filter_unit: int | None) -> list[int] | None:
+        """Author ids in the unit, used to push the unit filter down into retrieval."""
+
+        if filter_unit is None:
+            return None
+        return self.unit_authors.get(int(filter_unit), [])
+
+    @cached_response
     def search_articles(
         self,
         query: str,
@@ -346,44 +1671,335 @@ class Engine:
         distance_threshold: float = 0.2,
         since_year: int = 1900,
         with_plot: bool = False,
+        plot_format: str = "altair",
+        author_ids: list[int] | None = None,
     ) -> dict:
-        """Search for articles by a query."""
+        """Search for articles by a query.
 
-        query_embedding = self.embed(query)
+        The plot is returned as inline Altair json (`plot_json`) or, with
+        plot_format="columnar", as compact columns (`plot_data`) for `get_plot_spec`.
+        If author_ids is given, only articles from these authors are searched.
+        Up to ARTICLE_POOL_SIZE results can be paged, see `get_page`.
+        """
 
-        def _search(limit: int) -> list:
-            raws = self.article_collection.search(
-                expr=f"publication_year >= {since_year}",
-                data=[query_embedding],
-                anns_field="embedding",
-                param={"metric_type": "IP", "params": {"nprobe": 16}},
-                limit=limit,
-                output_fields=[
-                    "doi",
-                    "title",
-                    "publication_year",
-                    "author_id",
-                    "cited_by",
-                ],
-            )[0]
+        params = {
+            "query": query,
+            "distance_threshold": distance_threshold,
+            "since_year": since_year,
+            "author_ids": author_ids,
+        }
+        # One more result tells if there is a next page, its pool is searched then
+        results = self._search_articles(
+            top_k=top_k + 1, with_plot=with_plot, plot_format=plot_format, **params
+        )
+
+        articles = results["articles"]
+        next_cursor = None
+        if len(articles) > top_k and top_k < ARTICLE_POOL_SIZE:
+            next_cursor = self._paginate("articles", top_k, params)
+        return {**results, "articles": articles[:top_k], "next_cursor": next_cursor}
 
-            return [convert_article_result(raw) for raw in raws]
+    def _search_articles(
+        self,
+        query: str,
+        top_k: int,
+        distance_threshold: float = 0.2,
+        since_year: int = 1900,
+        with_plot: bool = False,
+        plot_format: str = "altair",
+        author_ids: list[int] | None = None,
+    ) -> dict:
+        """Search for articles by a query (uncached, see `search_articles`)."""
 
-        results = _search(limit=top_k)
-        results = [r for r in results if r["distance"] < distance_threshold]
+        self.check_generation()
+        query_embedding = self.embed(query)
+        _search = partial(
+            self._search,
+            [query_embedding],
+            since_year=since_year,
+            author_ids=author_ids,
+        )
 
         if not with_plot:
+            results = _search(limit=top_k)[0]
+            results = [r for r in results if r["distance"] < distance_threshold]
             return {"articles": results}
 
+        # Single pass: the ranked list and the plot input come from the same search
+        plot_fields = ["x", "y"] if self.has_stored_coordinates else ["embedding"]
+        more_results = _search(
+            limit=max(top_k, VISUALIZATION_MAX_ARTICLES),
+            output_fields=ARTICLE_OUTPUT_FIELDS + plot_fields,
+        )[0]
+        results = [
+            {k: v for k, v in r.items() if k not in plot_fields}
+            for r in more_results[:top_k]
+            if r["distance"] < distance_threshold
+        ]
+
         # Add plot data
-        more_results = _search(limit=VISUALIZATION_MAX_ARTICLES)
+        with span("plot_inputs"):
+            plot_inputs = self.plot_maker.make_plot_inputs(
+                query_embedding, more_results
+            )
+        with span("render"):
+            plot = render_plot(
+                query, plot_inputs, self.plot_maker.projection_function, plot_format
+            )
+        return {"articles": results, **plot}
+
+    def submit_plot(
+        self,
+        query: str,
+        since_year: int = 1900,
+        filter_unit: int | None = None,
+        plot_format: str = "altair",
+        retrieval: str = "articles",
+        top_k: int = 3,
+    ) -> str:
+        """Start a plot job for a query and return its id, see `get_plot`.
+
+        The job searches the plotted articles like `search_authors` (with retrieval
+        and top_k) in `plot_searches`, then renders (`render_plot`) in
+        `plot_executor`, all off the request thread. Without an executor it runs
+        inline.
+        """
+
+        if retrieval not in RETRIEVAL_MODES:
+            raise ValueError(f"retrieval must be one of {RETRIEVAL_MODES}")
+
+        job = partial(
+            self._plot_job,
+            query,
+            since_year=since_year,
+            filter_unit=filter_unit,
+            plot_format=plot_format,
+            retrieval=retrieval,
+            top_k=top_k,
+        )
+        if self.plot_searches is not None:
+            future = self.plot_searches.submit(job)
+        else:
+            future = Future()
+            try:
+                future.set_result(job())
+            except Exception as e:
+                future.set_exception(e)
+
+        plot_id = uuid.uuid4().hex
+        self.plot_jobs.set(plot_id, future)
+        return plot_id
+
+    def _plot_job(
+        self,
+        query: str,
+        since_year: int,
+        filter_unit: int | None,
+        plot_format: str,
+        retrieval: str,
+        top_k: int,
+    ) -> dict:
+        """Search and plot the articles of a query (see `submit_plot`)."""
+
+        self.check_generation()
+        query_embedding = self.embed(query)
+        plot_fields = ["x", "y"] if self.has_stored_coordinates else ["embedding"]
+        articles = self._search(
+            [query_embedding],
+            limit=VISUALIZATION_MAX_ARTICLES,
+            since_year=since_year,
+            author_ids=self._get_retrieval_author_ids(
+                query, top_k, filter_unit, retrieval
+            ),
+            output_fields=ARTICLE_OUTPUT_FIELDS + plot_fields,
+        )[0]
+        with span("plot_inputs"):
+            plot_inputs = self.plot_maker.make_plot_inputs(query_embedding, articles)
+
+        args = (query, plot_inputs, self.plot_maker.projection_function, plot_format)
+        with span("render"):
+            if self.plot_executor is None:
+                return render_plot(*args)
+            return self.plot_executor.submit(render_plot, *args).result()
+
+    def plot_articles(
+        self, query: str, articles: list[dict], plot_format: str = "altair"
+    ) -> dict:
+        """Plot of articles already retrieved (e.g., the `search_authors` evidence).
+
+        Nothing is searched again: their plot fields are fetched by id.
+        """
+
+        plot_fields = ["x", "y"] if self.has_stored_coordinates else ["embedding"]
+        rows = get_articles_by_ids(
+            [article["id"] for article in articles],
+            self.article_collection,
+            output_fields=plot_fields,
+        )
+        fields_by_id = {row["id"]: row for row in rows}
+        articles = [
+            {
+                **article,
+                **{field: fields_by_id[article["id"]][field] for field in plot_fields},
+            }
+            for article in articles
+            if article["id"] in fields_by_id
+        ]
+
+        with span("plot_inputs"):
+            plot_inputs = self.plot_maker.make_plot_inputs(self.embed(query), articles)
+        with span("render"):
+            return render_plot(
+                query, plot_inputs, self.plot_maker.projection_function, plot_format
+            )
+
+    def get_plot(self, plot_id: str) -> dict | None:
+        """Plot job status, with the plot (`plot_json` or `plot_data`) once done.
+
+        Returns None for unknown or expired jobs.
+        """
+
+        future = self.plot_jobs.get(plot_id)
+        if future is None:
+            return None
+        if not future.done():
+            return {"status": "pending"}
+        if future.cancelled():  # e.g., executor shut down
+            return {"status": "failed"}
+        if future.exception() is not None:
+            logging.error(f"Plot job {plot_id} failed: {future.exception()}")
+            return {"status": "failed"}
+        return {"status": "done", **future.result()}
+
+    def _get_retrieval_author_ids(
+        self, query: str, top_k: int, filter_unit: int | None, retrieval: str
+    ) -> list[int] | None:
+        """Authors the article pool is drawn from (None for all), see `search_authors`."""
+
+        author_ids = self._get_unit_author_ids(filter_unit)
+        if retrieval == "centroids":
+            n_authors = max(AUTHOR_CANDIDATES_FACTOR * top_k, MIN_AUTHOR_CANDIDATES)
+            author_ids = self._search_author_candidates(
+                self.embed(query), n_authors=n_authors, author_ids=author_ids
+            )
+        elif retrieval != "articles":
+            raise ValueError(f"retrieval must be one of {RETRIEVAL_MODES}")
+        return author_ids
+
+    def _rank_authors_pool(
+        self,
+        query: str,
+        top_k: int,
+        n: int = 500,
+        m: int = 5,
+        since_year: int = 1900,
+        distance_threshold: float = 0.2,
+        pow: float = 3.0,
+        ks: float = 1.0,
+        ka: float = 1.0,
+        kr: float = 1.0,
+        with_plot: bool = False,
+        filter_unit: int | None = None,
+        plot_format: str = "altair",
+        retrieval: str = "articles",
+    ) -> tuple[list[tuple[str, float]], dict]:
+        """Rank every author of the article pool (uncached, see `search_authors`).
 
-        dois = [result["doi"] for result in more_results]
-        plot_data = self.plot_maker.make_plot_data(query_embedding, dois)
-        # Inject the query back into the label in plot data
-        plot_data["label"][0] = query
-        return {"articles": results, "plot_json": plot_2d_projection(plot_data)}
+        Returns the ranking as (author id, score) pairs and the article search results.
+        """
 
+        author_ids = self._get_retrieval_author_ids(
+            query, top_k, filter_unit, retrieval
+        )
+        if retrieval == "centroids":
+            # Only the m nearest articles of every candidate are pooled (see below)
+            n = max(min(n, len(author_ids) * m * CENTROID_POOL_FACTOR), 1)
+        results = self._search_articles(
+            query,
+            top_k=n,
+            distance_threshold=distance_threshold,
+            since_year=since_year,
+            with_plot=with_plot,
+            plot_format=plot_format,
+            author_ids=author_ids,
+        )
+
+        if retrieval == "centroids":
+            # Pool of the m nearest articles of every candidate
+            results["articles"] = cap_articles_per_author(
+                results["articles"], m, author_ids
+            )
+
+        articles = results["articles"]
+        metrics.observe("pool_size", len(articles), buckets=SIZE_BUCKETS)
+        with span("rank"):
+            authored = expand_authorship(articles, author_ids)
+            ranked_ids, ranked_scores = rank_authors(
+                authored, top_k=len(authored), m=m, pow=pow, ks=ks, ka=ka, kr=kr
+            )
+        return list(zip(ranked_ids, ranked_scores)), results
+
+    def _paginate(
+        self, kind: str, page_size: int, params: dict, pool: list | None = None
+    ) -> str:
+        """Cursor of the page after the first page_size results of a search.
+
+        The candidate pool is cached if given, else searched for the next page.
+        """
+
+        pool_id = uuid.uuid4().hex
+        if pool is not None:
+            self.pools.set(pool_id, {"generation": self.generation, "items": pool})
+        state = {"kind": kind, "pool": pool_id, "offset": page_size, "params": params}
+        return encode_cursor(state, self.cursor_key)
+
+    def get_page(self, cursor: str, page_size: int, kind: str | None = None) -> dict:
+        """Next page of a `search_articles` or `search_authors` result.
+
+        Served from the cached candidate pool, without embedding or searching. A pool
+        not searched yet, expired or of swapped collections is (re)computed from the
+        search parameters held in the (signed) cursor. If kind is given, the cursor
+        must be of a search of that kind ("articles" or "authors").
+        """
+
+        self.check_generation()
+        state = decode_cursor(cursor, self.cursor_key)
+        if kind is not None and state["kind"] != kind:
+            raise ValueError(f"Not a cursor of a search for {kind}")
+        kind, params = state["kind"], state["params"]
+
+        pool = self.pools.get(state["pool"])
+        if pool is None or pool["generation"] != self.generation:
+            try:
+                if kind == "articles":
+                    items = self._search_articles(top_k=ARTICLE_POOL_SIZE, **params)
+                    items = items["articles"]
+                else:
+                    items, _ = self._rank_authors_pool(**params)
+            except TypeError:  # cursor of another version of the API
+                raise ValueError("Invalid cursor")
+            pool = {"generation": self.generation, "items": items}
+            self.pools.set(state["pool"], pool)
+
+        offset = state["offset"]
+        page = pool["items"][offset : offset + page_size]
+        next_cursor = None
+        if offset + page_size < len(pool["items"]):
+            next_cursor = encode_cursor(
+                {**state, "offset": offset + page_size}, self.cursor_key
+            )
+
+        if kind == "articles":
+            return {"articles": page, "next_cursor": next_cursor}
+        return {
+            "authors": {
+                "author_ids": [author_id for author_id, _ in page],
+                "scores": [score for _, score in page],
+            },
+            "next_cursor": next_cursor,
+        }
+
+    @cached_response
     def search_authors(
         self,
         query: str,
@@ -398,7 +2014,9 @@ class Engine:
         kr: float = 1.0,
         with_plot: bool = False,
         with_evidence: bool = False,
-        filter_unit: str | None = None,
+        filter_unit: int | None = None,
+        plot_format: str = "altair",
+        retrieval: str = "articles",
     ) -> dict:
         """Search for author by a query.
 
@@ -419,114 +2037,194 @@ class Engine:
             kr (float, optional): Linear scaling of recency $R$ = 1 / log10(year_now - published_year + 2). Defaults to 1.0.
             with_plot (bool, optional): Whether to return plot json. Defaults to False.
             with_evidence (bool, optional): Whether to return evidence. Defaults to False.
-            filter_unit (str | None, optional): Unit id to filter by. Defaults to None.
+            filter_unit (int | None, optional): Unit id to filter by, the article pool is drawn from this unit only. Defaults to None.
+            plot_format (str, optional): "altair" for inline Altair json or "columnar" for compact plot data. Defaults to "altair".
+            retrieval (str, optional): "articles" draws the pool from all articles. "centroids" first retrieves candidate authors by their sub-centroids, then draws the pool (the m nearest articles of every candidate, see `cap_articles_per_author`) from their articles only. Defaults to "articles".
 
         Returns:
             list[dict]: key: author_id; value: their scores.
         """
 
-        author_scores: dict[str, float] = {}
-        results = self.search_articles(
-            query,
-            top_k=n,
-            distance_threshold=distance_threshold,
-            since_year=since_year,
-            with_plot=with_plot,
+        params = {
+            "query": query,
+            "top_k": top_k,
+            "n": n,
+            "m": m,
+            "since_year": since_year,
+            "distance_threshold": distance_threshold,
+            "pow": pow,
+            "ks": ks,
+            "ka": ka,
+            "kr": kr,
+            "filter_unit": filter_unit,
+            "retrieval": retrieval,
+        }
+        ranking, results = self._rank_authors_pool(
+            with_plot=with_plot, plot_format=plot_format, **params
         )
 
-        # Calculate author scores by their relevant articles
-        # Similarity $S$: (1 - distance) ** pow
-        # Authority $A$ = log(cited_by + 1)
-        # Recency $R$ = 1 / log(year_now - published_year + 2)
-        # Weight $W$ = S * A
+        output = {
+            "authors": {
+                "author_ids": [author_id for author_id, _ in ranking[:top_k]],
+                "scores": [score for _, score in ranking[:top_k]],
+            },
+            "next_cursor": (
+                self._paginate("authors", top_k, params, ranking)
+                if len(ranking) > top_k
+                else None
+            ),
+        }
 
-        author_ids = [article["author_id"] for article in results["articles"]]
-        c = np.array([article["cited_by"] for article in results["articles"]])
-        d = np.array([article["distance"] for article in results["articles"]])
+        # Add plot json (or columnar plot data)
+        if with_plot:
+            plot_key = "plot_data" if plot_format == "columnar" else "plot_json"
+            output[plot_key] = results[plot_key]
 
-        y = []
-        for article in results["articles"]:
-            if article["publication_year"]:
-                y.append(article["publication_year"])
-            else:
-                y.append(1900)
-        y = np.array(y)
+        if with_evidence:
+            output["evidence"] = results["articles"]
 
-        s = (1 - d) ** pow
-        a = np.log10(c + 1)
-        r = 1 / np.log10(y + 2)
-        w = ks * s + ka * a + kr * r
+        return output
 
-        unique_author_ids, idx = np.unique(author_ids, return_inverse=True)
+    def search_articles_batch(
+        self,
+        queries: list[str],
+        top_k: int,
+        distance_threshold: float = 0.2,
+        since_year: int = 1900,
+        author_ids: list[int] | None = None,
+    ) -> list[dict]:
+        """Search for articles by many queries, with one embedding and one search call.
 
-        for i, author_id in enumerate(unique_author_ids):
-            this_author_weights = w[idx == i]
+        Returns one `search_articles` output (without plot) per query.
+        """
 
-            # Obtain top m articles
-            top_m_idx = np.argsort(this_author_weights)[-m:]
-            top_m_weights = this_author_weights[top_m_idx]
+        self.check_generation()
+        query_embeddings = self.embed_many(queries)
+        results = self._search(
+            query_embeddings, limit=top_k, since_year=since_year, author_ids=author_ids
+        )
+        return [
+            {"articles": [r for r in rs if r["distance"] < distance_threshold]}
+            for rs in results
+        ]
 
-            # Calculate author score
-            author_scores[author_id] = np.sum(top_m_weights)
+    def search_authors_batch(
+        self,
+        queries: list[str],
+        top_k: int,
+        n: int = 500,
+        m: int = 5,
+        since_year: int = 1900,
+        distance_threshold: float = 0.2,
+        pow: float = 3.0,
+        ks: float = 1.0,
+        ka: float = 1.0,
+        kr: float = 1.0,
+        with_evidence: bool = False,
+        filter_unit: int | None = None,
+    ) -> list[dict]:
+        """Search for authors by many queries on a shared article search.
 
-        if filter_unit is not None:
-            # Get all author ids in the unit
-            filter_unit = str(filter_unit)
-            in_unit_author_ids = self.author_collection.query(
-                expr=f"unit_id == {filter_unit}",
-                output_fields=["id"],
-            )
-            # Unpack
-            in_unit_author_ids = [str(x["id"]) for x in in_unit_author_ids]
+        Returns one `search_authors` output (without plot) per query, see
+        `search_authors` for the arguments.
+        """
 
-            # Filter
-            author_scores = {
-                k: v for k, v in author_scores.items() if k in in_unit_author_ids
-            }
+        author_ids = self._get_unit_author_ids(filter_unit)
+        results = self.search_articles_batch(
+            queries,
+            top_k=n,
+            distance_threshold=distance_threshold,
+            since_year=since_year,
+            author_ids=author_ids,
+        )
 
-        top_ids, top_scores = sort_dict_by_value(author_scores, reversed=True)
-        top_ids, top_scores = top_ids[:top_k], top_scores[:top_k]
+        outputs = []
+        for result in results:
+            metrics.observe("pool_size", len(result["articles"]), buckets=SIZE_BUCKETS)
+            with span("rank"):
+                top_ids, top_scores = rank_authors(
+                    expand_authorship(result["articles"], author_ids),
+                    top_k=top_k,
+                    m=m,
+                    pow=pow,
+                    ks=ks,
+                    ka=ka,
+                    kr=kr,
+                )
+            output = {"authors": {"author_ids": top_ids, "scores": top_scores}}
+            if with_evidence:
+                output["evidence"] = result["articles"]
+            outputs.append(output)
+        return outputs
+
+    def get_author_articles(
+        self,
+        author_id: int,
+        since_year: int = 1900,
+        limit: int | None = None,
+        offset: int = 0,
+        sort_by: str | None = None,
+        fields: list[str] | None = None,
+    ) -> dict:
+        """A page of an author's articles and their total count.
 
-        output = {
-            "authors": {
-                "author_ids": top_ids,
-                "scores": top_scores,
-            }
-        }
+        The sorted article ids of an author are cached (per corpus generation), so
+        that the next pages only fetch their own articles, by primary key.
 
-        # Add plot json
-        if with_plot:
-            output["plot_json"] = results["plot_json"]
+        Returns:
+            dict: `articles` (None if the author has none) and `total_articles`.
+        """
 
-        if with_evidence:
-            output["evidence"] = results["articles"]
+        self.check_generation()
+        key = (self.generation, author_id, since_year, sort_by)
+        article_ids = self.author_articles.get(key)
+        if article_ids is None:
+            expr = f"{self._author_filter([author_id])} and publication_year >= {since_year}"
+            article_ids = list_article_ids(
+                expr, self.article_collection, sort_by=sort_by
+            )
+            self.author_articles.set(key, article_ids)
 
-        return output
+        end = None if limit is None else offset + limit
+        articles = get_articles_by_ids(
+            article_ids[offset:end],
+            self.article_collection,
+            output_fields=fields or AUTHOR_ARTICLE_FIELDS,
+        )
+        return {
+            "articles": articles if article_ids else None,
+            "total_articles": len(article_ids),
+        }
 
     def get_author(
-        self, first_name: str, last_name: str, since_year: int = 1900
+        self, first_name: str, last_name: str, since_year: int = 1900, **page
     ) -> dict:
-        """Get author details from Milvus."""
+        """Get author details from Milvus, by a (possibly misspelled) name.
+
+        The best match of the name index is the author, `candidates` ranks the best
+        matches with their name score. Articles are paged by `page` (see
+        `get_author_articles`).
+        """
+
+        self.check_generation()
+        candidates = self.name_index.search(first_name, last_name)
+        if not candidates:
+            raise ValueError(f"Author with name {first_name} {last_name} not found")
 
         output = {}
-        output["author"] = get_author_by_name(
-            first_name, last_name, self.author_collection
-        )
-        output["articles"] = get_author_articles(
-            author_id=output["author"]["id"],
-            since_year=since_year,
-            article_collection=self.article_collection,
+        output["author"] = {k: v for k, v in candidates[0].items() if k != "score"}
+        output["candidates"] = candidates
+        articles = self.get_author_articles(
+            output["author"]["id"], since_year=since_year, **page
         )
-        return output
+        return {**output, **articles}
 
-    def get_author_by_id(self, author_id: str) -> dict:
-        """Get author details from Milvus."""
+    def get_author_by_id(self, author_id: str, since_year: int = 1900, **page) -> dict:
+        """Get author details from Milvus, with a page of articles (see `get_author`)."""
 
         output = {}
         output["author"] = get_author_by_id(author_id, self.author_collection)
-        output["articles"] = get_author_articles(
-            author_id=output["author"]["id"],
-            since_year=1900,
-            article_collection=self.article_collection,
+        articles = self.get_author_articles(
+            output["author"]["id"], since_year=since_year, **page
         )
-        return output
+        return {**output, **articles}
@@ -1,7 +1,11 @@
 # IO Models
 from datetime import datetime
+from typing import Literal
+
 from pydantic import BaseModel, validator
 
+MAX_BATCH_SIZE = 100
+
 
 class SearchArticlesInputs(BaseModel):
     """Query data model."""
@@ -11,6 +15,9 @@ class SearchArticlesInputs(BaseModel):
     distance_threshold: float = 0.2
     since_year: int = 1900
     with_plot: bool = False
+    plot_format: Literal["altair", "columnar"] = "altair"
+    plot_async: bool = False  # return a `plot_id` for /plots/{plot_id} instead
+    cursor: str | None = None  # `next_cursor` of the previous page
 
     @validator("query")
     def query_must_not_be_empty(cls, v):
@@ -55,9 +62,13 @@ class SearchAuthorsInputs(BaseModel):
     ks: float = 1.0
     ka: float = 1.0
     kr: float = 1.0
-    filter_unit: str | None = None
+    filter_unit: int | None = None  # unit id, numeric strings are accepted
     with_plot: bool = False
     with_evidence: bool = False
+    plot_format: Literal["altair", "columnar"] = "altair"
+    plot_async: bool = False  # return a `plot_id` for /plots/{plot_id} instead
+    cursor: str | None = None  # `next_cursor` of the previous page
+    retrieval: Literal["articles", "centroids"] = "articles"
 
     @validator("query")
     def query_must_not_be_empty(cls, v):
@@ -103,7 +114,138 @@ class SearchAuthorsInputs(BaseModel):
         return v
 
 
-class GetAuthorInput(BaseModel):
+class SearchArticlesBatchInputs(BaseModel):
+    """Batch query data model."""
+
+    queries: list[str]
+    top_k: int = 3
+    distance_threshold: float = 0.2
+    since_year: int = 1900
+
+    @validator("queries")
+    def queries_must_not_be_empty(cls, v):
+        """Validate that queries are not empty and not too many."""
+        if not v or len(v) > MAX_BATCH_SIZE:
+            raise ValueError(f"queries must have 1 to {MAX_BATCH_SIZE} items")
+        if any(not query.strip() for query in v):
+            raise ValueError("query must not be empty")
+        return v
+
+    @validator("top_k")
+    def top_k_must_be_positive(cls, v):
+        """Validate that top_k is positive."""
+        if v <= 0:
+            raise ValueError("top_k must be positive")
+        return v
+
+    @validator("distance_threshold")
+    def distance_threshold_must_be_zero_to_one(cls, v):
+        """Validate that distance_threshold is between 0 and 1."""
+        if v < 0 or v > 1:
+            raise ValueError("distance_threshold must be between 0 and 1")
+        return v
+
+    @validator("since_year")
+    def since_year_must_be_past(cls, v):
+        """Validate that since_year is in the past."""
+        current_year = datetime.now().year
+        if v > current_year:
+            raise ValueError("since_year must be in the past")
+        return v
+
+
+class SearchAuthorsBatchInputs(BaseModel):
+    """Batch query data model."""
+
+    queries: list[str]
+    top_k: int = 3
+    n: int = 500
+    m: int = 5
+    since_year: int = 1900
+    distance_threshold: float = 0.2
+    pow: float = 3.0
+    ks: float = 1.0
+    ka: float = 1.0
+    kr: float = 1.0
+    filter_unit: int | None = None  # unit id, numeric strings are accepted
+    with_evidence: bool = False
+
+    @validator("queries")
+    def queries_must_not_be_empty(cls, v):
+        """Validate that queries are not empty and not too many."""
+        if not v or len(v) > MAX_BATCH_SIZE:
+            raise ValueError(f"queries must have 1 to {MAX_BATCH_SIZE} items")
+        if any(not query.strip() for query in v):
+            raise ValueError("query must not be empty")
+        return v
+
+    @validator("top_k")
+    def top_k_must_be_positive(cls, v):
+        """Validate that top_k is positive."""
+        if v <= 0:
+            raise ValueError("top_k must be positive")
+        return v
+
+    @validator("n")
+    def n_must_be_positive(cls, v):
+        """Validate that n is positive."""
+        if v <= 0:
+            raise ValueError("n must be positive")
+        return v
+
+    @validator("m")
+    def m_must_be_positive(cls, v):
+        """Validate that m is positive."""
+        if v <= 0:
+            raise ValueError("m must be positive")
+        return v
+
+    @validator("since_year")
+    def since_year_must_be_past(cls, v):
+        """Validate that since_year is in the past."""
+        current_year = datetime.now().year
+        if v > current_year:
+            raise ValueError("since_year must be in the past")
+        return v
+
+    @validator("distance_threshold")
+    def distance_threshold_must_be_zero_to_one(cls, v):
+        """Validate that distance_threshold is between 0 and 1."""
+        if v < 0 or v > 1:
+            raise ValueError("distance_threshold must be between 0 and 1")
+        return v
+
+
+ArticleField = Literal[
+    "doi", "title", "journal", "abstract", "publication_year", "cited_by"
+]
+
+
+class AuthorArticlesInputs(BaseModel):
+    """Paging of an author's articles (all of them by default)."""
+
+    since_year: int = 1900
+    limit: int | None = None
+    offset: int = 0
+    sort_by: Literal["year", "citations"] | None = None
+    fields: list[ArticleField] | None = None
+
+    @validator("limit")
+    def limit_must_be_positive(cls, v):
+        """Validate that limit is positive."""
+        if v is not None and v <= 0:
+            raise ValueError("limit must be positive")
+        return v
+
+    @validator("offset")
+    def offset_must_not_be_negative(cls, v):
+        """Validate that offset is not negative."""
+        if v < 0:
+            raise ValueError("offset must not be negative")
+        return v
+
+
+class GetAuthorInput(AuthorArticlesInputs):
     first_name: str
     last_name: str
 
@@ -115,7 +257,7 @@ class GetAuthorInput(BaseModel):
         return v
 
 
-class GetAuthorByIdInput(BaseModel):
+class GetAuthorByIdInput(AuthorArticlesInputs):
     author_id: str
 
 
@@ -130,6 +272,17 @@ class APIPlotData(BaseModel):
     type: list[str]
 
 
+class APIColumnarPlotData(BaseModel):
+    """Columnar plot data model, bound to the static spec from `/plot_spec/`."""
+
+    x: str  # base64 little-endian float32
+    y: str  # base64 little-endian float32
+    type_code: list[int]  # 0: query, 1: author, 2: article
+    id: list[str | int]
+    parent_id: list[int]
+    label: list[str]
+
+
 class APIAuthor(BaseModel):
     """Author output data model."""
 
@@ -145,5 +298,21 @@ class APIArticle(BaseModel):
 
     doi: str
     title: str
-    author_id: str
+    author_id: str  # a faculty author, the first of author_ids (plot parent)
+    author_ids: list[str] | None = None
     distance: float | None = None
+
+
+class APIArticlesResult(BaseModel):
+    """Batch search articles output data model (one per query)."""
+
+    query: str
+    articles: list[APIArticle]
+
+
+class APIAuthorsResult(BaseModel):
+    """Batch search authors output data model (one per query)."""
+
+    query: str
+    authors: list[APIAuthor]
+    evidence: list[dict] | None = None
@@ -0,0 +1,708 @@
+"""Embedded vector store, a drop-in for the `pymilvus.Collection` subset used by `Engine`.
+
+Each collection is a directory with a `manifest.json`, one `.npy` file per numeric
+column, an offsets/bytes pair per string column and a raw float32 vector matrix, all
+memory-mapped on open. It lets the API run without a Milvus server (single node
+replicas, CI and benchmarks).
+
+Written by `EmbeddedCollectionWriter` (see `main.py --backend embedded`).
+"""
+
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from itertools import chain
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+
+SEARCH_BLOCK_SIZE = 65536  # rows per matmul block
+QUANTIZED_BLOCK_SIZE = 256  # rows per dequantized block (stays in CPU cache)
+QUANTIZATIONS = ["float16", "int8"]
+ARRAY_KIND = "int64_array"  # column of integer lists (Milvus ARRAY), values + offsets
+RERANK_FACTOR = 4  # candidates per result scored on the quantized index
+DENSE_FILTER_RATIO = 0.5  # above this share of rows, scan all and mask the scores
+
+
+##### Expression #####
+
+TOKEN_PATTERN = re.compile(
+    r"""\s*(?:
+    (?P<number>-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)
+    |(?P<string>'[^']*'|"[^"]*")
+    |(?P<op>==|!=|>=|<=|>|<|&&|\|\||\(|\)|\[|\]|,)
+    |(?P<name>[A-Za-z_][A-Za-z0-9_]*)
+    )""",
+    re.VERBOSE,
+)
+KEYWORDS = {"and", "or", "not", "in", "like"}
+ARRAY_FUNCTIONS = {"array_contains", "array_contains_any"}
+
+
+def tokenize(expr: str) -> list[tuple[str, Any]]:
+    """Split a Milvus boolean expression into (kind, value) tokens."""
+
+    tokens = []
+    position = 0
+    expr = expr.strip()
+    while position < len(expr):
+        match = TOKEN_PATTERN.match(expr, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Cannot parse expression at: {expr[position:]!r}")
+        position = match.end()
+
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == "number":
+            value = float(value) if any(c in value for c in ".eE") else int(value)
+        elif kind == "string":
+            value = value[1:-1]
+        elif kind == "name" and value.lower() in KEYWORDS:
+            kind, value = "op", value.lower()
+        elif kind == "op":
+            value = {"&&": "and", "||": "or"}.get(value, value)
+        tokens.append((kind, value))
+    return tokens
+
+
+class ExpressionEvaluator:
+    """Evaluate a Milvus boolean expression into a row mask over columnar arrays.
+
+    Supports comparisons (`== != > >= < <=`), `in [...]`, `like` with `%` wildcards,
+    `array_contains` and `array_contains_any` on integer arrays, `and`, `or`, `not`
+    and parentheses.
+    """
+
+    def __init__(
+        self, expr: str, column: Callable, array_column: Callable | None = None
+    ) -> None:
+        self.tokens = tokenize(expr)
+        self.position = 0
+        self.column = column  # name -> np.ndarray
+        self.array_column = array_column  # name -> (flat values, row offsets)
+
+    def _peek(self) -> tuple[str, Any] | None:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def _next(self) -> tuple[str, Any]:
+        token = self._peek()
+        if token is None:
+            raise ValueError("Unexpected end of expression")
+        self.position += 1
+        return token
+
+    def _expect(self, value: str) -> None:
+        token = self._next()
+        if token != ("op", value):
+            raise ValueError(f"Expected {value!r}, got {token[1]!r}")
+
+    def evaluate(self) -> np.ndarray:
+        mask = self._or()
+        if self._peek() is not None:
+            raise ValueError(f"Unexpected token {self._peek()[1]!r}")
+        return mask
+
+    def _or(self) -> np.ndarray:
+        mask = self._and()
+        while self._peek() == ("op", "or"):
+            self._next()
+            mask = mask | self._and()
+        return mask
+
+    def _and(self) -> np.ndarray:
+        mask = self._not()
+        while self._peek() == ("op", "and"):
+            self._next()
+            mask = mask & self._not()
+        return mask
+
+    def _not(self) -> np.ndarray:
+        if self._peek() == ("op", "not"):
+            self._next()
+            return ~self._not()
+        return self._atom()
+
+    def _atom(self) -> np.ndarray:
+        if self._peek() == ("op", "("):
+            self._next()
+            mask = self._or()
+            self._expect(")")
+            return mask
+
+        kind, name = self._next()
+        if kind != "name":
+            raise ValueError(f"Expected a field name, got {name!r}")
+        if name in ARRAY_FUNCTIONS:
+            return self._array_function(name)
+        values = self.column(name)
+
+        kind, op = self._next()
+        if op == "in":
+            return np.isin(values, self._list(values.dtype))
+        if op == "like":
+            pattern = self._value(values.dtype)
+            regex = re.compile(
+                "^" + ".*".join(map(re.escape, pattern.split("%"))) + "$"
+            )
+            return np.array([bool(regex.match(v)) for v in values], dtype=bool)
+
+        value = self._value(values.dtype)
+        if op == "==":
+            return values == value
+        if op == "!=":
+            return values != value
+        if op == ">":
+            return values > value
+        if op == ">=":
+            return values >= value
+        if op == "<":
+            return values < value
+        if op == "<=":
+            return values <= value
+        raise ValueError(f"Unknown operator {op!r}")
+
+    def _array_function(self, function: str) -> np.ndarray:
+        """Rows whose array contains the value (or any of the values)."""
+
+        self._expect("(")
+        kind, name = self._next()
+        array = None if self.array_column is None else self.array_column(name)
+        if kind != "name" or array is None:
+            raise ValueError(f"Expected an array field, got {name!r}")
+        values, offsets = array
+        self._expect(",")
+        if function == "array_contains":
+            matches = values == self._value(values.dtype)
+        else:
+            matches = np.isin(values, self._list(values.dtype))
+        self._expect(")")
+
+        rows = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+        mask = np.zeros(len(offsets) - 1, dtype=bool)
+        mask[rows[matches]] = True
+        return mask
+
+    def _value(self, dtype: np.dtype) -> Any:
+        kind, value = self._next()
+        if kind not in ("number", "string"):
+            raise ValueError(f"Expected a value, got {value!r}")
+        if dtype.kind in "iu":
+            return int(value)
+        if dtype.kind == "f":
+            return float(value)
+        return str(value)
+
+    def _list(self, dtype: np.dtype) -> list:
+        self._expect("[")
+        values = []
+        while self._peek() != ("op", "]"):
+            values.append(self._value(dtype))
+            if self._peek() == ("op", ","):
+                self._next()
+        self._expect("]")
+        return values
+
+
+##### Collection #####
+
+
+class EmbeddedEntity:
+    """Search hit entity, mirrors `pymilvus` hit entities."""
+
+    def __init__(self, data: dict) -> None:
+        self._data = data
+        self.fields = list(data)
+
+    def get(self, field: str) -> Any:
+        return self._data.get(field)
+
+
+class EmbeddedHit:
+    """Search hit, mirrors `pymilvus` hits (distance is the inner-product)."""
+
+    def __init__(self, id: int, distance: float, entity: dict) -> None:
+        self.id = id
+        self.distance = distance
+        self.entity = EmbeddedEntity(entity)
+
+
+class CollectionFiles:
+    """Memory-mapped files of one version of a collection, opened together.
+
+    Readers take a reference to it once per call, so that a re-exported collection
+    (see `swap_collection`) is swapped in as a whole.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.name = path.name
+        with open(path / "manifest.json", "r") as f:
+            self.manifest = json.load(f)
+        self.num_entities = self.manifest["num_entities"]
+        self.vector_field = self.manifest["vector_field"]
+        self.dim = self.manifest["dim"]
+        self.id_order: np.ndarray | None = None  # row order by primary key
+
+        # String columns are mapped now and decoded on first use, from these files
+        self.columns: dict[str, np.ndarray] = {}
+        self.arrays: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self.strings: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self.decoded_strings: dict[str, np.ndarray] = {}
+        for name, kind in self.manifest["columns"].items():
+            offsets = path / f"{name}.offsets.npy"
+            if kind == ARRAY_KIND:
+                self.arrays[name] = (
+                    np.load(path / f"{name}.npy", mmap_mode="r"),
+                    np.load(offsets, mmap_mode="r"),
+                )
+            elif kind == "string":
+                data = path / f"{name}.utf8"
+                self.strings[name] = (
+                    np.load(offsets, mmap_mode="r"),
+                    (
+                        np.memmap(data, dtype=np.uint8, mode="r")
+                        if data.stat().st_size
+                        else np.zeros(0, dtype=np.uint8)
+                    ),
+                )
+            else:
+                self.columns[name] = np.load(path / f"{name}.npy", mmap_mode="r")
+
+        if self.num_entities:
+            self.vectors = np.memmap(
+                path / f"{self.vector_field}.f32",
+                dtype="<f4",
+                mode="r",
+                shape=(self.num_entities, self.dim),
+            )
+        else:
+            self.vectors = np.zeros((0, self.dim), dtype="<f4")
+
+        # Quantized index is read to RAM (hot), float32 vectors stay on disk (cold)
+        self.quantization = self.manifest.get("quantization")
+        self.index, self.scales = None, None
+        if self.quantization is not None:
+            self.index = np.fromfile(
+                path / f"{self.vector_field}.{self.quantization}",
+                dtype=self.quantization,
+            ).reshape(self.num_entities, self.dim)
+        if self.quantization == "int8":
+            self.scales = np.load(path / f"{self.vector_field}.scales.npy")
+
+    def column(self, name: str) -> np.ndarray:
+        """Get a scalar column, decoding string columns once on first use."""
+
+        if name in self.columns:
+            return self.columns[name]
+
+        if name not in self.strings:
+            raise ValueError(f"Field {name} not found in {self.name}")
+
+        if name not in self.decoded_strings:
+            offsets, data = self.strings[name]
+            data = data.tobytes()
+            self.decoded_strings[name] = np.array(
+                [data[i:j].decode("utf-8") for i, j in zip(offsets[:-1], offsets[1:])],
+                dtype=object,
+            )
+        return self.decoded_strings[name]
+
+    def rows(self, indices: np.ndarray, output_fields: list[str]) -> list[dict]:
+        """Materialize rows at indices as dicts of Python values."""
+
+        columns = {}
+        for field in output_fields:
+            if field == self.vector_field:
+                columns[field] = [v.tolist() for v in self.vectors[indices]]
+            elif field in self.arrays:
+                values, offsets = self.arrays[field]
+                values = np.asarray(values)  # plain array views, memmap slicing is slow
+                starts, ends = offsets[indices].tolist(), offsets[indices + 1].tolist()
+                columns[field] = [values[i:j].tolist() for i, j in zip(starts, ends)]
+            else:
+                columns[field] = self.column(field)[indices].tolist()
+        return [
+            {field: columns[field][i] for field in output_fields}
+            for i in range(len(indices))
+        ]
+
+    def mask(self, expr: str | None) -> np.ndarray | None:
+        if not expr:
+            return None
+        return ExpressionEvaluator(expr, self.column, self.arrays.get).evaluate()
+
+
+class EmbeddedCollection:
+    """Memory-mapped collection implementing the `pymilvus.Collection` subset used by `Engine`."""
+
+    def __init__(self, path: str | Path, rerank_factor: int = RERANK_FACTOR) -> None:
+        self.path = Path(path)
+        self.name = self.path.name
+        self.rerank_factor = rerank_factor
+        self._lock = threading.Lock()
+        self.files = CollectionFiles(self.path)
+
+    # Attributes of the opened version
+    manifest = property(lambda self: self.files.manifest)
+    num_entities = property(lambda self: self.files.num_entities)
+    vector_field = property(lambda self: self.files.vector_field)
+    dim = property(lambda self: self.files.dim)
+    vectors = property(lambda self: self.files.vectors)
+    quantization = property(lambda self: self.files.quantization)
+    index = property(lambda self: self.files.index)
+    scales = property(lambda self: self.files.scales)
+
+    def get_vectors(self, ids: list[int]) -> tuple[np.ndarray, np.ndarray]:
+        """Vectors of the rows with these primary keys, read from the memory map.
+
+        Returns the ids found and their vectors (same order), as arrays: unlike
+        `query`, nothing is converted to Python lists.
+        """
+
+        files = self.files
+        ids = np.asarray(ids, dtype=np.int64)
+        if not files.num_entities:
+            return ids[:0], np.zeros((0, files.dim), dtype=np.float32)
+
+        if files.id_order is None:
+            files.id_order = np.argsort(files.columns["id"], kind="stable")
+        sorted_ids = files.columns["id"][files.id_order]
+
+        positions = np.minimum(np.searchsorted(sorted_ids, ids), len(sorted_ids) - 1)
+        matches = sorted_ids[positions] == ids
+        rows = files.id_order[positions[matches]]
+        return ids[matches], np.asarray(files.vectors[rows])
+
+    def load(self) -> None:
+        """Nothing to load, columns are memory-mapped."""
+
+    def release(self) -> None:
+        """Nothing to release."""
+
+    def describe(self) -> dict:
+        """Describe the collection, picking up a re-exported collection if any."""
+
+        try:
+            with open(self.path / "manifest.json", "r") as f:
+                collection_id = json.load(f)["collection_id"]
+        except FileNotFoundError:
+            collection_id = None  # being swapped, keep serving the opened one
+
+        if collection_id not in (None, self.files.manifest["collection_id"]):
+            with self._lock:  # one reopen, swapped in with a single assignment
+                if collection_id != self.files.manifest["collection_id"]:
+                    self.files = CollectionFiles(self.path)
+
+        files = self.files
+        fields = [
+            {"name": name, "type": kind}
+            for name, kind in files.manifest["columns"].items()
+        ]
+        fields.append(
+            {
+                "name": files.vector_field,
+                "type": "float_vector",
+                "params": {"dim": files.dim},
+            }
+        )
+        return {
+            "collection_name": self.name,
+            "collection_id": files.manifest["collection_id"],
+            "fields": fields,
+            "num_entities": files.num_entities,
+        }
+
+    def query(
+        self,
+        expr: str,
+        output_fields: list[str] | None = None,
+        limit: int | None = None,
+        offset: int = 0,
+        **kwargs,
+    ) -> list[dict]:
+        """Get rows matching the expression (the primary key is always returned).
+
+        With a limit, rows come in primary key order like Milvus, so that they can be
+        paged on the primary key.
+        """
+
+        files = self.files
+        output_fields = list(dict.fromkeys(["id"] + list(output_fields or [])))
+        mask = files.mask(expr)
+        if mask is None:
+            indices = np.arange(files.num_entities)
+        else:
+            indices = np.flatnonzero(mask)
+
+        end = None if limit is None else offset + limit
+        if limit is not None and len(indices):
+            indices = indices[np.argsort(files.columns["id"][indices], kind="stable")]
+        return files.rows(indices[offset:end], output_fields)
+
+    def search(
+        self,
+        data: list[list[float]],
+        anns_field: str,
+        param: dict,
+        limit: int,
+        expr: str | None = None,
+        output_fields: list[str] | None = None,
+        **kwargs,
+    ) -> list[list[EmbeddedHit]]:
+        """Exact inner-product top-k search with blocked matmul and `argpartition`.
+
+        Rows of selective filters are gathered before scoring, so they are cheap; dense
+        filters (e.g., `publication_year >= 1900`) scan contiguous blocks instead.
+        With a quantized index, `limit * rerank_factor` candidates are shortlisted on
+        it and re-scored with the float32 vectors (override with
+        `param={"params": {"rerank_factor": ...}}`).
+        """
+
+        files = self.files
+        if anns_field != files.vector_field:
+            raise ValueError(f"{anns_field} is not the vector field of {self.name}")
+
+        queries = np.asarray(data, dtype=np.float32)
+        if limit <= 0:
+            return [[] for _ in queries]
+
+        mask = files.mask(expr)
+
+        if files.index is None:
+            top_scores, top_indices = self._top_k(files, queries, mask, limit)
+        else:
+            # Shortlist on the quantized index, then re-score with exact vectors
+            rerank_factor = param.get("params", {}).get(
+                "rerank_factor", self.rerank_factor
+            )
+            shortlist_scores, top_indices = self._top_k(
+                files, queries, mask, limit * rerank_factor, quantized=True
+            )
+            top_scores = np.einsum("qkd,qd->qk", files.vectors[top_indices], queries)
+            top_scores[np.isneginf(shortlist_scores)] = -np.inf  # masked out rows
+            if top_scores.shape[1] > limit:
+                keep = np.argpartition(-top_scores, limit - 1, axis=1)[:, :limit]
+                top_scores = np.take_along_axis(top_scores, keep, axis=1)
+                top_indices = np.take_along_axis(top_indices, keep, axis=1)
+
+        # Sort each query's top-k by descending similarity
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        top_indices = np.take_along_axis(top_indices, order, axis=1)
+
+        output_fields = list(output_fields or [])
+        results = []
+        for scores, indices in zip(top_scores, top_indices):
+            rows = files.rows(indices, ["id"] + output_fields)
+            results.append(
+                [
+                    EmbeddedHit(
+                        row["id"],
+                        float(score),
+                        {field: row[field] for field in output_fields},
+                    )
+                    for score, row in zip(scores, rows)
+                    if score > -np.inf  # fewer matching rows than limit
+                ]
+            )
+        return results
+
+    def _top_k(
+        self,
+        files: CollectionFiles,
+        queries: np.ndarray,
+        mask: np.ndarray | None,
+        k: int,
+        quantized: bool = False,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Unsorted top-k (scores and row indices) of every query over masked rows.
+
+        Rows outside the mask may be returned with a score of `-inf`.
+        """
+
+        candidates = None
+        if mask is not None and mask.mean() < DENSE_FILTER_RATIO:
+            candidates = np.flatnonzero(mask)
+        n = files.num_entities if candidates is None else len(candidates)
+        block_size = QUANTIZED_BLOCK_SIZE if quantized else SEARCH_BLOCK_SIZE
+
+        # Running top-k of every query
+        top_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        top_indices = np.zeros((len(queries), 0), dtype=np.int64)
+        if quantized:
+            buffer = np.empty((block_size, files.dim), dtype=np.float32)
+
+        for start in range(0, n, block_size):
+            end = min(start + block_size, n)
+            if candidates is None:
+                indices = np.arange(start, end)
+                rows = slice(start, end)  # contiguous, no copy
+            else:
+                indices = candidates[start:end]
+                rows = indices
+
+            if not quantized:
+                block_scores = queries @ files.vectors[rows].T
+            else:
+                block = buffer[: end - start]
+                block[...] = files.index[rows]  # dequantize in place
+                block_scores = queries @ block.T
+                if files.scales is not None:
+                    block_scores *= files.scales[rows]
+
+            if candidates is None and mask is not None:
+                block_scores[:, ~mask[start:end]] = -np.inf
+
+            scores = np.concatenate([top_scores, block_scores], axis=1)
+            indices = np.concatenate(
+                [top_indices, np.broadcast_to(indices, (len(queries), len(indices)))],
+                axis=1,
+            )
+            if scores.shape[1] > k:
+                keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+                scores = np.take_along_axis(scores, keep, axis=1)
+                indices = np.take_along_axis(indices, keep, axis=1)
+            top_scores, top_indices = scores, indices
+
+        return top_scores, top_indices
+
+
+##### Writer #####
+
+
+class EmbeddedCollectionWriter:
+    """Write an embedded collection with the `insert`/`flush` calls used at ingest.
+
+    Vectors are streamed to disk; scalar columns are kept in memory until `flush`.
+    Rows without the primary key get sequential ids (like Milvus `auto_id`).
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        vector_field: str = "embedding",
+        quantization: str | None = None,
+    ) -> None:
+        if quantization is not None and quantization not in QUANTIZATIONS:
+            raise ValueError(f"quantization must be one of {QUANTIZATIONS}")
+
+        self.path = Path(path)
+        self.vector_field = vector_field
+        self.quantization = quantization
+        self.num_entities = 0
+        self.dim = None
+        self._columns: dict[str, list] = {}
+
+        if self.path.exists():
+            shutil.rmtree(self.path)
+        self.path.mkdir(parents=True)
+        self._vectors = open(self.path / f"{vector_field}.f32", "wb")
+
+    def insert(self, rows: list[dict], partition_name: str | None = None) -> None:
+        """Append rows (partition_name is accepted and ignored, no partitions here)."""
+
+        for row in rows:
+            vector = np.asarray(row[self.vector_field], dtype="<f4")
+            if self.dim is None:
+                self.dim = len(vector)
+            if len(vector) != self.dim:
+                raise ValueError(f"Expected {self.dim} dims, got {len(vector)}")
+
+            row = {"id": self.num_entities, **row}
+            for name, value in row.items():
+                if name != self.vector_field:
+                    self._columns.setdefault(name, []).append(value)
+            self._vectors.write(vector.tobytes())
+            self.num_entities += 1
+
+    def flush(self) -> None:
+        """Write columns and manifest, the collection can be opened afterwards."""
+
+        self._vectors.flush()
+
+        kinds = {}
+        for name, values in self._columns.items():
+            if isinstance(values[0], list):
+                kinds[name] = ARRAY_KIND
+                offsets = np.zeros(len(values) + 1, dtype=np.int64)
+                offsets[1:] = np.cumsum([len(value) for value in values])
+                np.save(self.path / f"{name}.offsets.npy", offsets)
+                np.save(
+                    self.path / f"{name}.npy",
+                    np.fromiter(chain.from_iterable(values), dtype=np.int64),
+                )
+            elif isinstance(values[0], str):
+                kinds[name] = "string"
+                encoded = [value.encode("utf-8") for value in values]
+                offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+                offsets[1:] = np.cumsum([len(value) for value in encoded])
+                np.save(self.path / f"{name}.offsets.npy", offsets)
+                (self.path / f"{name}.utf8").write_bytes(b"".join(encoded))
+            else:
+                array = np.asarray(values)
+                if array.dtype.kind == "f":
+                    array = array.astype(np.float32)
+                kinds[name] = str(array.dtype)
+                np.save(self.path / f"{name}.npy", array)
+
+        if self.quantization is not None:
+            self._quantize()
+
+        manifest = {
+            "collection_id": time.time_ns(),
+            "num_entities": self.num_entities,
+            "vector_field": self.vector_field,
+            "dim": self.dim or 0,
+            "columns": kinds,
+            "quantization": self.quantization,
+        }
+        with open(self.path / "manifest.json", "w") as f:
+            json.dump(manifest, f)
+
+    def _quantize(self) -> None:
+        """Write the quantized index from the float32 vectors, block by block.
+
+        int8 uses a symmetric per-row scale, so `score = scale * (q @ int8_row)`.
+        """
+
+        vectors = np.memmap(
+            self.path / f"{self.vector_field}.f32",
+            dtype="<f4",
+            mode="r",
+            shape=(self.num_entities, self.dim or 0),
+        )
+
+        scales = np.zeros(self.num_entities, dtype=np.float32)
+        with open(self.path / f"{self.vector_field}.{self.quantization}", "wb") as f:
+            for start in range(0, self.num_entities, QUANTIZED_BLOCK_SIZE):
+                block = vectors[start : start + QUANTIZED_BLOCK_SIZE]
+                if self.quantization == "float16":
+                    f.write(block.astype(np.float16).tobytes())
+                    continue
+                scale = np.abs(block).max(axis=1) / 127
+                scale[scale == 0] = 1
+                scales[start : start + len(block)] = scale
+                f.write(np.round(block / scale[:, None]).astype(np.int8).tobytes())
+
+        if self.quantization == "int8":
+            np.save(self.path / f"{self.vector_field}.scales.npy", scales)
+
+    def close(self) -> None:
+        self._vectors.close()
+
+
+def swap_collection(staging_path: str | Path, path: str | Path) -> None:
+    """Replace the collection at path with the staging one (open readers pick it up)."""
+
+    staging_path, path = Path(staging_path), Path(path)
+    old_path = path.with_name(f"old_{path.name}")
+    if old_path.exists():
+        shutil.rmtree(old_path)
+    if path.exists():
+        os.rename(path, old_path)
+    os.rename(staging_path, path)
@@ -0,0 +1,21 @@
+"""Embedding reduction of a reduced-dimension articles index.
+
+Shared by ingestion (`vector_store.push_data` indexes the reduced article embeddings)
+and the API (`Engine` projects its queries), so that both reduce the same way.
+"""
+
+import numpy as np
+
+
+def reduce_embeddings(
+    embeddings: list[list[float]] | np.ndarray, mean: np.ndarray, components: np.ndarray
+) -> np.ndarray:
+    """Project embeddings on the reduced-dimension index space, normalized for IP.
+
+    PCA stores its components and mean, truncation the first unit vectors and a zero
+    mean, so both are applied the same way.
+    """
+
+    reduced = (np.asarray(embeddings, dtype=np.float32) - mean) @ components.T
+    norms = np.linalg.norm(reduced, axis=1, keepdims=True)
+    return reduced / np.maximum(norms, 1e-12)
@@ -0,0 +1,341 @@
+"""Recall, latency and memory of Milvus ANN indexes against exact search.
+
+The article embeddings (and the fields `rank_authors` needs) are read from the
+`articles` collection, in Milvus or in an embedded store directory. The exact top-k
+of every query is computed by a multi-threaded, blocked brute-force scan (numpy
+releases the GIL in matmul). Then every index config in `SWEEP` is built on a scratch
+copy of the articles in Milvus (the served collections are left untouched), loaded,
+and searched one query at a time, like the API does.
+
+Reported per config and search param:
+- article recall@10 and recall@n (n: the article pool of `search_authors`),
+- author recall@top_k: overlap of the `rank_authors` rankings of the ANN and exact
+  pools,
+- p50/p95 latency, and the loaded segments memory reported by Milvus.
+
+Queries are perturbed articles held out of the corpus (neither indexed nor in the
+exact search), so no OpenAI calls are needed.
+
+Usage:
+    python benchmarks/ann_recall.py
+    python benchmarks/ann_recall.py --source data/embedded --queries 500
+    python benchmarks/ann_recall.py --index HNSW --n 500 --top-k 20
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from engine import RESULTS_PATH as ENGINE_RESULTS_PATH
+from engine import get_commit
+from pymilvus import (
+    Collection,
+    CollectionSchema,
+    DataType,
+    FieldSchema,
+    connections,
+    utility,
+)
+
+sys.path.append(str(Path(__file__).parents[1] / "api"))
+
+from core import expand_authorship, query_all, rank_authors  # noqa: E402
+from embedded_store import EmbeddedCollection  # noqa: E402
+
+RESULTS_PATH = ENGINE_RESULTS_PATH.parent / "ann_recall.jsonl"
+SCRATCH_COLLECTION = "ann_eval"
+ARTICLE_FIELDS = ["publication_year", "cited_by", "embedding"]
+EXACT_BLOCK_SIZE = 16384  # corpus rows per brute-force block
+
+# (index type, build params, search param name, search param values)
+SWEEP = [
+    ("IVF_FLAT", {"nlist": 1024}, "nprobe", [4, 8, 16, 32, 64, 128]),
+    ("IVF_FLAT", {"nlist": 4096}, "nprobe", [16, 32, 64, 128, 256]),
+    ("IVF_SQ8", {"nlist": 1024}, "nprobe", [8, 16, 32, 64, 128]),
+    ("IVF_PQ", {"nlist": 1024, "m": 96, "nbits": 8}, "nprobe", [16, 32, 64, 128]),
+    ("HNSW", {"M": 16, "efConstruction": 200}, "ef", [500, 1000, 2000]),
+    ("HNSW", {"M": 32, "efConstruction": 256}, "ef", [500, 1000, 2000]),
+]
+
+
+def load_articles(article_collection) -> tuple[np.ndarray, dict]:
+    """Article embeddings and ranking fields, with the authors of every article.
+
+    Paged on the primary key (`query_all`), below Milvus' query result window.
+    """
+
+    rows = query_all(article_collection, "id >= 0", ARTICLE_FIELDS + ["author_ids"])
+    vectors = np.array([row.pop("embedding") for row in rows], dtype=np.float32)
+    fields = {
+        "author_ids": [[str(i) for i in row["author_ids"]] for row in rows],
+        "publication_year": np.array([row["publication_year"] or 0 for row in rows]),
+        "cited_by": np.array([row["cited_by"] for row in rows]),
+    }
+    return vectors, fields
+
+
+def make_queries(
+    vectors: np.ndarray, n_queries: int, seed: int = 0
+) -> tuple[np.ndarray, np.ndarray]:
+    """Perturbed corpus vectors, normalized like embeddings, and their row indices."""
+
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(vectors), size=n_queries, replace=False)
+    queries = vectors[rows]
+    queries = queries + rng.normal(scale=0.02, size=queries.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True), rows
+
+
+def hold_out(
+    vectors: np.ndarray, fields: dict, rows: np.ndarray
+) -> tuple[np.ndarray, dict]:
+    """Corpus without the query rows, so that a query never finds its own article."""
+
+    keep = np.ones(len(vectors), dtype=bool)
+    keep[rows] = False
+    fields = {
+        "author_ids": [ids for ids, kept in zip(fields["author_ids"], keep) if kept],
+        "publication_year": fields["publication_year"][keep],
+        "cited_by": fields["cited_by"][keep],
+    }
+    return vectors[keep], fields
+
+
+def exact_top_k(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    block_size: int = EXACT_BLOCK_SIZE,
+    workers: int | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Exact inner-product top-k (row indices, scores), best first.
+
+    Corpus blocks are scanned in parallel threads, each keeping its own top-k, and
+    the partial top-k are merged at the end.
+    """
+
+    k = min(k, len(vectors))
+
+    def scan(start: int) -> tuple[np.ndarray, np.ndarray]:
+        scores = queries @ vectors[start : start + block_size].T
+        kb = min(k, scores.shape[1])
+        top = np.argpartition(-scores, kb - 1, axis=1)[:, :kb]
+        return top + start, np.take_along_axis(scores, top, axis=1)
+
+    starts = range(0, len(vectors), block_size)
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        blocks = list(executor.map(scan, starts))
+
+    indices = np.concatenate([block[0] for block in blocks], axis=1)
+    scores = np.concatenate([block[1] for block in blocks], axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :k]
+    return np.take_along_axis(indices, order, 1), np.take_along_axis(scores, order, 1)
+
+
+def rank_pool(
+    indices: np.ndarray, scores: np.ndarray, fields: dict, top_k: int
+) -> list[str]:
+    """Top authors of an article pool, as `Engine.search_authors` ranks them."""
+
+    articles = [
+        {
+            "author_ids": fields["author_ids"][i],
+            "cited_by": fields["cited_by"][i],
+            "publication_year": fields["publication_year"][i],
+            "distance": 1 - score,
+        }
+        for i, score in zip(indices, scores)
+    ]
+    author_ids, _ = rank_authors(expand_authorship(articles), top_k=top_k)
+    return author_ids
+
+
+def recall(found: list, expected: list) -> float:
+    return len(set(found) & set(expected)) / len(expected) if len(expected) else 1.0
+
+
+def evaluate(
+    search,
+    queries: np.ndarray,
+    exact: tuple[np.ndarray, np.ndarray],
+    fields: dict,
+    n: int,
+    top_k: int,
+) -> dict:
+    """Recall and latency of `search(query, limit) -> (indices, scores)`."""
+
+    exact_indices, exact_scores = exact
+    latencies, article_recalls, article_recalls_10, author_recalls = [], [], [], []
+    for query, expected, expected_scores in zip(queries, exact_indices, exact_scores):
+        t0 = time.perf_counter()
+        indices, scores = search(query, n)
+        latencies.append(time.perf_counter() - t0)
+
+        article_recalls.append(recall(indices, expected))
+        article_recalls_10.append(recall(indices[:10], expected[:10]))
+        author_recalls.append(
+            recall(
+                rank_pool(indices, scores, fields, top_k),
+                rank_pool(expected, expected_scores, fields, top_k),
+            )
+        )
+
+    latencies = np.array(latencies) * 1000
+    return {
+        "recall@10": round(float(np.mean(article_recalls_10)), 4),
+        "recall@n": round(float(np.mean(article_recalls)), 4),
+        "author_recall": round(float(np.mean(author_recalls)), 4),
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+    }
+
+
+def create_scratch_collection(vectors: np.ndarray, batch_size: int = 5000):
+    """Copy of the article vectors in Milvus, keyed by row index."""
+
+    if utility.has_collection(SCRATCH_COLLECTION):
+        utility.drop_collection(SCRATCH_COLLECTION)
+    schema = CollectionSchema(
+        fields=[
+            FieldSchema(name="id", dtype=DataType.INT64, is_primary=True),
+            FieldSchema(
+                name="embedding", dtype=DataType.FLOAT_VECTOR, dim=vectors.shape[1]
+            ),
+        ],
+        description="ANN evaluation scratch copy of articles",
+    )
+    collection = Collection(name=SCRATCH_COLLECTION, schema=schema)
+    for start in range(0, len(vectors), batch_size):
+        block = vectors[start : start + batch_size]
+        collection.insert([list(range(start, start + len(block))), block.tolist()])
+    collection.flush()
+    return collection
+
+
+def milvus_search(collection: Collection, param: dict):
+    def search(query: np.ndarray, limit: int) -> tuple[np.ndarray, np.ndarray]:
+        (hits,) = collection.search([query.tolist()], "embedding", param, limit)
+        return np.array(hits.ids), np.array(hits.distances)
+
+    return search
+
+
+def segments_memory(collection: Collection) -> int:
+    """Bytes of the loaded segments (index included) reported by the query nodes."""
+
+    segments = utility.get_query_segment_info(collection.name)
+    return sum(segment.mem_size for segment in segments)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--source", default="milvus", help="'milvus' or an embedded store directory"
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--n", type=int, default=500, help="Article pool size")
+    parser.add_argument("--top-k", type=int, default=20, help="Authors compared")
+    parser.add_argument("--index", nargs="+", help="Only these index types")
+    parser.add_argument("--workers", type=int, help="Brute-force threads")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    connections.connect(
+        alias=os.getenv("MILVUS_ALIAS", "default"),
+        host=os.getenv("MILVUS_HOST", "127.0.0.1"),
+        port=os.getenv("MILVUS_PORT", "19530"),
+    )
+
+    if args.source == "milvus":
+        articles = Collection("articles")
+        articles.load()
+    else:
+        articles = EmbeddedCollection(Path(args.source) / "articles")
+    vectors, fields = load_articles(articles)
+    queries, rows = make_queries(vectors, args.queries)
+    vectors, fields = hold_out(vectors, fields, rows)
+
+    t0 = time.perf_counter()
+    exact = exact_top_k(vectors, queries, args.n, workers=args.workers)
+    exact_ms = (time.perf_counter() - t0) * 1000 / len(queries)
+    print(f"articles={len(vectors)} queries={len(queries)} n={args.n}")
+    print(f"exact brute force: {exact_ms:.1f} ms/query (batched, threaded)")
+
+    collection = create_scratch_collection(vectors)
+    del vectors
+
+    results = []
+    print(
+        f"{'index':<40}{'search':>12}{'rec@10':>8}{'rec@n':>8}{'authors':>9}"
+        f"{'p50 ms':>8}{'p95 ms':>8}{'MiB':>8}"
+    )
+    for index_type, build_params, search_key, values in SWEEP:
+        if args.index and index_type not in args.index:
+            continue
+
+        collection.release()
+        collection.drop_index()
+        index_params = {
+            "metric_type": "IP",
+            "index_type": index_type,
+            "params": build_params,
+        }
+        collection.create_index("embedding", index_params)
+        utility.wait_for_index_building_complete(collection.name)
+        collection.load()
+        memory = segments_memory(collection)
+
+        if search_key == "ef":
+            values = sorted({max(value, args.n) for value in values})  # ef >= limit
+        for value in values:
+            param = {"metric_type": "IP", "params": {search_key: value}}
+            result = evaluate(
+                milvus_search(collection, param),
+                queries,
+                exact,
+                fields,
+                args.n,
+                args.top_k,
+            )
+            result = {
+                "index": index_params,
+                "search": param["params"],
+                "memory_bytes": memory,
+                **result,
+            }
+            results.append(result)
+            print(
+                f"{index_type + ' ' + json.dumps(build_params):<40}"
+                f"{search_key + '=' + str(value):>12}"
+                f"{result['recall@10']:>8.3f}{result['recall@n']:>8.3f}"
+                f"{result['author_recall']:>9.3f}{result['p50_ms']:>8.1f}"
+                f"{result['p95_ms']:>8.1f}{memory / 2**20:>8.1f}"
+            )
+
+    utility.drop_collection(collection.name)
+
+    if not args.no_save:
+        RESULTS_PATH.parent.mkdir(exist_ok=True)
+        record = {
+            "commit": get_commit(),
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "source": args.source,
+            "articles": len(fields["author_ids"]),
+            "queries": len(queries),
+            "n": args.n,
+            "top_k": args.top_k,
+            "exact_ms": round(exact_ms, 2),
+            "results": results,
+        }
+        with open(RESULTS_PATH, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
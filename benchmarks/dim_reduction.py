@@ -0,0 +1,244 @@
+"""Memory, latency and ranking agreement of a reduced-dimension articles index.
+
+The articles of an embedded store directory (`main.py --backend embedded`, or a
+synthetic corpus by default) are re-indexed at every reduced dimension, by PCA or by
+truncation, next to their full-dimension vectors and the projection, like
+`main.py --index-dim` does. `Engine` then searches both stores with the same query
+vectors: the reduced one projects the queries and rescores its shortlists at full
+dimension (see `Engine._rescore`).
+
+Reported per reduction, against the full-dimension index:
+- article recall@n (n: the article pool of `search_authors`),
+- author agreement: overlap of the `rank_authors` top_k, and same top author,
+- p50/p95 search latency (rescoring included),
+- memory of the index vectors (the full vectors stay memory-mapped on disk).
+
+Queries are perturbed copies of indexed articles (`ann_recall.make_queries`), so
+no OpenAI calls are needed. Synthetic
+hashing embeddings have little low-dimensional structure, run on an ingested store
+for meaningful recall.
+
+Usage:
+    python benchmarks/dim_reduction.py
+    python benchmarks/dim_reduction.py --source data/embedded --dims 256 384
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from ann_recall import make_queries, recall
+from engine import RESULTS_PATH as ENGINE_RESULTS_PATH
+from engine import get_commit
+from sklearn.decomposition import PCA
+from synthetic import HashingEmbeddings, make_corpus
+
+sys.path.append(str(Path(__file__).parents[1] / "api"))
+
+from core import (  # noqa: E402
+    Engine,
+    TTLCache,
+    expand_authorship,
+    rank_authors,
+    reduce_embeddings,
+)
+from embedded_store import EmbeddedCollection, EmbeddedCollectionWriter  # noqa: E402
+
+RESULTS_PATH = ENGINE_RESULTS_PATH.parent / "dim_reduction.jsonl"
+PCA_SAMPLE_SIZE = 50000  # articles the PCA is fitted on
+
+
+def fit_reduction(
+    vectors: np.ndarray, dim: int, method: str
+) -> tuple[np.ndarray, np.ndarray]:
+    """(mean, components) like `vector_store.fit_reduction`, on a sample."""
+
+    if method == "truncate":
+        return np.zeros(vectors.shape[1]), np.eye(dim, vectors.shape[1])
+
+    rng = np.random.default_rng(0)
+    sample = rng.choice(len(vectors), min(PCA_SAMPLE_SIZE, len(vectors)), False)
+    pca = PCA(n_components=dim, random_state=0).fit(vectors[sample])
+    return pca.mean_, pca.components_
+
+
+def write_reduced_store(
+    path: Path, rows: list[dict], vectors: np.ndarray, mean: np.ndarray, components
+) -> None:
+    """Reduced articles, full-dimension article_vectors and embedding_projection."""
+
+    reduced = reduce_embeddings(vectors, mean, components)
+    collections = {
+        "articles": [{**row, "embedding": v} for row, v in zip(rows, reduced)],
+        "article_vectors": [
+            {"id": row["id"], "embedding": v} for row, v in zip(rows, vectors)
+        ],
+        "embedding_projection": [{"id": -1, "embedding": mean}]
+        + [{"id": i, "embedding": c} for i, c in enumerate(components)],
+    }
+    for name, collection_rows in collections.items():
+        writer = EmbeddedCollectionWriter(path / name)
+        writer.insert(collection_rows)
+        writer.flush()
+        writer.close()
+
+
+def make_engine(source: Path, articles: Path, reduced: bool) -> Engine:
+    return Engine(
+        author_collection=EmbeddedCollection(source / "authors"),
+        article_collection=EmbeddedCollection(articles / "articles"),
+        embeddings=HashingEmbeddings(),
+        response_cache=TTLCache(maxsize=0),
+        vector_collection=(
+            EmbeddedCollection(articles / "article_vectors") if reduced else None
+        ),
+        projection_collection=(
+            EmbeddedCollection(articles / "embedding_projection") if reduced else None
+        ),
+    )
+
+
+def run(engine: Engine, queries: np.ndarray, n: int, top_k: int) -> dict:
+    """Article ids, top authors and latencies of every query."""
+
+    article_ids, author_ids, latencies = [], [], []
+    for query in queries:
+        t0 = time.perf_counter()
+        (articles,) = engine._search([query.tolist()], limit=n)
+        latencies.append(time.perf_counter() - t0)
+        article_ids.append([article["id"] for article in articles])
+        author_ids.append(rank_authors(expand_authorship(articles), top_k=top_k)[0])
+    return {
+        "article_ids": article_ids,
+        "author_ids": author_ids,
+        "latencies": np.array(latencies) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--source", help="Embedded store directory (default: synthetic corpus)"
+    )
+    parser.add_argument("--authors", type=int, default=500)
+    parser.add_argument("--articles-per-author", type=int, default=40)
+    parser.add_argument("--dims", type=int, nargs="+", default=[256, 384])
+    parser.add_argument(
+        "--reduction", nargs="+", choices=["pca", "truncate"], default=["pca"]
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--n", type=int, default=500, help="Article pool size")
+    parser.add_argument("--top-k", type=int, default=20, help="Authors compared")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        source = Path(args.source) if args.source else tmp / "source"
+        if not args.source:
+            make_corpus(
+                source, args.authors, args.articles_per_author, coauthor_rate=0.1
+            )
+
+        articles = EmbeddedCollection(source / "articles")
+        fields = [f["name"] for f in articles.describe()["fields"]]
+        rows = articles.query(expr="id >= 0", output_fields=fields)
+        vectors = np.array([row.pop("embedding") for row in rows], dtype=np.float32)
+        queries, _ = make_queries(vectors, args.queries)
+
+        full = run(make_engine(source, source, False), queries, args.n, args.top_k)
+        full_mib = vectors.nbytes / 2**20
+        print(f"articles={len(vectors)} queries={len(queries)} n={args.n}")
+        print(
+            f"{'index':<16}{'rec@n':>8}{'authors':>9}{'top-1':>7}"
+            f"{'p50 ms':>8}{'p95 ms':>8}{'MiB':>8}"
+        )
+        print(
+            f"{'full ' + str(vectors.shape[1]):<16}{1:>8.3f}{1:>9.3f}{1:>7.3f}"
+            f"{np.percentile(full['latencies'], 50):>8.1f}"
+            f"{np.percentile(full['latencies'], 95):>8.1f}{full_mib:>8.1f}"
+        )
+
+        results = []
+        for method in args.reduction:
+            for dim in args.dims:
+                path = tmp / f"{method}_{dim}"
+                write_reduced_store(
+                    path, rows, vectors, *fit_reduction(vectors, dim, method)
+                )
+                reduced = run(
+                    make_engine(source, path, True), queries, args.n, args.top_k
+                )
+
+                latencies = reduced["latencies"]
+                result = {
+                    "reduction": method,
+                    "dim": dim,
+                    "recall@n": np.mean(
+                        [
+                            recall(found, expected)
+                            for found, expected in zip(
+                                reduced["article_ids"], full["article_ids"]
+                            )
+                        ]
+                    ),
+                    "author_agreement": np.mean(
+                        [
+                            recall(found, expected)
+                            for found, expected in zip(
+                                reduced["author_ids"], full["author_ids"]
+                            )
+                        ]
+                    ),
+                    "top1_agreement": np.mean(
+                        [
+                            found[:1] == expected[:1]
+                            for found, expected in zip(
+                                reduced["author_ids"], full["author_ids"]
+                            )
+                        ]
+                    ),
+                    "p50_ms": np.percentile(latencies, 50),
+                    "p95_ms": np.percentile(latencies, 95),
+                    "index_bytes": len(vectors) * dim * 4,
+                }
+                result = {
+                    key: round(float(value), 4) if isinstance(value, float) else value
+                    for key, value in result.items()
+                }
+                results.append(result)
+                print(
+                    f"{method + ' ' + str(dim):<16}{result['recall@n']:>8.3f}"
+                    f"{result['author_agreement']:>9.3f}{result['top1_agreement']:>7.3f}"
+                    f"{result['p50_ms']:>8.1f}{result['p95_ms']:>8.1f}"
+                    f"{result['index_bytes'] / 2**20:>8.1f}"
+                )
+
+    if not args.no_save:
+        RESULTS_PATH.parent.mkdir(exist_ok=True)
+        record = {
+            "commit": get_commit(),
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "source": args.source or "synthetic",
+            "articles": len(vectors),
+            "queries": len(queries),
+            "n": args.n,
+            "top_k": args.top_k,
+            "full": {
+                "p50_ms": round(float(np.percentile(full["latencies"], 50)), 2),
+                "p95_ms": round(float(np.percentile(full["latencies"], 95)), 2),
+                "index_bytes": vectors.nbytes,
+            },
+            "results": results,
+        }
+        with open(RESULTS_PATH, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""Latency benchmark of the `Engine` hot path, without Milvus or OpenAI.
+
+Runs `search_articles`, `search_authors` (article and centroid retrieval) and
+`get_author` on a synthetic corpus in the embedded store (see `synthetic.py`) over a
+grid of parameters, with the response cache disabled. Reports p50/p95/p99 latency and single-thread throughput, and
+appends the results (with the git commit) to `benchmarks/results/engine.jsonl`, so
+that runs can be compared between commits.
+
+Usage:
+    python benchmarks/engine.py
+    python benchmarks/engine.py --n 100 500 --with-plot 0 --repeat 50
+    python benchmarks/engine.py --compare  # against the previous run
+"""
+
+import argparse
+import itertools
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from synthetic import HashingEmbeddings, make_corpus, make_queries
+
+sys.path.append(str(Path(__file__).parents[1] / "api"))
+
+from core import Engine, TTLCache  # noqa: E402
+from embedded_store import EmbeddedCollection  # noqa: E402
+
+RESULTS_PATH = Path(__file__).parent / "results" / "engine.jsonl"
+
+
+def get_commit() -> str:
+    """Current commit, suffixed with "-dirty" if the tree has local changes."""
+
+    def git(*args: str) -> str:
+        return subprocess.run(
+            ["git", *args], capture_output=True, text=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+
+    commit = git("rev-parse", "--short", "HEAD") or "unknown"
+    return commit + ("-dirty" if git("status", "--porcelain", "--", "api") else "")
+
+
+def make_engine(path: Path) -> Engine:
+    return Engine(
+        author_collection=EmbeddedCollection(path / "authors"),
+        article_collection=EmbeddedCollection(path / "articles"),
+        centroid_collection=EmbeddedCollection(path / "author_centroids"),
+        embeddings=HashingEmbeddings(),
+        response_cache=TTLCache(maxsize=0),  # measure the work, not the cache
+    )
+
+
+def make_cases(args: argparse.Namespace) -> list[tuple[str, dict]]:
+    """(endpoint, parameters) grid."""
+
+    cases = []
+    for top_k, with_plot in itertools.product(args.top_k, args.with_plot):
+        cases.append(
+            ("search_articles", {"top_k": top_k, "with_plot": bool(with_plot)})
+        )
+    for n, m, top_k, with_plot, retrieval in itertools.product(
+        args.n, args.m, args.top_k, args.with_plot, args.retrieval
+    ):
+        parameters = {"top_k": top_k, "n": n, "m": m, "with_plot": bool(with_plot)}
+        if retrieval != "articles":  # default mode, keys comparable with older runs
+            parameters["retrieval"] = retrieval
+        cases.append(("search_authors", parameters))
+    cases.append(("get_author", {}))
+    return cases
+
+
+def run_case(
+    engine: Engine, endpoint: str, parameters: dict, queries: list[str], repeat: int
+) -> dict:
+    """Time `repeat` calls (after a warm up), cycling through the queries."""
+
+    def call(i: int) -> None:
+        if endpoint == "get_author":
+            author_id = i % len(engine.author_units)
+            engine.get_author(f"First{author_id}", f"Last{author_id}")
+        else:
+            # Threshold 1 keeps every hit, like a busy query
+            getattr(engine, endpoint)(
+                queries[i % len(queries)], distance_threshold=1.0, **parameters
+            )
+
+    for i in range(min(3, repeat)):
+        call(i)
+
+    latencies = []
+    start = time.perf_counter()
+    for i in range(repeat):
+        t0 = time.perf_counter()
+        call(i)
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+
+    latencies = np.array(latencies) * 1000
+    return {
+        "endpoint": endpoint,
+        "parameters": parameters,
+        "p50_ms": round(float(np.percentile(latencies, 50)), 2),
+        "p95_ms": round(float(np.percentile(latencies, 95)), 2),
+        "p99_ms": round(float(np.percentile(latencies, 99)), 2),
+        "throughput_qps": round(repeat / elapsed, 2),
+    }
+
+
+def load_previous(corpus: dict) -> dict | None:
+    """Latest stored run on the same corpus."""
+
+    if not RESULTS_PATH.exists():
+        return None
+    with open(RESULTS_PATH) as f:
+        runs = [json.loads(line) for line in f if line.strip()]
+    runs = [run for run in runs if run["corpus"] == corpus]
+    return runs[-1] if runs else None
+
+
+def case_key(result: dict) -> str:
+    return f"{result['endpoint']} {json.dumps(result['parameters'], sort_keys=True)}"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--authors", type=int, default=500)
+    parser.add_argument("--articles-per-author", type=int, default=40)
+    parser.add_argument("--n", type=int, nargs="+", default=[100, 500])
+    parser.add_argument("--m", type=int, nargs="+", default=[5, 20])
+    parser.add_argument("--top-k", type=int, nargs="+", default=[3, 20])
+    parser.add_argument("--with-plot", type=int, nargs="+", default=[0, 1])
+    parser.add_argument("--retrieval", nargs="+", default=["articles", "centroids"])
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--compare", action="store_true", help="Show previous run")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    corpus = {"authors": args.authors, "articles_per_author": args.articles_per_author}
+    previous = load_previous(corpus) if args.compare else None
+    previous_results = (
+        {case_key(result): result for result in previous["results"]} if previous else {}
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        make_corpus(tmp, args.authors, args.articles_per_author)
+        engine = make_engine(Path(tmp))
+        queries = make_queries(50)
+
+        results = []
+        print(f"{'case':<72}{'p50':>8}{'p95':>8}{'p99':>8}{'qps':>8}")
+        for endpoint, parameters in make_cases(args):
+            result = run_case(engine, endpoint, parameters, queries, args.repeat)
+            results.append(result)
+
+            line = (
+                f"{case_key(result):<72}{result['p50_ms']:>8.1f}"
+                f"{result['p95_ms']:>8.1f}{result['p99_ms']:>8.1f}"
+                f"{result['throughput_qps']:>8.1f}"
+            )
+            before = previous_results.get(case_key(result))
+            if before is not None:
+                line += f"  p50 x{result['p50_ms'] / before['p50_ms']:.2f}"
+            print(line)
+
+    if previous:
+        print(f"(ratios against {previous['commit']}, {previous['date']})")
+
+    if not args.no_save:
+        RESULTS_PATH.parent.mkdir(exist_ok=True)
+        record = {
+            "commit": get_commit(),
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "corpus": corpus,
+            "repeat": args.repeat,
+            "results": results,
+        }
+        with open(RESULTS_PATH, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
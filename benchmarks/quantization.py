@@ -0,0 +1,125 @@
+"""Recall, latency and memory of quantized embedded indexes vs. float32.
+
+Uses a synthetic clustered corpus with the production embedding width (1536) and
+queries that are perturbed corpus vectors. The float32 exact search is the
+reference, it is also the memory footprint of an IVF_FLAT index in Milvus.
+
+Usage:
+    python benchmarks/quantization.py --n 100000 --queries 200
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parents[1] / "api"))
+
+from embedded_store import (  # noqa: E402
+    QUANTIZATIONS,
+    EmbeddedCollection,
+    EmbeddedCollectionWriter,
+)
+
+
+def make_corpus(n: int, dim: int, n_clusters: int, seed: int = 0) -> np.ndarray:
+    """Unit vectors around random cluster centers (embeddings are anisotropic)."""
+
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim)).astype(np.float32)
+    vectors = centers[rng.integers(n_clusters, size=n)]
+    vectors += rng.normal(scale=0.6, size=(n, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def write_collection(path: Path, vectors: np.ndarray, quantization: str | None):
+    writer = EmbeddedCollectionWriter(path, quantization=quantization)
+    for start in range(0, len(vectors), 10000):
+        block = vectors[start : start + 10000]
+        writer.insert(
+            [
+                {"publication_year": 2000 + i % 24, "embedding": v}
+                for i, v in enumerate(block, start=start)
+            ]
+        )
+    writer.flush()
+    writer.close()
+
+
+def run(collection: EmbeddedCollection, queries: np.ndarray, limit: int, **param):
+    """Search one query at a time, like the API does."""
+
+    latencies, ids = [], []
+    for query in queries:
+        t0 = time.perf_counter()
+        (hits,) = collection.search([query], "embedding", {"params": param}, limit)
+        latencies.append(time.perf_counter() - t0)
+        ids.append([hit.id for hit in hits])
+    return np.array(latencies) * 1000, ids
+
+
+def recall(ids: list[list[int]], reference: list[list[int]]) -> float:
+    return float(
+        np.mean([len(set(a) & set(b)) / len(b) for a, b in zip(ids, reference)])
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=100_000, help="Corpus size")
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--clusters", type=int, default=500)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=100, help="top_k")
+    args = parser.parse_args()
+
+    vectors = make_corpus(args.n, args.dim, args.clusters)
+    rng = np.random.default_rng(1)
+    queries = vectors[rng.integers(args.n, size=args.queries)]
+    queries = queries + rng.normal(scale=0.02, size=queries.shape).astype(np.float32)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        collections = {}
+        for quantization in [None] + QUANTIZATIONS:
+            path = Path(tmp) / str(quantization)
+            write_collection(path, vectors, quantization)
+            collections[quantization] = EmbeddedCollection(path)
+        del vectors
+
+        _, reference = run(collections[None], queries, args.limit)
+
+        print(f"n={args.n} dim={args.dim} queries={args.queries} top_k={args.limit}")
+        print(
+            f"{'index':<10}{'rerank':>7}{'recall@10':>11}{'recall@k':>10}"
+            f"{'p50 ms':>9}{'p95 ms':>9}{'RAM MiB':>9}"
+        )
+        configs = [(None, 1)] + [(q, f) for q in QUANTIZATIONS for f in (1, 2, 4)]
+        for quantization, rerank_factor in configs:
+            collection = collections[quantization]
+            latencies, ids = run(
+                collection, queries, args.limit, rerank_factor=rerank_factor
+            )
+            if quantization is None:
+                memory = collection.vectors.nbytes  # whole matrix is hot
+            else:
+                memory = collection.index.nbytes + args.limit * rerank_factor * (
+                    args.dim * 4
+                )  # cold float32 rows paged in per query
+                if collection.scales is not None:
+                    memory += collection.scales.nbytes
+            print(
+                f"{str(quantization or 'float32'):<10}{rerank_factor:>7}"
+                f"{recall([i[:10] for i in ids], [r[:10] for r in reference]):>11.4f}"
+                f"{recall(ids, reference):>10.4f}"
+                f"{np.percentile(latencies, 50):>9.1f}"
+                f"{np.percentile(latencies, 95):>9.1f}"
+                f"{memory / 2**20:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Deterministic stand-ins for OpenAI embeddings and the Milvus corpus.
+
+`HashingEmbeddings` has the `embed_query`/`embed_documents` interface of
+`OpenAIEmbeddings`, and `make_corpus` writes embedded collections (see
+`api/embedded_store.py`) with the schema of the ingested ones, so that `Engine` runs
+fully in-process.
+"""
+
+import hashlib
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parents[1] / "api"))
+
+from embedded_store import EmbeddedCollectionWriter  # noqa: E402
+
+DIM = 1536
+VOCABULARY_SIZE = 5000
+TOPIC_SIZE = 40  # words per topic
+
+
+class HashingEmbeddings:
+    """Feature-hashing bag of words, normalized (same text, same vector)."""
+
+    model = "hashing"
+
+    def __init__(self, dim: int = DIM) -> None:
+        self.dim = dim
+
+    def embed_query(self, text: str) -> list[float]:
+        vector = np.zeros(self.dim)
+        for token in re.findall(r"\w+", text.lower()):
+            digest = hashlib.blake2b(token.encode(), digest_size=8).digest()
+            h = int.from_bytes(digest, "little")
+            vector[h % self.dim] += 1.0 if (h >> 63) else -1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(text) for text in texts]
+
+
+def article_id(doi: str) -> int:
+    """Article primary key of a DOI, like `vector_store.article_id` at ingest."""
+
+    digest = hashlib.blake2b(doi.lower().encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") >> 1
+
+
+def make_vocabulary(seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    return np.array(
+        [
+            "".join(rng.choice(letters, size=rng.integers(4, 10)))
+            for _ in range(VOCABULARY_SIZE)
+        ]
+    )
+
+
+def make_queries(n_queries: int, seed: int = 1) -> list[str]:
+    """Queries of 2 to 5 words, drawn from single topics like real ones."""
+
+    rng = np.random.default_rng(seed)
+    vocabulary = make_vocabulary()
+    queries = []
+    for _ in range(n_queries):
+        topic = rng.integers(VOCABULARY_SIZE // TOPIC_SIZE)
+        words = rng.choice(TOPIC_SIZE, size=rng.integers(2, 6), replace=False)
+        queries.append(" ".join(vocabulary[topic * TOPIC_SIZE + words]))
+    return queries
+
+
+def make_corpus(
+    path: str | Path,
+    n_authors: int = 500,
+    articles_per_author: int = 40,
+    n_units: int = 20,
+    seed: int = 0,
+    coauthor_rate: float = 0.0,
+) -> None:
+    """Write `authors`, `articles` and `author_centroids` collections under path.
+
+    Every author writes on 1 to 3 topics, so that authors have several sub-centroids.
+    Articles are stored once, a coauthor_rate share of them is also credited to a
+    random other author (in the articles' `author_ids`).
+    """
+
+    path = Path(path)
+    rng = np.random.default_rng(seed)
+    vocabulary = make_vocabulary()
+    embeddings = HashingEmbeddings()
+    projection = rng.normal(size=(DIM, 2))
+
+    authors = EmbeddedCollectionWriter(path / "authors")
+    articles = EmbeddedCollectionWriter(path / "articles")
+    centroids = EmbeddedCollectionWriter(path / "author_centroids")
+    author_rows = []
+
+    for author_id in range(n_authors):
+        topics = rng.choice(
+            VOCABULARY_SIZE // TOPIC_SIZE, size=rng.integers(1, 4), replace=False
+        )
+        article_topics = rng.choice(topics, size=articles_per_author)
+        titles = [
+            " ".join(vocabulary[topic * TOPIC_SIZE + rng.choice(TOPIC_SIZE, size=8)])
+            for topic in article_topics
+        ]
+        vectors = np.array(embeddings.embed_documents(titles))
+        coordinates = vectors @ projection
+
+        dois = [f"10.0/{author_id}.{i}" for i in range(articles_per_author)]
+        article_authors = []
+        for doi in dois:
+            article_authors.append([author_id])
+            if rng.random() < coauthor_rate:
+                coauthor_id = int(rng.integers(n_authors))
+                if coauthor_id != author_id:
+                    article_authors[-1].append(coauthor_id)
+
+        articles.insert(
+            [
+                {
+                    "id": article_id(doi),
+                    "doi": doi,
+                    "journal": "",
+                    "publication_year": int(rng.integers(1980, 2024)),
+                    "title": title,
+                    "abstract": "",
+                    "cited_by": int(rng.zipf(2.0)),
+                    "author_ids": author_ids,
+                    "x": float(x),
+                    "y": float(y),
+                    "embedding": vector,
+                }
+                for doi, title, author_ids, vector, (x, y) in zip(
+                    dois, titles, article_authors, vectors, coordinates
+                )
+            ]
+        )
+
+        centroid = vectors.mean(axis=0)
+        x, y = centroid @ projection
+        author_rows.append(
+            {
+                "id": author_id,
+                "unit_id": author_id % n_units,
+                "first_name": f"First{author_id}",
+                "last_name": f"Last{author_id}",
+                "community_name": "",
+                "x": float(x),
+                "y": float(y),
+                "embedding": centroid,
+            }
+        )
+
+        topic_centroids = []
+        for topic in topics:
+            members = vectors[article_topics == topic]
+            if len(members):
+                topic_centroid = members.mean(axis=0)
+                topic_centroids.append(
+                    {
+                        "author_id": author_id,
+                        "n_articles": len(members),
+                        "embedding": topic_centroid / np.linalg.norm(topic_centroid),
+                    }
+                )
+        centroids.insert(topic_centroids)
+
+    authors.insert(author_rows)
+
+    for writer in (authors, articles, centroids):
+        writer.flush()
+        writer.close()
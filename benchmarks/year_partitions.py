@@ -0,0 +1,154 @@
+"""Latency of `since_year` searches with and without year partition pruning.
+
+Runs on the ingested `articles` collection in Milvus (partitioned by publication
+year at ingest, see `vector_store.YEAR_PARTITIONS`), so both variants search the same
+data and index: the baseline passes only the `publication_year >= since_year` filter,
+the pruned variant also passes the partitions `Engine` selects. Queries are
+perturbed article embeddings, searched one at a time like the API does.
+
+Results are appended (with the git commit) to `benchmarks/results/year_partitions.jsonl`,
+like `engine.py` does. No run is recorded yet: the latency gain of pruning is
+unmeasured until this is run against an ingested Milvus collection.
+
+Usage:
+    python benchmarks/year_partitions.py
+    python benchmarks/year_partitions.py --since-year 1900 2015 2020 --queries 200
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+from engine import RESULTS_PATH as ENGINE_RESULTS_PATH
+from engine import get_commit
+from pymilvus import Collection, connections
+
+sys.path.append(str(Path(__file__).parents[1] / "api"))
+
+from core import (  # noqa: E402
+    get_index_type,
+    get_year_partitions,
+    make_search_param,
+    select_year_partitions,
+)
+
+RESULTS_PATH = ENGINE_RESULTS_PATH.parent / "year_partitions.jsonl"
+
+
+def sample_queries(collection: Collection, n_queries: int, seed: int = 0):
+    """Perturbed embeddings of random articles, normalized like embeddings."""
+
+    rows = collection.query(
+        expr="publication_year >= 0", output_fields=["embedding"], limit=16384
+    )
+    rng = np.random.default_rng(seed)
+    picked = rng.choice(len(rows), size=min(n_queries, len(rows)), replace=False)
+    queries = np.array([rows[i]["embedding"] for i in picked], dtype=np.float32)
+    queries += rng.normal(scale=0.02, size=queries.shape).astype(np.float32)
+    return queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+
+def run(
+    collection: Collection,
+    queries: np.ndarray,
+    since_year: int,
+    limit: int,
+    partition_names: list[str] | None,
+) -> tuple[np.ndarray, list[list[int]]]:
+    param = make_search_param(get_index_type(collection), limit)
+    latencies, ids = [], []
+    for query in queries:
+        t0 = time.perf_counter()
+        (hits,) = collection.search(
+            [query.tolist()],
+            "embedding",
+            param,
+            limit,
+            expr=f"publication_year >= {since_year}",
+            partition_names=partition_names,
+        )
+        latencies.append(time.perf_counter() - t0)
+        ids.append(list(hits.ids))
+    return np.array(latencies) * 1000, ids
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--since-year", type=int, nargs="+", default=[1900, 2000, 2015, 2020, 2022]
+    )
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--limit", type=int, default=500, help="search_authors n")
+    parser.add_argument("--no-save", action="store_true")
+    args = parser.parse_args()
+
+    connections.connect(
+        alias=os.getenv("MILVUS_ALIAS", "default"),
+        host=os.getenv("MILVUS_HOST", "127.0.0.1"),
+        port=os.getenv("MILVUS_PORT", "19530"),
+    )
+    collection = Collection("articles")
+    collection.load()
+
+    partitions = get_year_partitions(collection)
+    if not partitions:
+        sys.exit("articles has no year partitions, re-ingest with main.py first")
+    queries = sample_queries(collection, args.queries)
+
+    print(f"articles={collection.num_entities} queries={len(queries)}")
+    print(
+        f"{'since':>6}{'partitions':>12}{'p50 all':>9}{'p50 pruned':>12}"
+        f"{'p95 all':>9}{'p95 pruned':>12}{'speedup':>9}{'same hits':>11}"
+    )
+    results = []
+    for since_year in args.since_year:
+        names = select_year_partitions(partitions, since_year)
+        baseline, baseline_ids = run(collection, queries, since_year, args.limit, None)
+        pruned, pruned_ids = run(collection, queries, since_year, args.limit, names)
+        same = np.mean(
+            [
+                len(set(a) & set(b)) / max(len(b), 1)
+                for a, b in zip(pruned_ids, baseline_ids)
+            ]
+        )
+        print(
+            f"{since_year:>6}{len(names):>7}/{len(partitions):<4}"
+            f"{np.percentile(baseline, 50):>9.1f}{np.percentile(pruned, 50):>12.1f}"
+            f"{np.percentile(baseline, 95):>9.1f}{np.percentile(pruned, 95):>12.1f}"
+            f"{np.median(baseline) / np.median(pruned):>8.2f}x{same:>11.3f}"
+        )
+        results.append(
+            {
+                "since_year": since_year,
+                "partitions": len(names),
+                "p50_ms": round(float(np.percentile(baseline, 50)), 2),
+                "p95_ms": round(float(np.percentile(baseline, 95)), 2),
+                "pruned_p50_ms": round(float(np.percentile(pruned, 50)), 2),
+                "pruned_p95_ms": round(float(np.percentile(pruned, 95)), 2),
+                "same_hits": round(float(same), 4),
+            }
+        )
+
+    if not args.no_save:
+        RESULTS_PATH.parent.mkdir(exist_ok=True)
+        record = {
+            "commit": get_commit(),
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "articles": collection.num_entities,
+            "partitions": len(partitions),
+            "index": get_index_type(collection),
+            "queries": len(queries),
+            "limit": args.limit,
+            "results": results,
+        }
+        with open(RESULTS_PATH, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+
+if __name__ == "__main__":
+    main()
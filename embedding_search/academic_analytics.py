@@ -24,6 +24,20 @@ def get_units(institution_id: int = 14) -> list[dict]:
     return response.json()
 
 
+def get_unit_names(institution_id: int = 14) -> dict[int, str]:
+    """Get names of all non-administrative units.
+
+    Args:
+        institution_id (int, optional): Institution ID. Defaults to 14 (UW-Madison).
+    """
+
+    return {
+        unit["unitId"]: unit["unit"]["name"]
+        for unit in get_units(institution_id)
+        if not unit["unit"]["isAdministrator"]
+    }
+
+
 @cache
 def get_faculties(unit_id: int, institution_id: int = 14) -> list[dict]:
     """Get all faculty members in a unit."""
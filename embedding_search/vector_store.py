@@ -1,8 +1,11 @@
+import hashlib
 import os
 import logging
 from pathlib import Path
 from functools import cache
+import numpy as np
 from dotenv import load_dotenv
+from api.reduction import reduce_embeddings
 from embedding_search.data_model import Author
 from pymilvus import (
     CollectionSchema,
@@ -12,6 +15,8 @@ from pymilvus import (
     connections,
     utility,
 )
+from sklearn.cluster import KMeans
+from sklearn.decomposition import IncrementalPCA
 
 load_dotenv()
 
@@ -20,13 +25,50 @@ DEBUG = int(os.getenv("DEBUG", 0))
 MILVUS_ALIAS = os.getenv("MILVUS_ALIAS", "default")
 MILVUS_HOST = os.getenv("MILVUS_HOST", "localhost")
 MILVUS_PORT = os.getenv("MILVUS_PORT", "19530")
-
-# Embedding specific index settings
-INDEX_PARAMS = {
-    "metric_type": "IP",  # inner-product
-    "index_type": "IVF_FLAT",
-    "params": {"nlist": 1024},
+AUTHOR_CENTROIDS = int(os.getenv("AUTHOR_CENTROIDS", 3))  # sub-centroids per author
+
+# Embedding index presets, the API picks matching search params (`core.SEARCH_PARAMS`)
+INDEX_CONFIGS = {
+    "FLAT": {  # exact, no training (full-dimension vectors, fetched by id)
+        "metric_type": "IP",
+        "index_type": "FLAT",
+        "params": {},
+    },
+    "IVF_FLAT": {
+        "metric_type": "IP",  # inner-product
+        "index_type": "IVF_FLAT",
+        "params": {"nlist": 1024},
+    },
+    "HNSW": {  # lowest latency, graph on top of the float32 vectors
+        "metric_type": "IP",
+        "index_type": "HNSW",
+        "params": {"M": 16, "efConstruction": 200},
+    },
+    "IVF_SQ8": {  # 4x less memory than IVF_FLAT, int8 vectors
+        "metric_type": "IP",
+        "index_type": "IVF_SQ8",
+        "params": {"nlist": 1024},
+    },
 }
+# Article partitions by publication year, (first, last) inclusive, narrower when recent
+YEAR_PARTITIONS = [
+    (0, 1989),  # includes unknown years (0)
+    (1990, 1999),
+    (2000, 2004),
+    (2005, 2009),
+    (2010, 2014),
+    (2015, 2017),
+    (2018, 2019),
+    (2020, 2021),
+    (2022, 2023),
+    (2024, 9999),
+]
+ARTICLE_INDEX = os.getenv("ARTICLE_INDEX", "IVF_FLAT")
+AUTHOR_INDEX = os.getenv("AUTHOR_INDEX", "IVF_FLAT")  # authors and sub-centroids
+EMBEDDING_DIM = 1536
+INDEX_DIM = int(os.getenv("INDEX_DIM", EMBEDDING_DIM))  # article index dimension
+DIM_REDUCTIONS = ["pca", "truncate"]
+MAX_ARTICLE_AUTHORS = 4096  # capacity of the articles' `author_ids` array
 
 
 @cache
@@ -35,34 +77,74 @@ def get_author(id: str) -> Author:
     return Author.load(AUTHORS_DIR / f"{id}.json")
 
 
-def create_article_collection(name: str = "articles") -> Collection:
-    """Create a articles collection in Milvus."""
+def create_article_collection(
+    name: str = "articles", dim: int = EMBEDDING_DIM
+) -> Collection:
+    """Create a articles collection in Milvus (dim below 1536: reduced embeddings)."""
 
     schema = CollectionSchema(
         fields=[
-            FieldSchema(name="id", dtype=DataType.INT64, is_primary=True),
             FieldSchema(
-                name="doi", dtype=DataType.VARCHAR, max_length=256
-            ),  # NOT UNIQUE: multiple authors can have the same article
+                name="id", dtype=DataType.INT64, is_primary=True
+            ),  # `article_id` of the DOI
             FieldSchema(
-                name="author_id", dtype=DataType.INT64
-            ),  # Only 1-1 mapping for now
+                name="doi", dtype=DataType.VARCHAR, max_length=256
+            ),  # UNIQUE: co-authors share the article, see `author_ids`
             FieldSchema(name="journal", dtype=DataType.VARCHAR, max_length=2048),
             FieldSchema(name="publication_year", dtype=DataType.INT32),
             FieldSchema(name="title", dtype=DataType.VARCHAR, max_length=2048),
             FieldSchema(name="abstract", dtype=DataType.VARCHAR, max_length=65535),
             FieldSchema(name="cited_by", dtype=DataType.INT32),
-            FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=1536),
+            FieldSchema(
+                name="author_ids",
+                dtype=DataType.ARRAY,
+                element_type=DataType.INT64,
+                max_capacity=MAX_ARTICLE_AUTHORS,
+            ),  # faculty authors of the article (see `map_coauthors`)
+            FieldSchema(name="x", dtype=DataType.FLOAT),  # 2d projection for plots
+            FieldSchema(name="y", dtype=DataType.FLOAT),
+            FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=dim),
         ],
         description="Articles",
-        auto_id=True,
     )
 
     collection = Collection(name=name, schema=schema)
-    collection.create_index("embedding", INDEX_PARAMS)
+    for first, last in YEAR_PARTITIONS:
+        collection.create_partition(f"year_{first}_{last}")
     return collection
 
 
+def year_partition(year: int) -> str:
+    """Name of the articles partition of a publication year."""
+
+    for first, last in YEAR_PARTITIONS:
+        if first <= year <= last:
+            return f"year_{first}_{last}"
+    raise ValueError(f"No partition for year {year}")
+
+
+def normalize_doi(doi: str) -> str:
+    """Canonical DOI: lowercase, without resolver prefix ("https://doi.org/...")."""
+
+    doi = doi.strip().lower()
+    for prefix in (
+        "https://doi.org/",
+        "http://doi.org/",
+        "https://dx.doi.org/",
+        "doi:",
+    ):
+        if doi.startswith(prefix):
+            return doi[len(prefix) :]
+    return doi
+
+
+def article_id(doi: str) -> int:
+    """Deterministic article id of a DOI (63-bit hash, same across ingestions)."""
+
+    digest = hashlib.blake2b(normalize_doi(doi).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") >> 1
+
+
 def create_author_collection(name: str = "authors") -> Collection:
     """Create a authors collection in Milvus."""
 
@@ -73,16 +155,146 @@ def create_author_collection(name: str = "authors") -> Collection:
             FieldSchema(name="first_name", dtype=DataType.VARCHAR, max_length=256),
             FieldSchema(name="last_name", dtype=DataType.VARCHAR, max_length=256),
             FieldSchema(name="community_name", dtype=DataType.VARCHAR, max_length=256),
+            FieldSchema(name="x", dtype=DataType.FLOAT),  # 2d projection of centroid
+            FieldSchema(name="y", dtype=DataType.FLOAT),
             FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=1536),
         ],
         description="Authors",
     )
-    collection = Collection(name=name, schema=schema)
-    collection.create_index("embedding", INDEX_PARAMS)
-    return collection
+    return Collection(name=name, schema=schema)
+
+
+def create_author_centroid_collection(name: str = "author_centroids") -> Collection:
+    """Create a author sub-centroids collection in Milvus (k per author)."""
+
+    schema = CollectionSchema(
+        fields=[
+            FieldSchema(name="id", dtype=DataType.INT64, is_primary=True),
+            FieldSchema(name="author_id", dtype=DataType.INT64),
+            FieldSchema(name="n_articles", dtype=DataType.INT32),  # cluster size
+            FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=1536),
+        ],
+        description="Author sub-centroids",
+        auto_id=True,
+    )
+    return Collection(name=name, schema=schema)
+
+
+def create_article_vector_collection(name: str = "article_vectors") -> Collection:
+    """Create the full-dimension article embeddings collection in Milvus.
+
+    Only used with a reduced-dimension articles index, to rescore its shortlists.
+    """
+
+    schema = CollectionSchema(
+        fields=[
+            FieldSchema(name="id", dtype=DataType.INT64, is_primary=True),
+            FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=1536),
+        ],
+        description="Full-dimension article embeddings",
+    )
+    return Collection(name=name, schema=schema)
+
+
+def create_projection_collection(name: str = "embedding_projection") -> Collection:
+    """Create the embedding reduction collection in Milvus (components and mean)."""
+
+    schema = CollectionSchema(
+        fields=[
+            FieldSchema(name="id", dtype=DataType.INT64, is_primary=True),
+            FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=1536),
+        ],
+        description="Article embedding reduction",
+    )
+    return Collection(name=name, schema=schema)
+
+
+def build_index(
+    collection: Collection, index: str = "IVF_FLAT", timeout: float | None = None
+) -> None:
+    """Build the embedding index of a collection and wait for completion.
+
+    Call after bulk insert and flush: IVF centroids are then trained on all the data,
+    instead of indexing segments one by one as they are sealed.
+    """
+
+    collection.create_index("embedding", INDEX_CONFIGS[index])
+    utility.wait_for_index_building_complete(collection.name, timeout=timeout)
 
 
-def make_author_data_package(author_id: str) -> dict:
+def fit_projection(
+    author_ids: list[str], n_components: int = 2, batch_size: int = 2048
+) -> IncrementalPCA:
+    """Fit one global PCA projection over all article embeddings in the corpus.
+
+    Used to precompute plot coordinates at ingest time (2d), and to reduce the
+    dimension of the articles index (see `fit_reduction`).
+    """
+
+    projection = IncrementalPCA(n_components=n_components)
+    batch_size = max(batch_size, n_components)  # partial_fit needs enough rows
+
+    batch = []
+    for author_id in author_ids:
+        author = get_author(author_id)
+        batch.extend(x for x in author.articles_embeddings if len(x) == 1536)
+        if len(batch) >= batch_size:
+            projection.partial_fit(np.array(batch))
+            batch = []
+
+    if len(batch) >= projection.n_components:
+        projection.partial_fit(np.array(batch))
+    return projection
+
+
+def map_coauthors(author_ids: list[str]) -> dict[int, list[int]]:
+    """Faculty authors of every article (by `article_id`), in ingestion order.
+
+    Articles are stored once per DOI with all their authors, so co-authorship is
+    mapped over the whole corpus before ingestion (see `push_data`).
+    """
+
+    coauthors: dict[int, list[int]] = {}
+    for author_id in author_ids:
+        author = get_author(author_id)
+        for article in author.articles:
+            if article.doi is None:
+                continue
+            authors = coauthors.setdefault(article_id(article.doi), [])
+            if int(author.id) not in authors:
+                authors.append(int(author.id))
+    return coauthors
+
+
+def fit_reduction(
+    author_ids: list[str], dim: int, method: str = "pca"
+) -> tuple[np.ndarray, np.ndarray]:
+    """Reduction (mean, components) of the article embeddings to dim dimensions.
+
+    "pca" fits the top dim principal components, "truncate" keeps the first dim
+    coordinates (Matryoshka-style, only for embedding models trained for it).
+    """
+
+    if method == "truncate":
+        return np.zeros(EMBEDDING_DIM), np.eye(dim, EMBEDDING_DIM)
+    if method != "pca":
+        raise ValueError(f"method must be one of {DIM_REDUCTIONS}")
+
+    pca = fit_projection(author_ids, n_components=dim)
+    return pca.mean_, pca.components_
+
+
+def push_projection(
+    collection: Collection, mean: np.ndarray, components: np.ndarray
+) -> None:
+    """Store a reduction for the API: components by id, and the mean with id -1."""
+
+    rows = [{"id": -1, "embedding": mean.tolist()}]
+    rows += [{"id": i, "embedding": c.tolist()} for i, c in enumerate(components)]
+    collection.insert(rows)
+
+
+def make_author_data_package(author_id: str, projection: IncrementalPCA) -> dict:
     """Convert into data package that fits Milvus schema."""
 
     author = get_author(author_id)
@@ -95,21 +307,38 @@ def make_author_data_package(author_id: str) -> dict:
         data["community_name"] = ""
 
     data["embedding"] = author.embedding  # this is property
+    data["x"], data["y"] = projection.transform([data["embedding"]])[0].tolist()
     return data
 
 
-def make_articles_data_packages(author_id: str) -> list[dict]:
+def make_articles_data_packages(
+    author_id: str, projection: IncrementalPCA
+) -> list[dict]:
     """Convert into data package that fits Milvus schema."""
 
     author = get_author(author_id)
-
-    data_packages = []
-    for article, embedding in zip(author.articles, author.articles_embeddings):
+    if not author.articles:
+        return []
+
+    # Project valid embeddings only (malformed ones are rejected by Milvus anyway)
+    valid = np.array([len(x) == 1536 for x in author.articles_embeddings])
+    coordinates = np.zeros((len(valid), 2))
+    if valid.any():
+        coordinates[valid] = projection.transform(
+            [x for x, is_valid in zip(author.articles_embeddings, valid) if is_valid]
+        )
+    coordinates = coordinates.tolist()
+
+    data_packages = {}
+    for article, embedding, (x, y) in zip(
+        author.articles, author.articles_embeddings, coordinates
+    ):
         if article.doi is None:
             continue
 
-        data = article.model_dump().copy()
-        data["author_id"] = author.id
+        data = article.model_dump(exclude={"author_id"}).copy()
+        data["id"] = article_id(article.doi)
+        data["doi"] = normalize_doi(article.doi)
         if data["abstract"] is None:
             data["abstract"] = ""
         if data["journal"] is None:
@@ -119,9 +348,42 @@ def make_articles_data_packages(author_id: str) -> list[dict]:
         if data["cited_by"] is None:
             data["cited_by"] = 0
         data["embedding"] = embedding
-        data_packages.append(data)
+        data["x"], data["y"] = x, y
+        data_packages[data["id"]] = data  # once per DOI
 
-    return data_packages
+    return list(data_packages.values())
+
+
+def make_author_centroids_data_packages(
+    author_id: str, k: int = AUTHOR_CENTROIDS
+) -> list[dict]:
+    """Cluster an author's articles into k sub-centroids (topics), one package each.
+
+    Centroids are normalized, so that inner-product matches the article metric.
+    """
+
+    author = get_author(author_id)
+    embeddings = np.array([x for x in author.articles_embeddings if len(x) == 1536])
+    if len(embeddings) == 0:
+        return []
+
+    k = min(k, len(embeddings))
+    if k == 1:
+        labels = np.zeros(len(embeddings), dtype=int)
+        centroids = embeddings.mean(axis=0, keepdims=True)
+    else:
+        kmeans = KMeans(n_clusters=k, n_init=3, random_state=0).fit(embeddings)
+        labels, centroids = kmeans.labels_, kmeans.cluster_centers_
+    centroids /= np.linalg.norm(centroids, axis=1, keepdims=True)
+
+    return [
+        {
+            "author_id": author.id,
+            "n_articles": int((labels == i).sum()),
+            "embedding": centroid.tolist(),
+        }
+        for i, centroid in enumerate(centroids)
+    ]
 
 
 def connect_milvus() -> None:
@@ -131,30 +393,84 @@ def connect_milvus() -> None:
 
 
 def init_milvus() -> None:
-    """Initialize Milvus (assume connection exist)."""
+    """Initialize Milvus (assume connection exist).
+
+    Only creates the empty collections: indexes are built after the bulk insert of
+    an ingestion (see `build_index`), on the staging collections swapped in.
+    """
 
     # Create collections
     logging.info("Creating collections...")
     create_article_collection()
     create_author_collection()
+    create_author_centroid_collection()
 
 
 def push_data(
-    author_id: str, author_collection: Collection, article_collection: Collection
+    author_id: str,
+    author_collection: Collection,
+    article_collection: Collection,
+    projection: IncrementalPCA,
+    centroid_collection: Collection | None = None,
+    ingested_articles: set[int] | None = None,
+    coauthors: dict[int, list[int]] | None = None,
+    reduction: tuple[np.ndarray, np.ndarray] | None = None,
+    vector_collection: Collection | None = None,
 ) -> None:
     """Push author data to Milvus.
 
+    Articles are stored once per DOI: pass the same `ingested_articles` set (ids of
+    the articles already pushed) for a whole ingestion session, and the `coauthors`
+    mapping (see `map_coauthors`) to store all the faculty authors of each article
+    in its `author_ids` (only this author without it).
+
+    With a reduction (see `fit_reduction`), articles are indexed by their reduced
+    embeddings, and the full ones are pushed to vector_collection for rescoring.
+
     Note. Remember to call collection.flush() after ingestion session.
     """
 
-    # Ingest authors
-    logging.info(f"Ingesting author {author_id}...")
-    author_data_package = make_author_data_package(author_id)
-    author_collection.insert([author_data_package])
+    if ingested_articles is None:
+        ingested_articles = set()
+    if coauthors is None:
+        coauthors = {}
 
-    # Ingest articles (can be quite large)
-    articles_data_package = make_articles_data_packages(author_id)
-    article_collection.insert(articles_data_package)
+    # Ingest the author before their articles: if it fails, none of them is pushed
+    logging.info(f"Ingesting author {author_id}...")
+    author_collection.insert([make_author_data_package(author_id, projection)])
+
+    # Ingest articles (can be quite large), into their publication year partitions
+    articles_data_package = make_articles_data_packages(author_id, projection)
+    partitions: dict[str, list[dict]] = {}
+    for data in articles_data_package:
+        if data["id"] in ingested_articles:
+            continue  # co-authored article, pushed with another author
+        author_ids = coauthors.get(data["id"], [int(author_id)])
+        data["author_ids"] = author_ids[:MAX_ARTICLE_AUTHORS]
+        partition = year_partition(data["publication_year"])
+        partitions.setdefault(partition, []).append(data)
+    for partition, data in partitions.items():
+        if reduction is not None:
+            vector_collection.insert(
+                [
+                    {"id": article["id"], "embedding": article["embedding"]}
+                    for article in data
+                ]
+            )
+            reduced = reduce_embeddings(
+                [article["embedding"] for article in data], *reduction
+            )
+            data = [
+                {**article, "embedding": embedding}
+                for article, embedding in zip(data, reduced.tolist())
+            ]
+        article_collection.insert(data, partition_name=partition)
+        ingested_articles.update(article["id"] for article in data)
+
+    # Ingest author sub-centroids (for author-first retrieval)
+    if centroid_collection is not None:
+        centroids_data_package = make_author_centroids_data_packages(author_id)
+        centroid_collection.insert(centroids_data_package)
 
 
 def print_collections() -> None:
@@ -1,4 +1,5 @@
 import argparse
+import json
 import logging
 import os
 from pathlib import Path
@@ -7,12 +8,32 @@ from dotenv import load_dotenv
 from pymilvus import utility, Collection
 from tqdm import tqdm
 
+from api.embedded_store import (
+    QUANTIZATIONS,
+    EmbeddedCollectionWriter,
+    swap_collection,
+)
+from embedding_search.academic_analytics import get_unit_names
 from embedding_search.vector_store import (
+    ARTICLE_INDEX,
+    AUTHOR_INDEX,
+    DIM_REDUCTIONS,
+    EMBEDDING_DIM,
+    INDEX_CONFIGS,
+    INDEX_DIM,
+    build_index,
     connect_milvus,
     create_article_collection,
+    create_article_vector_collection,
+    create_author_centroid_collection,
     create_author_collection,
+    create_projection_collection,
+    fit_projection,
+    fit_reduction,
     init_milvus,
+    map_coauthors,
     push_data,
+    push_projection,
     print_collections,
 )
 
@@ -20,14 +41,40 @@ load_dotenv()
 
 AUTHORS_DIR = os.getenv("AUTHORS_DIR")
 MILVUS_ALIAS = os.getenv("MILVUS_ALIAS", "default")
+UNITS_SNAPSHOT_PATH = os.getenv("UNITS_SNAPSHOT_PATH")
+EMBEDDED_STORE_DIR = Path(os.getenv("EMBEDDED_STORE_DIR", "data/embedded"))
 AUTHORS_DIR = Path(AUTHORS_DIR)
 print(f"{AUTHORS_DIR=}")
 
 logging.basicConfig(filename="main.log", level=logging.INFO)
 
 
-def ingest(init: bool = False, debug: bool = False) -> None:
-    """Ingest data to Milvus."""
+def save_units_snapshot(path: str) -> None:
+    """Save unit names, used by the API to seed its `/get_units/` cache."""
+
+    with open(path, "w") as f:
+        json.dump(get_unit_names(), f)
+
+
+def ingest(
+    init: bool = False,
+    debug: bool = False,
+    article_index: str = ARTICLE_INDEX,
+    author_index: str = AUTHOR_INDEX,
+    index_dim: int = INDEX_DIM,
+    reduction: str = "pca",
+) -> None:
+    """Ingest data to Milvus.
+
+    Args:
+        init: Create the collections first.
+        debug: Only ingest the first 100 authors.
+        article_index: Index preset of the articles (see `INDEX_CONFIGS`).
+        author_index: Index preset of the authors and their sub-centroids.
+        index_dim: Dimension of the articles index, below 1536 the full embeddings
+            are kept in `article_vectors` for rescoring.
+        reduction: Reduction method to index_dim, "pca" or "truncate".
+    """
 
     connect_milvus()
 
@@ -38,39 +85,250 @@ def ingest(init: bool = False, debug: bool = False) -> None:
 
     # Create new staging collections
     author_collection = create_author_collection(name="staging_authors")
-    article_collection = create_article_collection(name="staging_articles")
+    article_collection = create_article_collection(
+        name="staging_articles", dim=index_dim
+    )
+    centroid_collection = create_author_centroid_collection(
+        name="staging_author_centroids"
+    )
 
     # Ingest data
     if debug:
         author_ids = author_ids[:100]
 
+    # Global 2d projection for plots, stored as x/y of every article and author
+    logging.info("Fitting 2d projection...")
+    projection = fit_projection(author_ids)
+
+    # Reduced-dimension articles index, full embeddings kept for rescoring
+    reduced = index_dim < EMBEDDING_DIM
+    dim_reduction, vector_collection = None, None
+    if reduced:
+        logging.info(f"Fitting {reduction} reduction to {index_dim} dims...")
+        dim_reduction = fit_reduction(author_ids, index_dim, reduction)
+        vector_collection = create_article_vector_collection(
+            name="staging_article_vectors"
+        )
+        projection_collection = create_projection_collection(
+            name="staging_embedding_projection"
+        )
+        push_projection(projection_collection, *dim_reduction)
+
+    logging.info("Mapping co-authors...")
+    coauthors = map_coauthors(author_ids)
+    ingested_articles = set()  # one article per DOI, shared by co-authors
     for author_id in tqdm(author_ids):
         try:
-            push_data(author_id, author_collection, article_collection)
+            push_data(
+                author_id,
+                author_collection,
+                article_collection,
+                projection,
+                centroid_collection,
+                ingested_articles=ingested_articles,
+                coauthors=coauthors,
+                reduction=dim_reduction,
+                vector_collection=vector_collection,
+            )
         except Exception as e:
             logging.error(f"Error pushing {author_id}: {e}")
 
     # Flush data to make sure everything is persisted
     author_collection.flush()
     article_collection.flush()
+    centroid_collection.flush()
+    if reduced:
+        vector_collection.flush()
+        projection_collection.flush()
+
+    # Build indexes on the bulk inserted data, before the collections go live
+    logging.info("Building indexes...")
+    build_index(author_collection, author_index)
+    build_index(article_collection, article_index)
+    build_index(centroid_collection, author_index)
+    if reduced:  # only read by id, the index is required to load them
+        build_index(vector_collection, "FLAT")
+        build_index(projection_collection, "FLAT")
 
     # Swap staging collections with production collections
+    # (running APIs see new collection ids and rebuild their in-memory indexes;
+    # full vectors and projection first, they are read once articles change)
+    if reduced:
+        for name in ("article_vectors", "embedding_projection"):
+            if utility.has_collection(name):
+                utility.rename_collection(name, f"old_{name}")
+            utility.rename_collection(f"staging_{name}", name)
     utility.rename_collection("authors", "old_authors")
     utility.rename_collection("articles", "old_articles")
     utility.rename_collection("staging_authors", "authors")
     utility.rename_collection("staging_articles", "articles")
+    if utility.has_collection("author_centroids"):
+        utility.rename_collection("author_centroids", "old_author_centroids")
+    utility.rename_collection("staging_author_centroids", "author_centroids")
 
     # Reload collections
     Collection("authors").load()
     Collection("articles").load()
+    Collection("author_centroids").load()
+    if reduced:
+        Collection("article_vectors").load()
+        Collection("embedding_projection").load()
+
+    if UNITS_SNAPSHOT_PATH is not None:
+        save_units_snapshot(UNITS_SNAPSHOT_PATH)
+
+
+def ingest_embedded(
+    debug: bool = False,
+    quantization: str | None = None,
+    index_dim: int = INDEX_DIM,
+    reduction: str = "pca",
+) -> None:
+    """Ingest data to the embedded store (API with VECTOR_BACKEND=embedded).
+
+    Args:
+        debug: Only ingest the first 100 authors.
+        quantization: Keep a float16 or int8 index of the article embeddings in
+            memory, and re-rank with the float32 vectors kept on disk.
+        index_dim: Dimension of the articles index, see `ingest`.
+        reduction: Reduction method to index_dim, "pca" or "truncate".
+    """
+
+    author_ids = [file.stem for file in AUTHORS_DIR.glob("*.json")]
+    if debug:
+        author_ids = author_ids[:100]
+
+    # Same data packages as Milvus, written to staging collections
+    author_collection = EmbeddedCollectionWriter(EMBEDDED_STORE_DIR / "staging_authors")
+    article_collection = EmbeddedCollectionWriter(
+        EMBEDDED_STORE_DIR / "staging_articles", quantization=quantization
+    )
+    centroid_collection = EmbeddedCollectionWriter(
+        EMBEDDED_STORE_DIR / "staging_author_centroids"
+    )
+
+    logging.info("Fitting 2d projection...")
+    projection = fit_projection(author_ids)
+
+    writers = [author_collection, article_collection, centroid_collection]
+    reduced = index_dim < EMBEDDING_DIM
+    dim_reduction, vector_collection = None, None
+    if reduced:
+        logging.info(f"Fitting {reduction} reduction to {index_dim} dims...")
+        dim_reduction = fit_reduction(author_ids, index_dim, reduction)
+        vector_collection = EmbeddedCollectionWriter(
+            EMBEDDED_STORE_DIR / "staging_article_vectors"
+        )
+        projection_collection = EmbeddedCollectionWriter(
+            EMBEDDED_STORE_DIR / "staging_embedding_projection"
+        )
+        push_projection(projection_collection, *dim_reduction)
+        writers += [vector_collection, projection_collection]
+
+    logging.info("Mapping co-authors...")
+    coauthors = map_coauthors(author_ids)
+    ingested_articles = set()  # one article per DOI, shared by co-authors
+    for author_id in tqdm(author_ids):
+        try:
+            push_data(
+                author_id,
+                author_collection,
+                article_collection,
+                projection,
+                centroid_collection,
+                ingested_articles=ingested_articles,
+                coauthors=coauthors,
+                reduction=dim_reduction,
+                vector_collection=vector_collection,
+            )
+        except Exception as e:
+            logging.error(f"Error pushing {author_id}: {e}")
+
+    for collection in writers:
+        collection.flush()
+        collection.close()
+
+    # Swap staging collections with production collections
+    # (full vectors and projection first, they are read once articles change)
+    if reduced:
+        for name in ("article_vectors", "embedding_projection"):
+            swap_collection(
+                EMBEDDED_STORE_DIR / f"staging_{name}", EMBEDDED_STORE_DIR / name
+            )
+    swap_collection(
+        EMBEDDED_STORE_DIR / "staging_authors", EMBEDDED_STORE_DIR / "authors"
+    )
+    swap_collection(
+        EMBEDDED_STORE_DIR / "staging_articles", EMBEDDED_STORE_DIR / "articles"
+    )
+    swap_collection(
+        EMBEDDED_STORE_DIR / "staging_author_centroids",
+        EMBEDDED_STORE_DIR / "author_centroids",
+    )
+
+    if UNITS_SNAPSHOT_PATH is not None:
+        save_units_snapshot(UNITS_SNAPSHOT_PATH)
 
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--init", action="store_true", help="Initialize Milvus")
     parser.add_argument("--debug", action="store_true", help="Debug mode")
+    parser.add_argument(
+        "--backend",
+        choices=["milvus", "embedded"],
+        default="milvus",
+        help="Vector store to ingest into",
+    )
+    parser.add_argument(
+        "--quantization",
+        choices=QUANTIZATIONS,
+        default=None,
+        help="Quantized article index (embedded backend only)",
+    )
+    parser.add_argument(
+        "--article-index",
+        choices=list(INDEX_CONFIGS),
+        default=ARTICLE_INDEX,
+        help="Article index preset (Milvus backend only)",
+    )
+    parser.add_argument(
+        "--author-index",
+        choices=list(INDEX_CONFIGS),
+        default=AUTHOR_INDEX,
+        help="Author and sub-centroid index preset (Milvus backend only)",
+    )
+    parser.add_argument(
+        "--index-dim",
+        type=int,
+        default=INDEX_DIM,
+        help="Article index dimension (e.g. 256 or 384), rescored at 1536",
+    )
+    parser.add_argument(
+        "--reduction",
+        choices=DIM_REDUCTIONS,
+        default="pca",
+        help="Reduction to --index-dim",
+    )
     args = parser.parse_args()
-    ingest(init=args.init, debug=args.debug)
+
+    if args.backend == "embedded":
+        ingest_embedded(
+            debug=args.debug,
+            quantization=args.quantization,
+            index_dim=args.index_dim,
+            reduction=args.reduction,
+        )
+        return
+
+    ingest(
+        init=args.init,
+        debug=args.debug,
+        article_index=args.article_index,
+        author_index=args.author_index,
+        index_dim=args.index_dim,
+        reduction=args.reduction,
+    )
     print_collections()
 
 
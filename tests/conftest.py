@@ -31,6 +31,11 @@ def article_collection():
     return Collection("articles")
 
 
+@pytest.fixture
+def centroid_collection():
+    return Collection("author_centroids")
+
+
 @pytest.fixture
 def embeddings():
     return OpenAIEmbeddings()
@@ -54,3 +59,33 @@ def get_author_route():
 @pytest.fixture
 def get_author_by_id_route():
     return f"{API_URL}/get_author_by_id"
+
+
+@pytest.fixture
+def plot_spec_route():
+    return f"{API_URL}/plot_spec"
+
+
+@pytest.fixture
+def search_articles_batch_route():
+    return f"{API_URL}/search_articles/batch"
+
+
+@pytest.fixture
+def search_authors_batch_route():
+    return f"{API_URL}/search_authors/batch"
+
+
+@pytest.fixture
+def metrics_route():
+    return f"{API_URL}/metrics"
+
+
+@pytest.fixture
+def search_authors_stream_route():
+    return f"{API_URL}/search_authors/stream"
+
+
+@pytest.fixture
+def plots_route():
+    return f"{API_URL}/plots"
@@ -1,3 +1,5 @@
+import pytest
+
 from api.core import *
 
 
@@ -18,6 +20,73 @@ def test_sort_dict_by_value():
     assert sorted_values == []
 
 
+def test_make_search_param():
+    assert make_search_param("IVF_FLAT", limit=500) == {
+        "metric_type": "IP",
+        "params": {"nprobe": 16},
+    }
+    assert make_search_param("HNSW", limit=10)["params"] == {"ef": 128}
+    assert make_search_param("HNSW", limit=500)["params"] == {"ef": 500}
+    assert make_search_param("UNKNOWN", limit=10)["params"] == {"nprobe": 16}
+
+
+def test_year_partitions():
+    class Partition:
+        def __init__(self, name):
+            self.name = name
+
+    class Collection:
+        partitions = [
+            Partition(name)
+            for name in ["_default", "year_2020_2021", "year_0_1989", "year_2022_9999"]
+        ]
+
+    partitions = get_year_partitions(Collection())
+    assert [name for *_, name in partitions] == [
+        "year_0_1989",
+        "year_2020_2021",
+        "year_2022_9999",
+    ]
+    assert select_year_partitions(partitions, 1900) == [
+        "year_0_1989",
+        "year_2020_2021",
+        "year_2022_9999",
+    ]
+    assert select_year_partitions(partitions, 2021) == [
+        "year_2020_2021",
+        "year_2022_9999",
+    ]
+    assert select_year_partitions(get_year_partitions(object()), 2021) is None
+
+
+def test_name_index():
+    names = [("Kyle", "Cranmer"), ("José Luis", "García-Pérez"), ("Kyle", "Cramer")]
+    index = NameIndex(
+        [
+            {"id": i, "first_name": first, "last_name": last, "unit_id": 0}
+            for i, (first, last) in enumerate(names)
+        ]
+    )
+    assert normalize_name(" José-Luis ") == "jose luis"
+
+    def top(first_name, last_name):
+        return [author["id"] for author in index.search(first_name, last_name)]
+
+    assert top("Kyle", "Cranmer")[0] == 0
+    assert top("kyle", "cranmr")[0] == 0  # typo
+    assert top("K", "Cranmer")[0] == 0  # initial
+    assert top("Cranmer", "Kyle")[0] == 0  # swapped
+    assert top("jose luis", "garcia perez") == [1]  # accents, punctuation
+    assert top("Kyle", "Cramer")[0] == 2
+    assert top("Nobody", "Atall") == []
+
+    candidates = index.search("Kyle", "Cranmer")
+    assert candidates[0]["score"] == 1.0
+    assert [c["score"] for c in candidates] == sorted(
+        [c["score"] for c in candidates], reverse=True
+    )
+
+
 def test_engine(author_collection, article_collection, embeddings):
     engine = Engine(author_collection, article_collection, embeddings)
 
@@ -41,7 +110,16 @@ def test_engine(author_collection, article_collection, embeddings):
     assert len(articles) <= 3
     assert isinstance(articles[0], dict)
     assert sorted(list(articles[0].keys())) == sorted(
-        ["distance", "title", "author_id", "doi", "cited_by", "publication_year"]
+        [
+            "id",
+            "distance",
+            "title",
+            "author_id",
+            "author_ids",
+            "doi",
+            "cited_by",
+            "publication_year",
+        ]
     )
 
     # Test the search_authors method
@@ -64,6 +142,11 @@ def test_engine_get_author(author_collection, article_collection, embeddings):
     assert isinstance(articles, list)
     assert len(articles) > 100
 
+    # Misspelled name, ranked candidates
+    result = engine.get_author(first_name="kyle", last_name="cranmr")
+    assert result["author"]["id"] == 106927
+    assert result["candidates"][0]["id"] == 106927
+
 
 def test_filter_unit(author_collection, article_collection, embeddings):
     engine = Engine(author_collection, article_collection, embeddings)
@@ -77,3 +160,319 @@ def test_filter_unit(author_collection, article_collection, embeddings):
     for author_id in author_ids:
         author = get_author_by_id(author_id, author_collection)
         assert str(author["unit_id"]) == "28626"
+
+
+def test_get_authors_by_ids(author_collection):
+    authors = get_authors_by_ids([106927, "106927", 0], author_collection)
+    assert [author["id"] for author in authors] == [106927, 106927]
+    assert authors[0]["first_name"] == "Kyle"
+    assert get_authors_by_ids([], author_collection) == []
+
+
+def test_ttl_cache():
+    cache = TTLCache(maxsize=2, ttl=None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)  # evicts "b", the least recently used
+    assert cache.get("b") is None
+    assert cache.stats == {"size": 2, "hits": 1, "misses": 1}
+
+    cache = TTLCache(ttl=10)
+    cache.set("a", 1, created=0.0)
+    assert cache.get("a") is None
+
+
+def test_embedding_cache(tmp_path):
+    calls = []
+
+    def compute(text):
+        calls.append(text)
+        return [0.5, 0.25]
+
+    path = str(tmp_path / "embeddings.sqlite")
+    cache = EmbeddingCache(path=path)
+    assert cache.get_or_compute("Dark  Higgs", compute) == [0.5, 0.25]
+    assert cache.get_or_compute(" dark higgs ", compute) == [0.5, 0.25]
+    assert len(calls) == 1
+
+    # A fresh cache (e.g. another worker) reads from the shared disk tier
+    cache = EmbeddingCache(path=path)
+    assert cache.get_or_compute("dark higgs", compute) == [0.5, 0.25]
+    assert len(calls) == 1
+    assert cache.stats["disk_hits"] == 1
+
+
+def test_top_m_sum():
+    rng = np.random.default_rng(0)
+    for m in [1, 5, 50]:
+        author_ids = rng.integers(0, 200, size=2000).astype(str)
+        weights = rng.random(2000) ** 3 + np.log10(rng.integers(0, 500, 2000) + 1)
+        unique_author_ids, idx = np.unique(author_ids, return_inverse=True)
+
+        # Reference: the per-author loop
+        expected = []
+        for i in range(len(unique_author_ids)):
+            this_author_weights = weights[idx == i]
+            top_m_idx = np.argsort(this_author_weights)[-m:]
+            expected.append(np.sum(this_author_weights[top_m_idx]))
+
+        assert np.array_equal(top_m_sum(idx, weights, m), np.array(expected))
+
+    assert top_m_sum(np.array([], dtype=int), np.array([]), 5).shape == (0,)
+
+
+def test_authorship():
+    articles = [
+        {"id": 11, "author_ids": ["1", "2"], "distance": 0.1},
+        {"id": 13, "author_ids": ["2"], "distance": 0.2},
+    ]
+    assert [a["author_id"] for a in expand_authorship(articles)] == ["1", "2", "2"]
+    assert [a["author_id"] for a in expand_authorship(articles, [1])] == ["1"]
+
+
+def test_cap_articles_per_author():
+    articles = [
+        {"id": 1, "author_ids": ["1"]},
+        {"id": 2, "author_ids": ["1", "2"]},
+        {"id": 3, "author_ids": ["1"]},
+        {"id": 4, "author_ids": ["2", "3"]},
+        {"id": 5, "author_ids": ["2"]},
+    ]
+    capped = cap_articles_per_author(articles, m=2)
+    assert [a["id"] for a in capped] == [1, 2, 4]
+    capped = cap_articles_per_author(articles, m=1, author_ids=[2])
+    assert [a["id"] for a in capped] == [2]
+
+
+def test_query_all(tmp_path):
+    from api.embedded_store import EmbeddedCollection, EmbeddedCollectionWriter
+
+    ids = np.random.default_rng(0).permutation(1000)
+    writer = EmbeddedCollectionWriter(tmp_path / "authors")
+    writer.insert(
+        [{"id": int(i), "unit_id": int(i % 7), "embedding": [1.0, 0.0]} for i in ids]
+    )
+    writer.flush()
+    writer.close()
+    collection = EmbeddedCollection(tmp_path / "authors")
+
+    rows = query_all(collection, "unit_id != 3", ["unit_id"], page_size=64)
+    assert sorted(row["id"] for row in rows) == [i for i in range(1000) if i % 7 != 3]
+    assert len(query_all(collection, "id >= 0", [], page_size=1000)) == 1000
+
+
+def test_reduce_embeddings():
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(5, 8))
+
+    # Truncation: first coordinates, normalized
+    reduced = reduce_embeddings(embeddings, np.zeros(8), np.eye(3, 8))
+    expected = embeddings[:, :3] / np.linalg.norm(embeddings[:, :3], axis=1)[:, None]
+    assert np.allclose(reduced, expected, atol=1e-6)
+
+    # PCA: centered, then projected on the components
+    mean, components = (
+        embeddings.mean(axis=0),
+        np.linalg.qr(rng.normal(size=(8, 4)))[0].T,
+    )
+    reduced = reduce_embeddings(embeddings, mean, components)
+    assert reduced.shape == (5, 4)
+    assert np.allclose(np.linalg.norm(reduced, axis=1), 1)
+    assert np.all(np.isfinite(reduce_embeddings([mean], mean, components)))
+
+
+def test_knn_query_position():
+    articles = [
+        {"distance": 0.0, "x": 1.0, "y": 2.0},
+        {"distance": 0.5, "x": 4.0, "y": 2.0},
+    ]
+    assert knn_query_position(articles) == (2.0, 2.0)
+    assert knn_query_position(articles, k=1) == (1.0, 2.0)
+
+
+def test_stale_while_revalidate(tmp_path):
+    snapshot_path = tmp_path / "units.json"
+    snapshot_path.write_text('{"1": "Physics"}')
+
+    def fetch():
+        raise ConnectionError("upstream is down")
+
+    # Seeded from snapshot, stale value is served when the refresh fails
+    cache = StaleWhileRevalidate(fetch, ttl=0, snapshot_path=str(snapshot_path))
+    assert cache.get() == {"1": "Physics"}
+    cache.refresh()
+    assert cache.get() == {"1": "Physics"}
+
+    # Successful refresh updates the value and the snapshot
+    cache.fetch = lambda: {"2": "Statistics"}
+    cache.refresh()
+    assert cache.get() == {"2": "Statistics"}
+    assert StaleWhileRevalidate(fetch, 60, str(snapshot_path)).get() == {
+        "2": "Statistics"
+    }
+
+
+def test_embedding_cache_many():
+    calls = []
+
+    def compute_many(texts):
+        calls.append(texts)
+        return [[float(len(text))] for text in texts]
+
+    cache = EmbeddingCache()
+    cache.get_or_compute("a", lambda text: [1.0])
+    vectors = cache.get_or_compute_many(["a", "bb", "BB", "ccc"], compute_many)
+    assert vectors == [[1.0], [2.0], [2.0], [3.0]]
+    assert calls == [["bb", "ccc"]]  # one call, uncached and deduplicated
+
+
+def test_engine_response_cache(author_collection, article_collection, embeddings):
+    engine = Engine(author_collection, article_collection, embeddings)
+
+    first = engine.search_authors("Dark Higgs Boson", top_k=3)
+    second = engine.search_authors(" dark higgs  boson", top_k=3)
+    assert second == first
+    assert engine.response_cache.hits == 1
+
+    # Hits are copies, callers cannot alter the cached output
+    second["authors"]["author_ids"].clear()
+    assert engine.search_authors("Dark Higgs Boson", top_k=3) == first
+    assert engine.response_cache.hits == 2
+
+    # Every ranking parameter is part of the key
+    engine.search_authors("Dark Higgs Boson", top_k=3, m=3)
+    assert engine.response_cache.hits == 2
+
+    # Plots label the query as typed
+    for query in ["Dark Higgs Boson", "dark higgs boson"]:
+        output = engine.search_authors(
+            query, top_k=3, with_plot=True, plot_format="columnar"
+        )
+        assert output["plot_data"]["label"][0] == query
+
+    # Swapping collections (new generation) drops all entries
+    engine.refresh()
+    assert len(engine.response_cache) == 0
+
+
+def test_search_authors_centroids(
+    author_collection, article_collection, centroid_collection, embeddings
+):
+    engine = Engine(
+        author_collection,
+        article_collection,
+        embeddings,
+        centroid_collection=centroid_collection,
+    )
+
+    results = engine.search_authors(
+        "Dark Higgs Boson", top_k=3, retrieval="centroids", with_evidence=True
+    )
+    author_ids = results["authors"]["author_ids"]
+    assert 0 < len(author_ids) <= 3
+
+    # The pool is drawn from the candidate authors only, at most m per author
+    candidates = engine._search_author_candidates(
+        engine.embed("Dark Higgs Boson"), n_authors=20
+    )
+    assert len(results["evidence"]) <= 20 * 5
+    assert all(
+        set(article["author_ids"]) & set(map(str, candidates))
+        for article in results["evidence"]
+    )
+
+
+def test_metrics():
+    metrics = Metrics(namespace="test")
+    metrics.observe("latency", 0.02, {"stage": "embed"})
+    metrics.observe("latency", 20.0, {"stage": "embed"})
+    metrics.inc("requests_total", labels={"path": "/"})
+    metrics.register("cache_size", lambda: 7, {"cache": "response"})
+
+    text = metrics.render()
+    assert "# TYPE test_latency histogram" in text
+    assert 'test_latency_bucket{stage="embed",le="0.01"} 0' in text
+    assert 'test_latency_bucket{stage="embed",le="0.025"} 1' in text
+    assert 'test_latency_bucket{stage="embed",le="+Inf"} 2' in text
+    assert 'test_latency_count{stage="embed"} 2' in text
+    assert 'test_requests_total{path="/"} 1' in text
+    assert 'test_cache_size{cache="response"} 7' in text
+
+
+def test_span():
+    spans = start_spans()
+    with span("embed"):
+        pass
+    with span("search"):
+        pass
+    assert [name for name, _ in spans] == ["embed", "search"]
+    assert format_server_timing([("embed", 0.0123)]) == "embed;dur=12.3"
+
+
+def test_engine_plot_job(author_collection, article_collection, embeddings):
+    engine = Engine(author_collection, article_collection, embeddings)
+
+    # Without an executor the job runs inline and is done on return
+    spans = start_spans()
+    plot_id = engine.submit_plot("Dark Higgs Boson", plot_format="columnar")
+    plot = engine.get_plot(plot_id)
+    assert plot["status"] == "done"
+    assert plot["plot_data"]["label"][0] == "Dark Higgs Boson"
+
+    # The render is timed by the caller (worker processes can't record spans)
+    assert "render" in [name for name, _ in spans]
+
+    assert engine.get_plot("unknown") is None
+
+
+def test_engine_pagination(author_collection, article_collection, embeddings):
+    engine = Engine(author_collection, article_collection, embeddings)
+    query = "Dark Higgs Boson"
+
+    results = engine.search_articles(query, top_k=3, distance_threshold=0.5)
+    pool = engine._search_articles(query, top_k=200, distance_threshold=0.5)
+    page = engine.get_page(results["next_cursor"], page_size=3)
+    assert page["articles"] == pool["articles"][3:6]
+
+    # An expired pool is recomputed from the cursor
+    engine.pools.clear()
+    assert engine.get_page(results["next_cursor"], page_size=3) == page
+
+    results = engine.search_authors(query, top_k=3)
+    page = engine.get_page(results["next_cursor"], page_size=3, kind="authors")
+    assert not set(page["authors"]["author_ids"]) & set(
+        results["authors"]["author_ids"]
+    )
+    assert max(page["authors"]["scores"]) <= min(results["authors"]["scores"])
+
+    with pytest.raises(ValueError):
+        engine.get_page(results["next_cursor"], page_size=3, kind="articles")
+    with pytest.raises(ValueError):
+        engine.get_page("not a cursor", page_size=3)
+
+    # Search parameters of a cursor cannot be altered
+    state = decode_cursor(results["next_cursor"], engine.cursor_key)
+    state["params"]["n"] = 10**6
+    with pytest.raises(ValueError):
+        engine.get_page(encode_cursor(state, b"another key"), page_size=3)
+
+
+def test_engine_author_articles(author_collection, article_collection, embeddings):
+    engine = Engine(author_collection, article_collection, embeddings)
+    everything = engine.get_author_by_id("106927")
+
+    page = engine.get_author_by_id("106927", limit=10, sort_by="citations")
+    assert page["total_articles"] == len(everything["articles"])
+    citations = [article["cited_by"] for article in page["articles"]]
+    assert citations == sorted(citations, reverse=True)
+    assert citations[0] == max(a["cited_by"] for a in everything["articles"])
+
+    next_page = engine.get_author_by_id(
+        "106927", limit=10, offset=10, sort_by="citations", fields=["title"]
+    )
+    assert set(next_page["articles"][0]) == {"id", "title"}
+    assert not {a["id"] for a in next_page["articles"]} & {
+        a["id"] for a in page["articles"]
+    }
+    assert len(engine.author_articles) == 1  # sorted ids are reused
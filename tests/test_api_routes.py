@@ -1,3 +1,6 @@
+import json
+import time
+
 import requests
 
 
@@ -28,6 +31,28 @@ def test_search_articles_with_plot(search_articles_route):
     assert isinstance(plot_json, str)
 
 
+def test_search_articles_with_columnar_plot(search_articles_route, plot_spec_route):
+    data = {
+        "query": "covid-19",
+        "top_k": 3,
+        "with_plot": True,
+        "plot_format": "columnar",
+    }
+
+    response = requests.post(search_articles_route, json=data, verify=False)
+    assert response.status_code == 200
+
+    data = response.json()
+    assert "plot_json" not in data
+    plot_data = data["plot_data"]
+    assert plot_data["type_code"][0] == 0  # query
+    assert len(plot_data["id"]) == len(plot_data["label"])
+
+    response = requests.get(plot_spec_route, verify=False)
+    assert response.status_code == 200
+    assert response.json()["data"] == {"name": "points"}
+
+
 def test_search_authors(search_authors_route):
     data = {"query": "covid-19", "top_k": 3}
     response = requests.post(search_authors_route, json=data, verify=False)
@@ -63,6 +88,12 @@ def test_search_authors_with_unit_filter(search_authors_route):
     assert "authors" in data
 
 
+def test_search_authors_with_invalid_unit_filter(search_authors_route):
+    data = {"query": "mushroom and farming", "top_k": 3, "filter_unit": "biology"}
+    response = requests.post(search_authors_route, json=data, verify=False)
+    assert response.status_code == 422
+
+
 def test_get_author(get_author_route):
     data = {"first_name": "Kyle", "last_name": "Cranmer"}
     response = requests.post(get_author_route, json=data, verify=False)
@@ -82,3 +113,105 @@ def test_get_author_by_id(get_author_by_id_route):
     data = response.json()
     assert "author" in data
     assert data["author"]["id"] == int(test_id)
+
+
+def test_search_articles_batch(search_articles_batch_route):
+    data = {"queries": ["covid-19", "dark matter"], "top_k": 3}
+    response = requests.post(search_articles_batch_route, json=data, verify=False)
+    assert response.status_code == 200
+
+    results = response.json()["results"]
+    assert [result["query"] for result in results] == ["covid-19", "dark matter"]
+    assert all(len(result["articles"]) <= 3 for result in results)
+
+
+def test_search_authors_batch(search_authors_batch_route, search_authors_route):
+    data = {"queries": ["covid-19", "dark matter"], "top_k": 3}
+    response = requests.post(search_authors_batch_route, json=data, verify=False)
+    assert response.status_code == 200
+
+    results = response.json()["results"]
+    assert len(results) == 2
+
+    # Same ranking as the single query endpoint
+    single = requests.post(
+        search_authors_route, json={"query": "dark matter", "top_k": 3}, verify=False
+    ).json()
+    assert results[1]["authors"] == single["authors"]
+
+
+def test_server_timing_and_metrics(search_authors_route, metrics_route):
+    data = {"query": "covid-19", "top_k": 3}
+    response = requests.post(search_authors_route, json=data, verify=False)
+    assert response.status_code == 200
+    assert "total;dur=" in response.headers["Server-Timing"]
+
+    response = requests.get(metrics_route, verify=False)
+    assert response.status_code == 200
+    assert 'scholar_search_requests_total{method="POST",path="/search_authors/"' in (
+        response.text
+    )
+
+
+def test_search_authors_stream(search_authors_stream_route, search_authors_route):
+    data = {"query": "covid-19", "top_k": 3, "with_plot": True, "with_evidence": True}
+    response = requests.post(search_authors_stream_route, json=data, verify=False)
+    assert response.status_code == 200
+
+    messages = [json.loads(line) for line in response.text.splitlines()]
+    types = [message["type"] for message in messages]
+    assert types[0] == "ranking"
+    assert types[-2:] == ["evidence", "plot_json"]
+
+    # Same authors as the non-streaming endpoint, in ranking order
+    authors = [a for m in messages if m["type"] == "authors" for a in m["authors"]]
+    single = requests.post(search_authors_route, json=data, verify=False).json()
+    assert authors == single["authors"]
+
+
+def test_search_authors_with_plot_job(search_authors_route, plots_route):
+    data = {"query": "covid-19", "top_k": 3, "with_plot": True, "plot_async": True}
+    response = requests.post(search_authors_route, json=data, verify=False)
+    assert response.status_code == 200
+
+    data = response.json()
+    assert "plot_json" not in data
+    plot_id = data["plot_id"]
+
+    for _ in range(100):
+        response = requests.get(f"{plots_route}/{plot_id}", verify=False)
+        if response.status_code != 202:
+            break
+        time.sleep(0.1)
+    assert response.status_code == 200
+    assert isinstance(response.json()["plot_json"], str)
+
+    response = requests.get(f"{plots_route}/unknown", verify=False)
+    assert response.status_code == 404
+
+
+def test_search_articles_pagination(search_articles_route):
+    data = {"query": "covid-19", "top_k": 3}
+    first_page = requests.post(search_articles_route, json=data, verify=False).json()
+
+    data["cursor"] = first_page["next_cursor"]
+    response = requests.post(search_articles_route, json=data, verify=False)
+    assert response.status_code == 200
+    dois = {article["doi"] for article in response.json()["articles"]}
+    assert not dois & {article["doi"] for article in first_page["articles"]}
+
+    data["cursor"] = "not a cursor"
+    response = requests.post(search_articles_route, json=data, verify=False)
+    assert response.status_code == 400
+
+
+def test_get_author_articles_page(get_author_by_id_route):
+    data = {"author_id": "106927", "limit": 5, "sort_by": "year"}
+    response = requests.post(get_author_by_id_route, json=data, verify=False)
+    assert response.status_code == 200
+
+    data = response.json()
+    assert len(data["articles"]) == 5
+    assert data["total_articles"] > 5
+    years = [article["publication_year"] for article in data["articles"]]
+    assert years == sorted(years, reverse=True)
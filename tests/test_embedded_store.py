@@ -0,0 +1,172 @@
+import shutil
+
+import numpy as np
+import pytest
+
+from api.embedded_store import *
+
+
+@pytest.fixture
+def embedded_collection(tmp_path):
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(500, 16)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    writer = EmbeddedCollectionWriter(tmp_path / "articles")
+    writer.insert(
+        [
+            {
+                "author_id": int(i % 50),
+                "title": f"Article {i} ü",
+                "publication_year": 1990 + int(i % 30),
+                "embedding": vector.tolist(),
+            }
+            for i, vector in enumerate(vectors)
+        ]
+    )
+    writer.flush()
+    writer.close()
+    return EmbeddedCollection(tmp_path / "articles"), vectors
+
+
+def test_embedded_query(embedded_collection):
+    collection, _ = embedded_collection
+
+    results = collection.query(
+        expr="author_id in [1, 2] and publication_year >= 2010",
+        output_fields=["title", "publication_year"],
+    )
+    expected = [i for i in range(500) if i % 50 in (1, 2) and 1990 + i % 30 >= 2010]
+    assert [r["id"] for r in results] == expected
+    assert all(r["title"] == f"Article {r['id']} ü" for r in results)
+
+    results = collection.query(expr='title like "Article 12%"', output_fields=[])
+    assert [r["id"] for r in results] == [12] + list(range(120, 130))
+
+    results = collection.query(expr="not (id >= 3)", output_fields=["author_id"])
+    assert results == [{"id": i, "author_id": i} for i in range(3)]
+
+    with pytest.raises(ValueError):
+        collection.query(expr="unknown > 1", output_fields=[])
+
+
+def test_embedded_get_vectors(embedded_collection):
+    collection, vectors = embedded_collection
+
+    ids, found = collection.get_vectors([3, 1000, 1])
+    assert ids.tolist() == [3, 1]
+    assert np.array_equal(found, vectors[[3, 1]])
+
+
+def test_embedded_array_field(tmp_path):
+    author_ids = [[1], [1, 2], [], [3, 2], [4]]
+    writer = EmbeddedCollectionWriter(tmp_path / "articles")
+    writer.insert([{"author_ids": ids, "embedding": [1.0, 0.0]} for ids in author_ids])
+    writer.flush()
+    writer.close()
+    collection = EmbeddedCollection(tmp_path / "articles")
+
+    results = collection.query(
+        expr="array_contains_any(author_ids, [2, 4])", output_fields=["author_ids"]
+    )
+    assert results == [
+        {"id": 1, "author_ids": [1, 2]},
+        {"id": 3, "author_ids": [3, 2]},
+        {"id": 4, "author_ids": [4]},
+    ]
+    results = collection.query(expr="array_contains(author_ids, 1) and id > 0")
+    assert [r["id"] for r in results] == [1]
+
+    with pytest.raises(ValueError):
+        collection.query(expr="array_contains(id, 1)")
+
+
+def test_embedded_search(embedded_collection):
+    collection, vectors = embedded_collection
+    queries = vectors[:3] + 0.1
+
+    results = collection.search(
+        data=queries.tolist(),
+        anns_field="embedding",
+        param={},
+        limit=10,
+        expr="publication_year >= 2000",
+        output_fields=["author_id"],
+    )
+
+    allowed = np.array([1990 + i % 30 >= 2000 for i in range(500)])
+    for query, hits in zip(queries, results):
+        scores = np.where(allowed, vectors @ query, -np.inf)
+        expected = np.argsort(-scores, kind="stable")[:10]
+        assert [hit.id for hit in hits] == expected.tolist()
+        assert [hit.distance for hit in hits] == pytest.approx(
+            scores[expected].tolist(), abs=1e-5
+        )
+        assert all(hit.entity.get("author_id") == hit.id % 50 for hit in hits)
+
+    # Selective filter with fewer matching rows than limit
+    results = collection.search(
+        queries.tolist(), "embedding", {}, limit=20, expr="author_id == 3"
+    )
+    assert all(
+        sorted(hit.id for hit in hits) == list(range(3, 500, 50)) for hits in results
+    )
+
+    assert collection.search(queries.tolist(), "embedding", {}, limit=0) == [[]] * 3
+
+
+def test_embedded_swap(embedded_collection, tmp_path):
+    collection, _ = embedded_collection
+    collection_id = collection.describe()["collection_id"]
+
+    writer = EmbeddedCollectionWriter(tmp_path / "staging_articles")
+    writer.insert([{"author_id": 7, "embedding": [1.0] * 16}])
+    writer.flush()
+    writer.close()
+    swap_collection(tmp_path / "staging_articles", tmp_path / "articles")
+    shutil.rmtree(tmp_path / "old_articles")
+
+    # Until described, readers serve the opened files (string columns included)
+    assert collection.query(expr="id == 3", output_fields=["title"]) == [
+        {"id": 3, "title": "Article 3 ü"}
+    ]
+
+    # Open readers pick up the new collection on describe (generation check)
+    assert collection.describe()["collection_id"] != collection_id
+    assert collection.query(expr="id >= 0", output_fields=["author_id"]) == [
+        {"id": 0, "author_id": 7}
+    ]
+
+
+@pytest.mark.parametrize("quantization", QUANTIZATIONS)
+def test_embedded_quantized_search(tmp_path, quantization):
+    rng = np.random.default_rng(1)
+    vectors = rng.normal(size=(2000, 32)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    writer = EmbeddedCollectionWriter(tmp_path / "articles", quantization=quantization)
+    writer.insert(
+        [{"author_id": i % 7, "embedding": v.tolist()} for i, v in enumerate(vectors)]
+    )
+    writer.flush()
+    writer.close()
+    collection = EmbeddedCollection(tmp_path / "articles")
+    assert collection.index.dtype == quantization
+
+    queries = vectors[:20] + rng.normal(scale=0.1, size=(20, 32)).astype(np.float32)
+    results = collection.search(queries.tolist(), "embedding", {}, limit=10)
+
+    recalls = []
+    for query, hits in zip(queries, results):
+        scores = vectors @ query
+        expected = set(np.argsort(-scores)[:10].tolist())
+        recalls.append(len(expected & {hit.id for hit in hits}) / 10)
+
+        # Re-ranked distances are exact
+        assert [hit.distance for hit in hits] == pytest.approx(
+            scores[[hit.id for hit in hits]].tolist(), abs=1e-5
+        )
+        assert [hit.distance for hit in hits] == sorted(
+            [hit.distance for hit in hits], reverse=True
+        )
+    assert np.mean(recalls) >= 0.95